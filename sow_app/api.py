@@ -0,0 +1,236 @@
+# api.py - HEADLESS JSON API FOR SOW GENERATION
+"""JSON API for generating and saving SOWs without the Streamlit UI
+
+A plain WSGI app, so it runs under any multi-worker WSGI server:
+    gunicorn -w 4 -b 0.0.0.0:8000 api:app
+
+or, for local testing, the built-in threaded server:
+    python api.py --port 8000
+
+Every request needs the X-API-Key header set to Config.API_KEY (SOW_API_KEY).
+SOW bodies use the same keys as batch_generate.py (see main.build_form_data).
+Only /save-record assigns a SOW number when sow_num is missing; the render
+endpoints use a "SOW-DRAFT" placeholder and /approve takes the number the
+SOW_Records item was saved with.
+
+/approve queues the same background job as the dashboard and answers 202
+Accepted with its job_id; poll /job-status to see when the documents are
+uploaded and the SOW is approved. Each API process runs its own approval
+workers against the shared jobs database.
+
+Endpoints:
+    GET  /health        - liveness check
+    GET  /metrics       - flow call metrics in Prometheus text format (no API key needed)
+    POST /render-docx   - SOW body -> rendered .docx
+    POST /render-xlsx   - SOW body -> milestone / resource workbook
+    POST /save-record   - SOW body + created_by -> saved SOW_Records item
+    POST /approve       - {item_id, approver_email, comments, sow} -> queued approval job id
+    POST /job-status    - {job_id} -> status and result of an approval job
+
+Flow metrics are kept in memory per process. Under gunicorn -w 4 each worker
+counts only the calls it handled, and a scrape of /metrics reaches whichever
+worker accepts it - run a single worker with threads (e.g. -w 1 --threads 8)
+when the numbers need to be complete. SOW_METRICS_PORT is only used by the
+Streamlit app; the API serves its metrics on its own port.
+"""
+import argparse
+import hmac
+import json
+from socketserver import ThreadingMixIn
+from urllib.parse import quote
+from wsgiref.simple_server import WSGIServer, make_server
+
+import main
+from main import Config
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PREVIEW_SOW_NUM = "SOW-DRAFT"
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _needs_sow_num(body):
+    return not str(body.get("sow_num", "")).strip() and body.get("option") in ["T&M", "Fixed Fee"]
+
+
+def _form_data(body, sow_num=None):
+    """form_data for a SOW body, filling in sow_num when the body has none"""
+    if body.get("option") not in Config.TEMPLATE_MAPPING:
+        raise ApiError("400 Bad Request", f"option must be one of {list(Config.TEMPLATE_MAPPING)}")
+    if sow_num and _needs_sow_num(body):
+        body = dict(body, sow_num=sow_num)
+    return main.build_form_data(body)
+
+
+def render_docx(body):
+    # Previews never allocate a SOW number
+    files = main.render_sow_files(_form_data(body, sow_num=PREVIEW_SOW_NUM))
+    return DOCX_MIME, files["docx_name"], files["docx_data"]
+
+
+def render_xlsx(body):
+    files = main.render_sow_files(_form_data(body, sow_num=PREVIEW_SOW_NUM))
+    if not files["excel"]:
+        raise ApiError("404 Not Found", "No milestone or resource table to export for this SOW")
+    return XLSX_MIME, files["excel"]["file_name"], files["excel"]["data"]
+
+
+def save_record(body):
+    created_by = body.get("created_by")
+    if not created_by:
+        raise ApiError("400 Bad Request", "created_by is required")
+
+    # Saving the record is the submission, so this is where a SOW number is allocated
+    sow_num = f"SOW-{main.get_next_sow_number()}" if _needs_sow_num(body) else None
+    form_data = _form_data(body, sow_num=sow_num)
+    sow_record = main.prepare_sow_data_for_storage(form_data, created_by=created_by)
+    result = main.SharePointService().save_sow_record(sow_record)
+    if not result["success"]:
+        main.save_to_local_log(sow_record)
+    return dict(result, sow_num=form_data.get("sow_num", ""))
+
+
+def approve(body):
+    for field in ("item_id", "approver_email", "sow"):
+        if not body.get(field):
+            raise ApiError("400 Bad Request", f"{field} is required")
+
+    # Approving never allocates - use the number the record was saved with
+    sow_num = None
+    if _needs_sow_num(body["sow"]):
+        lookup = main.SharePointService().get_sow_by_id(body["item_id"])
+        sow_num = (lookup.get("data") or {}).get("SOWNumber") if lookup["success"] else None
+        if not sow_num:
+            raise ApiError("400 Bad Request", "sow.sow_num is required (it could not be looked up from item_id)")
+
+    # Queue the same generate/upload/approve job the dashboard queues
+    form_data = _form_data(body["sow"], sow_num=sow_num)
+    job_id, created = main.get_approval_job_queue().enqueue(
+        item_id=body["item_id"],
+        sow_number=form_data.get("sow_num", ""),
+        payload={
+            "item_id": body["item_id"],
+            "approver_email": body["approver_email"],
+            "comments": body.get("comments", ""),
+            "sow": main.serialize_form_data(form_data)
+        },
+        created_by=body["approver_email"]
+    )
+    message = f"Approval queued as job #{job_id}" if created else f"An approval is already in progress (job #{job_id})"
+    return {"success": True, "job_id": job_id, "queued": created, "message": message}
+
+
+def job_status(body):
+    try:
+        job_id = int(body.get("job_id"))
+    except (TypeError, ValueError):
+        raise ApiError("400 Bad Request", "job_id must be an integer")
+
+    job = main.get_approval_job_queue().get(job_id)
+    if job is None:
+        raise ApiError("404 Not Found", f"No approval job #{job_id}")
+    return {"success": True, "message": job["status"], "data": job}
+
+
+ROUTES = {
+    "/render-docx": render_docx,
+    "/render-xlsx": render_xlsx,
+    "/save-record": save_record,
+    "/approve": approve,
+    "/job-status": job_status
+}
+
+
+def _json_response(start_response, status, data):
+    payload = json.dumps(data, default=str).encode("utf-8")
+    start_response(status, [("Content-Type", "application/json"), ("Content-Length", str(len(payload)))])
+    return [payload]
+
+
+def _read_body(environ):
+    try:
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    if length > Config.API_MAX_BODY_BYTES:
+        raise ApiError("413 Payload Too Large", "Request body too large")
+
+    try:
+        body = json.loads(environ["wsgi.input"].read(length) or b"{}")
+    except ValueError:
+        raise ApiError("400 Bad Request", "Body must be valid JSON")
+    if not isinstance(body, dict):
+        raise ApiError("400 Bad Request", "Body must be a JSON object")
+    return body
+
+
+def app(environ, start_response):
+    """WSGI entry point"""
+    path = environ.get("PATH_INFO", "")
+    method = environ.get("REQUEST_METHOD", "GET")
+
+    if path == "/health" and method == "GET":
+        return _json_response(start_response, "200 OK", {"success": True, "message": "ok"})
+    if path == "/metrics" and method == "GET":
+        return main.get_flow_metrics().wsgi_app(environ, start_response)
+
+    try:
+        if not Config.API_KEY:
+            raise ApiError("503 Service Unavailable", "API key not configured (set SOW_API_KEY)")
+        if not hmac.compare_digest(environ.get("HTTP_X_API_KEY", ""), Config.API_KEY):
+            raise ApiError("401 Unauthorized", "Invalid or missing X-API-Key")
+
+        handler = ROUTES.get(path)
+        if handler is None:
+            raise ApiError("404 Not Found", f"Unknown endpoint: {path}")
+        if method != "POST":
+            raise ApiError("405 Method Not Allowed", "Use POST")
+
+        result = handler(_read_body(environ))
+
+    except ApiError as e:
+        return _json_response(start_response, e.status, {"success": False, "message": e.message})
+    except Exception as e:
+        main.logger.exception("❌ API error on %s: %s", path, e)
+        return _json_response(start_response, "500 Internal Server Error", {"success": False, "message": f"Error: {str(e)}"})
+
+    # Document endpoints return (mime, file name, bytes); the others return a result dict
+    if isinstance(result, tuple):
+        mime, file_name, data = result
+        start_response("200 OK", [
+            ("Content-Type", mime),
+            ("Content-Length", str(len(data))),
+            ("Content-Disposition", f"attachment; filename*=UTF-8''{quote(file_name)}")
+        ])
+        return [data]
+
+    if not result.get("success"):
+        status = "502 Bad Gateway"
+    else:
+        status = "202 Accepted" if path == "/approve" else "200 OK"
+    return _json_response(start_response, status, result)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+# Start this process's approval workers on import (threads don't survive a fork,
+# so don't run gunicorn with --preload)
+main.get_approval_job_queue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the SOW JSON API with the built-in threaded server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    print(f"🚀 SOW API listening on http://{args.host}:{args.port}")
+    make_server(args.host, args.port, app, server_class=ThreadingWSGIServer).serve_forever()
@@ -0,0 +1,144 @@
+# batch_generate.py - HEADLESS BATCH SOW GENERATION
+"""Render SOW documents and Excel workbooks for many requests at once
+
+Input is a CSV or JSON-lines file with one SOW per row, using the form_data keys
+of the SOW form (option, sow_num, sow_name, Client_Name, start_date, end_date,
+scope_text, Fees_al, ...). T&M "resources" and Fixed Fee "milestones" are lists
+of table rows - JSON-encoded in CSV cells. Rows without a sow_num get the next
+SOW number.
+
+Usage:
+    python batch_generate.py requests.csv --output-dir batch_output --workers 8
+    python batch_generate.py requests.jsonl --upload --created-by finance@company.com
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import main
+
+
+def read_requests(input_path):
+    """Read SOW requests from a CSV or JSON-lines file"""
+    with open(input_path, "r", encoding="utf-8-sig", newline="") as f:
+        if input_path.lower().endswith(".csv"):
+            return [dict(row) for row in csv.DictReader(f)]
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def render_request(job):
+    """Render one request in a worker process and write its files (returns a manifest entry)"""
+    row_number, request, output_dir = job
+    entry = {
+        "row": row_number,
+        "sow_num": request.get("sow_num", ""),
+        "sow_name": request.get("sow_name", ""),
+        "option": request.get("option", ""),
+        "success": False,
+        "docx": None,
+        "excel": None,
+        "message": ""
+    }
+
+    try:
+        form_data = main.build_form_data(request)
+        files = main.render_sow_files(form_data)
+
+        docx_path = os.path.join(output_dir, files["docx_name"])
+        with open(docx_path, "wb") as f:
+            f.write(files["docx_data"])
+        entry["docx"] = docx_path
+
+        excel = files["excel"]
+        if excel:
+            excel_path = os.path.join(output_dir, excel["file_name"])
+            with open(excel_path, "wb") as f:
+                f.write(excel["data"])
+            entry["excel"] = {"path": excel_path, "folder": excel["folder"], "excel_type": excel["excel_type"]}
+
+        entry["success"] = True
+        entry["message"] = "Generated"
+    except Exception as e:
+        entry["message"] = f"Error: {str(e)}"
+
+    return entry
+
+
+def upload_generated(requests_by_row, manifest, created_by):
+    """Upload every generated file to SharePoint, concurrently up to the HTTP connection pool size"""
+    async_service = main.AsyncSharePointService(main.SharePointService())
+
+    calls = []
+    owners = []
+    for entry in manifest:
+        if not entry["success"]:
+            continue
+
+        form_data = main.build_form_data(requests_by_row[entry["row"]])
+        with open(entry["docx"], "rb") as f:
+            files = {"docx_name": os.path.basename(entry["docx"]), "docx_data": f.read(), "excel": None}
+        if entry["excel"]:
+            with open(entry["excel"]["path"], "rb") as f:
+                files["excel"] = dict(entry["excel"], file_name=os.path.basename(entry["excel"]["path"]), data=f.read())
+
+        entry_calls = main.build_upload_calls(async_service, form_data, files, created_by)
+        calls.extend(entry_calls)
+        owners.extend([(entry, "word"), (entry, "excel")][:len(entry_calls)])
+
+    # More in-flight calls than pooled connections would only queue on the pool (and open extra sockets)
+    results = async_service.run_concurrently(*calls, limit=main.Config.HTTP_POOL_MAXSIZE)
+    for (entry, kind), result in zip(owners, results):
+        entry.setdefault("uploads", {})[kind] = {
+            "success": result.get("success", False),
+            "url": (result.get("data") or {}).get("url", ""),
+            "message": result.get("message", "")
+        }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-generate SOW documents from a CSV or JSON-lines file")
+    parser.add_argument("input", help="CSV or JSON-lines file with one SOW request per row")
+    parser.add_argument("--output-dir", default="batch_output", help="Folder for generated files and manifest.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument("--upload", action="store_true", help="Upload generated files to SharePoint")
+    parser.add_argument("--created-by", default="batch@system", help="created_by metadata for uploads")
+    args = parser.parse_args(argv)
+
+    requests_list = read_requests(args.input)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Assign SOW numbers up front so workers never race for the counter
+    for request in requests_list:
+        if not str(request.get("sow_num", "")).strip() and request.get("option") in ["T&M", "Fixed Fee"]:
+            request["sow_num"] = f"SOW-{main.get_next_sow_number()}"
+
+    jobs = [(row_number, request, args.output_dir) for row_number, request in enumerate(requests_list, 1)]
+    print(f"📄 Generating {len(jobs)} SOWs with {args.workers} workers...")
+
+    started = datetime.now()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        manifest = list(pool.map(render_request, jobs, chunksize=max(1, len(jobs) // (args.workers * 4))))
+    elapsed = (datetime.now() - started).total_seconds()
+
+    if args.upload:
+        print("📤 Uploading generated files to SharePoint...")
+        upload_generated({row_number: request for row_number, request, _ in jobs}, manifest, args.created_by)
+
+    manifest_path = os.path.join(args.output_dir, "manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    failed = [entry for entry in manifest if not entry["success"]]
+    print(f"✅ Generated {len(manifest) - len(failed)}/{len(manifest)} SOWs in {elapsed:.1f}s - manifest: {manifest_path}")
+    for entry in failed:
+        print(f"❌ Row {entry['row']} ({entry['sow_num']}): {entry['message']}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,77 @@
+# bench_excel_export.py - EXCEL EXPORT BENCHMARK
+"""Time and measure ExcelExporter in normal and write-only (streaming) mode
+
+For each table size the T&M resource workbook is built in both modes: once for
+wall time, then again under tracemalloc for peak memory. The crossover between
+the two modes is what Config.EXCEL_STREAMING_ROWS is set from.
+
+Usage:
+    python bench_excel_export.py
+    python bench_excel_export.py --rows 500 1000 2000 5000 --repeat 3
+    python bench_excel_export.py --rows 50000 --no-memory
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+import pandas as pd
+
+import main
+
+SOW_DATA = {"sow_num": "SOW-BENCH", "sow_name": "Benchmark", "Client_Name": "BSC"}
+
+
+def resources(count):
+    return pd.DataFrame({
+        "Role": [f"Engineer {i}" for i in range(count)],
+        "Location": ["India", "USA"] * (count // 2) + ["India"] * (count % 2),
+        "Start Date": [date(2026, 1, 1)] * count,
+        "End Date": [date(2026, 12, 31)] * count,
+        "Allocation %": [100] * count,
+        "Hrs/Day": [8] * count,
+        "Rate/hr ($)": [50.0 + i % 40 for i in range(count)],
+        "Estimated $": [12345.67] * count
+    })
+
+
+def build(streaming, resources_df):
+    return main.ExcelExporter(streaming=streaming).create_tm_resource_excel(SOW_DATA, resources_df)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ExcelExporter normal versus streaming mode")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1000, 50000], help="Table sizes (default: 10 1000 50000)")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed builds per size and mode; the median is shown")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    args = parser.parse_args(argv)
+    main.logger.setLevel(logging.WARNING)  # One "Created resource Excel" line per build otherwise
+
+    print(f"📊 T&M resource workbook, EXCEL_STREAMING_ROWS={main.Config.EXCEL_STREAMING_ROWS}", file=sys.stderr)
+    print(f"{'rows':>8}  {'mode':<10} {'time':>9}  {'peak memory':>12}  {'size':>9}", file=sys.stderr)
+    for count in args.rows:
+        resources_df = resources(count)
+        for label, streaming in (("normal", False), ("streaming", True)):
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                excel_bytes = build(streaming, resources_df)
+                timings.append(time.perf_counter() - started)
+
+            peak = ""
+            if not args.no_memory:
+                tracemalloc.start()
+                build(streaming, resources_df)
+                peak = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f} MiB"
+                tracemalloc.stop()
+
+            print(f"{count:>8}  {label:<10} {statistics.median(timings):>8.3f}s  {peak:>12}  "
+                  f"{len(excel_bytes) / 1024:>7.0f}KB", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
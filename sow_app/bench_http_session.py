@@ -0,0 +1,113 @@
+# bench_http_session.py - FLOW CONNECTION REUSE BENCHMARK
+"""Compare a fresh requests session per flow call with the shared pooled session
+
+Every flow URL is pointed at a local stub, so nothing reaches Power Automate. The
+stub counts the TCP connections it accepts; --connect-delay adds a pause to each
+new connection to stand in for the TLS handshake a real flow call pays.
+
+Usage:
+    python bench_http_session.py --calls 200
+    python bench_http_session.py --calls 200 --threads 8 --connect-delay 30
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import main
+
+
+def start_stub_flow(connect_delay):
+    """Answer every POST with a small JSON body. Returns (url, connection counter)"""
+    connections = {"count": 0}
+    lock = threading.Lock()
+    body = json.dumps({"value": [{"Role": "legal", "Email": "someone@company.com"}]}).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes - without this, Nagle plus delayed ACKs add ~40 ms per kept-alive call
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            with lock:
+                connections["count"] += 1
+            time.sleep(connect_delay)
+            super().setup()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/", connections
+
+
+def fresh_session_call():
+    """What every flow call did before the pooled session: its own session and connection"""
+    service = main.SharePointService()
+    service.http = requests.Session()
+    service.http.headers.update({"Content-Type": "application/json"})
+    try:
+        return service.check_user("someone@company.com")
+    finally:
+        service.http.close()
+
+
+def pooled_session_call():
+    return main.SharePointService().check_user("someone@company.com")
+
+
+def run(label, call, calls, threads, connections):
+    def timed(_):
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    connections["count"] = 0
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        timings = sorted(executor.map(timed, range(calls)))
+
+    percentiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{label:<16} {connections['count']:>6} new connections   "
+        f"p50 {percentiles[49] * 1000:7.2f} ms   p95 {percentiles[94] * 1000:7.2f} ms",
+        file=sys.stderr
+    )
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fresh versus pooled HTTP sessions for flow calls")
+    parser.add_argument("--calls", type=int, default=200, help="Flow calls per mode (default: 200)")
+    parser.add_argument("--threads", type=int, default=1, help="Concurrent callers (default: 1)")
+    parser.add_argument("--connect-delay", type=float, default=0.0,
+                        help="Milliseconds added to each new connection, standing in for a TLS handshake")
+    args = parser.parse_args(argv)
+
+    url, connections = start_stub_flow(args.connect_delay / 1000)
+    for flow_name in main.Config.POWER_AUTOMATE_URLS:
+        main.Config.POWER_AUTOMATE_URLS[flow_name] = url
+
+    print(f"📊 {args.calls} check_user calls, {args.threads} thread(s), "
+          f"{args.connect_delay:g} ms per new connection", file=sys.stderr)
+    run("fresh session", fresh_session_call, args.calls, args.threads, connections)
+    run("pooled session", pooled_session_call, args.calls, args.threads, connections)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
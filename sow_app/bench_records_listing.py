@@ -0,0 +1,104 @@
+# bench_records_listing.py - get_records LISTING BENCHMARK
+"""Time _fetch_sow_records on a large get_records listing served by a local stub flow
+
+Measures the client-side cost of one listing call: HTTP round trip on localhost,
+JSON decoding, DataFrame construction and any logging of the payload. Every flow
+URL is pointed at the stub, so nothing reaches Power Automate.
+
+Usage:
+    python bench_records_listing.py --items 5000 --runs 10
+    SOW_LOG_LEVEL=DEBUG python bench_records_listing.py
+
+To compare against an older revision, check it out and run the same command
+with stdout redirected to a file (older revisions printed payloads to stdout).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import main
+
+
+def make_items(count):
+    """SOW_Records-shaped items roughly the size of real ones"""
+    return [
+        {
+            "ID": i,
+            "SOWNumber": f"SOW-{i}",
+            "SOWName": f"Project {i}",
+            "Client": "Acme Corp",
+            "Status": main.Config.STATUS_PENDING,
+            "ProjectType": "T&M",
+            "TotalValue": 12345.67,
+            "CreatedBy": "user@company.com",
+            "ScopeSummary": "x" * 300,
+            "AdditionalData": json.dumps({"notes": "v" * 200})
+        }
+        for i in range(count)
+    ]
+
+
+def start_stub_flow(body):
+    """Serve body as the response to every POST on a free localhost port. Returns the URL"""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a large get_records listing against a local stub flow")
+    parser.add_argument("--items", type=int, default=5000, help="Items in the listing (default: 5000)")
+    parser.add_argument("--runs", type=int, default=10, help="Timed calls after one warm-up call (default: 10)")
+    args = parser.parse_args(argv)
+
+    url = start_stub_flow(json.dumps({"items": make_items(args.items)}).encode("utf-8"))
+    for flow_name in main.Config.POWER_AUTOMATE_URLS:
+        main.Config.POWER_AUTOMATE_URLS[flow_name] = url
+
+    service = main.SharePointService()
+    payload = {
+        "operation": "get_items",
+        "list_name": main.Config.SHAREPOINT_LIST,
+        "filters": {"status": main.Config.STATUS_PENDING}
+    }
+
+    result = service._fetch_sow_records(payload)
+    if not result["success"]:
+        print(f"❌ Listing failed: {result['message']}", file=sys.stderr)
+        return 1
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        service._fetch_sow_records(payload)
+        timings.append(time.perf_counter() - started)
+
+    log_level = os.environ.get("SOW_LOG_LEVEL", "INFO")
+    print(
+        f"📊 {result['count']} rows, {args.runs} runs (SOW_LOG_LEVEL={log_level}): "
+        f"median {statistics.median(timings) * 1000:.1f} ms, "
+        f"min {min(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
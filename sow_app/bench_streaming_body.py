@@ -0,0 +1,109 @@
+# bench_streaming_body.py - UPLOAD BODY MEMORY BENCHMARK
+"""Measure peak memory of building and sending an upload request body
+
+For each file size the upload_document body is built two ways and POSTed to a
+local stub flow through the shared HTTP session, under tracemalloc:
+    buffered  json.dumps of the payload with the base64 string, then encoded
+              (how upload bodies were built before StreamingJsonBody)
+    streamed  StreamingJsonBody with Config.UPLOAD_CHUNK_BYTES chunks
+
+The file itself is allocated before tracing starts, so the peak is what the
+body costs on top of the file.
+
+Usage:
+    python bench_streaming_body.py
+    python bench_streaming_body.py --mib 1 10 25 --chunk-bytes 786432
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import main
+
+PAYLOAD = {
+    "operation": "upload_document",
+    "library_name": "Onboarding Details",
+    "file_name": "SOW-BENCH - Benchmark.docx",
+    "metadata": {"sow_number": "SOW-BENCH", "client": "BSC"}
+}
+
+
+def start_stub_flow():
+    """Local flow that reads and discards the request body"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            remaining = int(self.headers.get("Content-Length", 0))
+            while remaining:
+                remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def buffered_body(file_bytes):
+    return json.dumps(dict(PAYLOAD, file_content=base64.b64encode(file_bytes).decode("ascii")),
+                      ensure_ascii=False).encode("utf-8")
+
+
+def streamed_body(file_bytes):
+    return main.StreamingJsonBody(PAYLOAD, "file_content", file_bytes)
+
+
+def measure(build, file_bytes, url):
+    """(peak MiB, seconds) to build the body and POST it"""
+    session = main.get_http_session()
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = session.post(url, data=build(file_bytes), timeout=60)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    response.raise_for_status()
+    return peak, elapsed
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark buffered versus streamed upload request bodies")
+    parser.add_argument("--mib", type=float, nargs="+", default=[1, 10, 25], help="File sizes in MiB (default: 1 10 25)")
+    parser.add_argument("--chunk-bytes", type=int, help="Override Config.UPLOAD_CHUNK_BYTES")
+    args = parser.parse_args(argv)
+    main.logger.setLevel(logging.WARNING)
+    if args.chunk_bytes:
+        main.Config.UPLOAD_CHUNK_BYTES = args.chunk_bytes
+
+    server, url = start_stub_flow()
+    try:
+        print(f"📊 Upload body peak memory, UPLOAD_CHUNK_BYTES={main.Config.UPLOAD_CHUNK_BYTES}", file=sys.stderr)
+        print(f"{'file':>9}  {'mode':<9} {'peak memory':>12}  {'time':>8}", file=sys.stderr)
+        for mib in args.mib:
+            file_bytes = os.urandom(int(mib * 2 ** 20))
+            for label, build in (("buffered", buffered_body), ("streamed", streamed_body)):
+                peak, elapsed = measure(build, file_bytes, url)
+                print(f"{mib:>6.1f}MiB  {label:<9} {peak:>8.1f} MiB  {elapsed:>7.3f}s", file=sys.stderr)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
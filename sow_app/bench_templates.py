@@ -0,0 +1,106 @@
+# bench_templates.py - SOW TEMPLATE PARSE / RENDER BENCHMARK
+"""Time the steps of rendering each SOW template
+
+For every template in Config.TEMPLATE_MAPPING, prints the median of:
+    parse   Document(BytesIO(data)) - what every render paid before templates were pre-parsed
+    clone   copy.deepcopy(document) - what a render pays now (TemplateManager.get_docx_template)
+    render  DocxTemplate.render with a representative context
+    save    writing the rendered document to bytes
+and the end-to-end time of a render from a fresh parse versus from the pre-parsed copy.
+
+Usage:
+    python bench_templates.py --runs 40
+"""
+import argparse
+import copy
+import logging
+import statistics
+import sys
+import time
+from io import BytesIO
+
+from docx import Document
+from docxtpl import DocxTemplate
+
+import main
+
+REQUESTS = {
+    "T&M": {
+        "option": "T&M", "sow_num": "SOW-BENCH", "sow_name": "Support Desk", "Client_Name": "Cognex",
+        "start_date": "2026-01-01", "end_date": "2026-03-31", "scope_text": "Level 2 support",
+        "resources": [{"Role": "Engineer", "Location": "India", "Start Date": "2026-01-01",
+                       "End Date": "2026-03-31", "Allocation %": 100, "Hrs/Day": 8, "Rate/hr ($)": 40}]
+    },
+    "Fixed Fee": {
+        "option": "Fixed Fee", "sow_num": "SOW-BENCH", "sow_name": "Migration", "Client_Name": "BSC",
+        "start_date": "2026-02-01", "end_date": "2026-05-31", "scope_text": "Data migration", "Fees_al": 20000,
+        "milestones": [{"Milestone Description": "Cutover", "Milestone Date": "2026-05-15", "Amount": "20000"}]
+    },
+    "Change Order": {
+        "option": "Change Order", "sow_num": "SOW-BENCH", "sow_name": "Scope Extension", "Client_Name": "Itaros",
+        "start_date": "2026-03-01", "end_date": "2026-04-30", "scope_text": "Additional reports"
+    }
+}
+
+
+def median_ms(step, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        step()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def render_to_bytes(doc, context):
+    doc.render(context)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SOW template parse, clone and render times")
+    parser.add_argument("--runs", type=int, default=40, help="Runs per step; the median is shown (default: 40)")
+    args = parser.parse_args(argv)
+    main.logger.setLevel(logging.WARNING)
+
+    template_manager = main.TemplateManager()
+    print(f"📊 Median of {args.runs} runs (ms)", file=sys.stderr)
+    print(f"{'template':<14}{'parse':>8}{'clone':>8}{'render':>8}{'save':>8}   {'fresh parse':>12}{'pre-parsed':>12}",
+          file=sys.stderr)
+    for option, template_name in main.Config.TEMPLATE_MAPPING.items():
+        entry = template_manager._load_template(template_name)
+        if not entry:
+            print(f"{option:<14}template {template_name} not found", file=sys.stderr)
+            continue
+        data = entry["data"]
+        document = Document(BytesIO(data))
+        context = main.prepare_document_context(main.build_form_data(REQUESTS.get(option, {"option": option})))
+
+        def cloned():
+            doc = DocxTemplate(BytesIO(data))
+            doc.docx = copy.deepcopy(document)
+            return doc
+
+        def rendered():
+            doc = cloned()
+            doc.render(context)
+            return doc
+
+        parse = median_ms(lambda: Document(BytesIO(data)), args.runs)
+        clone = median_ms(lambda: copy.deepcopy(document), args.runs)
+        docs = [cloned() for _ in range(args.runs)]
+        render = median_ms(lambda: docs.pop().render(context), args.runs)
+        docs = [rendered() for _ in range(args.runs)]
+        save = median_ms(lambda: docs.pop().save(BytesIO()), args.runs)
+        fresh = median_ms(lambda: render_to_bytes(DocxTemplate(BytesIO(data)), context), args.runs)
+        pre_parsed = median_ms(lambda: render_to_bytes(template_manager.get_docx_template(option), context), args.runs)
+
+        print(f"{option:<14}{parse:>8.2f}{clone:>8.2f}{render:>8.2f}{save:>8.2f}   {fresh:>12.2f}{pre_parsed:>12.2f}",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,19 +1,38 @@
 # app.py - COMPLETE SOW MANAGEMENT SYSTEM WITH SHAREPOINT INTEGRATION
 from docxtpl import DocxTemplate
+from docx import Document
 import streamlit as st
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from io import BytesIO
 import pandas as pd
 import os
+import re
 import warnings
 import base64
+import hashlib
 import json
+import logging
 import requests
+import asyncio
+from requests.adapters import HTTPAdapter
 import time
+import random
+import copy
+from itertools import repeat
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import sqlite3
+import uuid
+import zipfile
 import numpy as np
 from pathlib import Path
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.utils import get_column_letter
 
 # Suppress warnings
@@ -221,6 +240,1320 @@ class Config:
     # SharePoint List Name
     SHAREPOINT_LIST = "SOW_Records"
     USERS_LIST = "Users"
+    
+    # HTTP connection pool for Power Automate calls (shared by all user sessions)
+    HTTP_POOL_CONNECTIONS = 4   # Number of host pools to keep
+    HTTP_POOL_MAXSIZE = 20      # Max keep-alive connections per host
+    HTTP_TIMEOUT = 30           # Seconds - read timeout for flows not listed below
+    HTTP_CONNECT_TIMEOUT = 5    # Seconds
+    HTTP_FLOW_TIMEOUTS = {
+        "check_user": 10,
+        "get_records": 20,
+        "get_sow_details": 15,
+        "get_document": 30,
+        "update_status": 15,
+        "save_record": 20,
+        "upload_document": 60
+    }
+    
+    # Retries for throttled / failing flow calls (exponential backoff with jitter, honours Retry-After)
+    HTTP_RETRY_ATTEMPTS = 4         # Total attempts per call
+    HTTP_RETRY_BASE_DELAY = 0.5     # Seconds, doubled per attempt
+    HTTP_RETRY_MAX_DELAY = 10       # Seconds
+    HTTP_CALL_BUDGET = 60           # Seconds a call may take across all attempts
+    # Flows that create items - only retried when the request cannot have been processed
+    HTTP_NON_IDEMPOTENT_FLOWS = {"save_record"}
+    
+    # Circuit breaker per flow - fail fast while a flow is down
+    CIRCUIT_FAILURE_THRESHOLD = 5   # Consecutive failed calls before the circuit opens
+    CIRCUIT_RESET_SECONDS = 30      # Seconds before a trial call is let through
+    
+    # Document uploads
+    UPLOAD_CHUNK_BYTES = 3 * 256 * 1024             # File bytes base64-encoded per step while streaming a body (multiple of 3)
+    UPLOAD_CHUNKED_THRESHOLD = 4 * 1024 * 1024      # Files this large go through start/append/commit chunked uploads
+    UPLOAD_CHUNKED_PART_BYTES = 3 * 1024 * 1024     # File bytes per append_chunk call
+    UPLOAD_CHUNK_RETRIES = 5                        # Failed append_chunk calls tolerated per upload before giving up
+    UPLOAD_DB_PATH = "data/sow_uploads.db"          # Uncommitted chunked uploads and the index of uploaded files
+    UPLOAD_INDEX_MAX_AGE = 24 * 3600                # Seconds an indexed upload is considered for dedupe
+    # Send large files in chunks. Needs the upload_document flow to support the start_upload,
+    # append_chunk, upload_status and commit_upload operations; if it answers start_upload
+    # without an upload_id, chunking is switched off for the rest of the process
+    UPLOAD_CHUNKED = os.environ.get("SOW_UPLOAD_CHUNKED", "").lower() in ("1", "true", "yes")
+    # Skip re-uploading unchanged documents. Off until the upload_document flow supports it:
+    #   upload_document  stores metadata.content_hash on the file
+    #   file_info        {library_name, folder_path, file_name} -> {"content_hash": <stored hash or "">}
+    #   update_metadata  {library_name, folder_path, file_name, metadata} -> {"success": true, "url": ...}
+    # An answer without those keys switches that operation off for the rest of the process
+    UPLOAD_DEDUPE = os.environ.get("SOW_UPLOAD_DEDUPE", "").lower() in ("1", "true", "yes")
+    
+    # On-disk LRU cache of downloaded documents (get_document), keyed by item ID and Modified stamp
+    DOCUMENT_CACHE_FOLDER = "data/document_cache"
+    DOCUMENT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+    PREFETCH_AHEAD = 3      # Pending SOWs after the selected one whose documents the approval dashboard prefetches
+    PREFETCH_WORKERS = 3
+    
+    # Flow call metrics (shown on the Flow Metrics page)
+    METRICS_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)  # Seconds
+    # Set SOW_METRICS_PORT to serve Prometheus text metrics on http://127.0.0.1:<port>/metrics
+    METRICS_PORT = int(os.environ.get("SOW_METRICS_PORT") or 0)
+    
+    # Shared cache of SOW record listings
+    RECORDS_CACHE_TTL = 60      # Seconds before a cached listing is re-fetched
+    RECORDS_FULL_RECONCILE = 900  # Seconds between full re-fetches (picks up deleted items)
+    
+    # Local SQLite mirror of SOW_Records used by the dashboards
+    RECORDS_DB_PATH = "data/sow_records.db"
+    
+    # Records fetched per dashboard page
+    DASHBOARD_PAGE_SIZE = 50
+    
+    # SOW number allocation
+    SOW_NUMBER_DB_PATH = "data/sow_numbers.db"
+    SOW_NUMBER_COUNTER_FILE = "data/sow_counter.txt"  # Legacy counter, used to seed the database
+    SOW_NUMBER_START = 1000
+    SOW_NUMBER_BLOCK_SIZE = 10  # Numbers reserved per process at a time (unused ones are skipped on restart)
+    
+    # Excel exports with more table rows than this use write-only (streaming) worksheets
+    EXCEL_STREAMING_ROWS = 1000
+    
+    # Holiday lists per resource Location: holidays/<Location>.txt, one YYYY-MM-DD per line
+    HOLIDAYS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "holidays")
+    
+    # Seconds between checks of a cached template file for changes
+    TEMPLATE_CHECK_INTERVAL = 5
+    
+    # Background approval jobs (document generation and upload after a reviewer approves)
+    JOBS_DB_PATH = "data/sow_jobs.db"
+    JOB_WORKERS = 2
+    JOB_MAX_ATTEMPTS = 5
+    JOB_RETRY_BASE_SECONDS = 30  # Doubles after each failed attempt
+    JOB_LEASE_SECONDS = 300      # Renewed while a job runs; a job whose worker stops renewing is picked up again
+    JOB_POLL_SECONDS = 2
+    
+    # Headless JSON API (api.py) - requests must send this value in the X-API-Key header
+    API_KEY = os.environ.get("SOW_API_KEY", "")
+    API_MAX_BODY_BYTES = 10 * 1024 * 1024
+    
+    # Logging - SOW_LOG_LEVEL=DEBUG turns on debug output; full payload dumps are
+    # additionally sampled so they stay cheap on busy servers
+    LOG_LEVEL = os.environ.get("SOW_LOG_LEVEL", "INFO").upper()
+    LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get("SOW_LOG_PAYLOAD_SAMPLE", "0.01"))
+    
+    # Local fallback log of saved SOW records (append-only)
+    LOCAL_LOG_DB_PATH = "data/sow_records_local.db"
+    LOCAL_LOG_LEGACY_CSV = "data/sow_records_local.csv"  # Imported once, then renamed
+    LOCAL_LOG_SYNC_EVERY = 100  # Appends between WAL checkpoints (the only points that fsync)
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+logger = logging.getLogger("sow_app")
+if not logger.handlers:
+    # Streamlit re-runs this module on every interaction - only attach the handler once
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+    logger.addHandler(_log_handler)
+    logger.propagate = False
+logger.setLevel(Config.LOG_LEVEL)
+
+class LazyJson:
+    """Defers json.dumps of a payload until a log record is actually emitted"""
+    __slots__ = ("payload",)
+    
+    def __init__(self, payload):
+        self.payload = payload
+    
+    def __str__(self):
+        return json.dumps(self.payload, default=str, indent=2)
+
+def log_payload(label, payload):
+    """Debug-log a full payload - only with DEBUG enabled, and only for a sample of calls"""
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < Config.LOG_PAYLOAD_SAMPLE_RATE:
+        logger.debug("%s: %s", label, LazyJson(payload))
+
+# ============================================================================
+# HTTP TRANSPORT
+# ============================================================================
+@st.cache_resource
+def get_http_session(pool_connections=Config.HTTP_POOL_CONNECTIONS, pool_maxsize=Config.HTTP_POOL_MAXSIZE):
+    """Get the keep-alive requests session shared across all user sessions in this server process"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+class CircuitBreaker:
+    """Fails calls fast while a flow keeps erroring
+    
+    After failure_threshold consecutive failures the circuit opens and calls are
+    refused for reset_seconds. Then one trial call is let through (half-open);
+    its outcome closes the circuit again or re-opens it.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+    
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+    
+    def allow(self):
+        """Whether a call may go out now - every allowed call must report its outcome"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+class StreamingJsonBody:
+    """JSON request body with one field holding base64 file content, encoded on the fly
+    
+    Iterating yields the body in chunks, base64-encoding chunk_size bytes of the
+    file at a time (Config.UPLOAD_CHUNK_BYTES by default), so the full encoded
+    string is never held in memory. len() gives the exact body size so requests
+    sends a Content-Length instead of a chunked body, and each iteration starts
+    over so retries can resend it.
+    """
+    
+    _PLACEHOLDER = "\x00file-content\x00"
+    
+    def __init__(self, payload, field, file_bytes, chunk_size=None):
+        text = json.dumps(dict(payload, **{field: self._PLACEHOLDER}), ensure_ascii=False)
+        prefix, suffix = text.split(json.dumps(self._PLACEHOLDER), 1)
+        self.prefix = (prefix + '"').encode("utf-8")
+        self.suffix = ('"' + suffix).encode("utf-8")
+        self.file = memoryview(file_bytes)
+        chunk_size = chunk_size or Config.UPLOAD_CHUNK_BYTES
+        self.chunk_size = chunk_size - chunk_size % 3  # Whole base64 groups, so chunks concatenate cleanly
+    
+    def __len__(self):
+        return len(self.prefix) + 4 * ((len(self.file) + 2) // 3) + len(self.suffix)
+    
+    def __iter__(self):
+        yield self.prefix
+        for start in range(0, len(self.file), self.chunk_size):
+            yield base64.b64encode(self.file[start:start + self.chunk_size])
+        yield self.suffix
+
+@st.cache_resource
+def get_circuit_breakers():
+    """Get the per-flow circuit breakers shared across all user sessions"""
+    return {
+        flow_name: CircuitBreaker(Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_SECONDS)
+        for flow_name in Config.POWER_AUTOMATE_URLS
+    }
+
+# ============================================================================
+# FLOW METRICS
+# ============================================================================
+class FlowMetrics:
+    """Process-wide call count, errors, latency histogram and payload sizes per flow"""
+    
+    def __init__(self, latency_buckets):
+        self.latency_buckets = tuple(latency_buckets)
+        self._lock = threading.Lock()
+        self._flows = {}
+    
+    def _new_flow(self):
+        return {
+            "calls": 0,
+            "errors": 0,
+            "attempts": 0,
+            "latency_sum": 0.0,
+            "latency_max": 0.0,
+            "request_bytes": 0,
+            "response_bytes": 0,
+            "bucket_counts": [0] * (len(self.latency_buckets) + 1)  # Last one is +Inf
+        }
+    
+    def record(self, flow_name, seconds, request_bytes=0, response_bytes=0, error=False, attempts=1):
+        """Record one flow call (including all of its retries)"""
+        bucket = next((i for i, bound in enumerate(self.latency_buckets) if seconds <= bound), len(self.latency_buckets))
+        with self._lock:
+            flow = self._flows.setdefault(flow_name, self._new_flow())
+            flow["calls"] += 1
+            flow["errors"] += int(bool(error))
+            flow["attempts"] += attempts
+            flow["latency_sum"] += seconds
+            flow["latency_max"] = max(flow["latency_max"], seconds)
+            flow["request_bytes"] += request_bytes
+            flow["response_bytes"] += response_bytes
+            flow["bucket_counts"][bucket] += 1
+    
+    def reset(self):
+        with self._lock:
+            self._flows = {}
+    
+    def snapshot(self):
+        """Copy of the current metrics: {flow_name: {...counters, "buckets": {upper_bound: cumulative count}}}"""
+        with self._lock:
+            flows = {name: dict(flow, bucket_counts=list(flow["bucket_counts"])) for name, flow in self._flows.items()}
+        
+        breakers = get_circuit_breakers()
+        snapshot = {}
+        for name, flow in sorted(flows.items()):
+            bounds = list(self.latency_buckets) + [float("inf")]
+            cumulative = np.cumsum(flow.pop("bucket_counts")).tolist()
+            flow["buckets"] = dict(zip(bounds, cumulative))
+            flow["latency_avg"] = flow["latency_sum"] / flow["calls"] if flow["calls"] else 0.0
+            flow["latency_p95"] = self._quantile(flow["buckets"], 0.95)
+            flow["circuit"] = breakers[name].state if name in breakers else "closed"
+            snapshot[name] = flow
+        return snapshot
+    
+    @staticmethod
+    def _quantile(buckets, q):
+        """Upper bound of the histogram bucket holding the q-th quantile"""
+        total = list(buckets.values())[-1]
+        if not total:
+            return 0.0
+        return next(bound for bound, count in buckets.items() if count >= q * total)
+    
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        
+        counters = (
+            ("sow_flow_calls_total", "calls", "Power Automate flow calls"),
+            ("sow_flow_errors_total", "errors", "Flow calls that failed or were refused by the circuit breaker"),
+            ("sow_flow_attempts_total", "attempts", "HTTP attempts made, including retries"),
+            ("sow_flow_request_bytes_total", "request_bytes", "Request body bytes sent"),
+            ("sow_flow_response_bytes_total", "response_bytes", "Response body bytes received")
+        )
+        for metric, key, help_text in counters:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{flow="{name}"}} {flow[key]}' for name, flow in snapshot.items()]
+        
+        lines += ["# HELP sow_flow_latency_seconds Flow call latency including retries",
+                  "# TYPE sow_flow_latency_seconds histogram"]
+        for name, flow in snapshot.items():
+            for bound, count in flow["buckets"].items():
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'sow_flow_latency_seconds_bucket{{flow="{name}",le="{le}"}} {count}')
+            lines.append(f'sow_flow_latency_seconds_sum{{flow="{name}"}} {flow["latency_sum"]:.6f}')
+            lines.append(f'sow_flow_latency_seconds_count{{flow="{name}"}} {flow["calls"]}')
+        
+        lines += ["# HELP sow_flow_circuit_open Whether the flow's circuit breaker is refusing calls",
+                  "# TYPE sow_flow_circuit_open gauge"]
+        lines += [f'sow_flow_circuit_open{{flow="{name}"}} {int(flow["circuit"] == "open")}' for name, flow in snapshot.items()]
+        
+        return "\n".join(lines) + "\n"
+    
+    def wsgi_app(self, environ, start_response):
+        """Minimal WSGI app serving GET /metrics"""
+        if environ.get("PATH_INFO") != "/metrics":
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"Not found\n"]
+        
+        body = self.to_prometheus().encode("utf-8")
+        start_response("200 OK", [("Content-Type", "text/plain; version=0.0.4"), ("Content-Length", str(len(body)))])
+        return [body]
+    
+    def serve(self, port):
+        """Serve /metrics on localhost from a daemon thread"""
+        from wsgiref.simple_server import make_server, WSGIRequestHandler
+        
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+        
+        server = make_server("127.0.0.1", port, self.wsgi_app, handler_class=QuietHandler)
+        threading.Thread(target=server.serve_forever, name="flow-metrics-endpoint", daemon=True).start()
+        logger.info("📈 Flow metrics at http://127.0.0.1:%s/metrics", port)
+
+@st.cache_resource
+def get_flow_metrics():
+    """Get the flow metrics registry shared across all user sessions (counts this process only)"""
+    return FlowMetrics(Config.METRICS_LATENCY_BUCKETS)
+
+@st.cache_resource
+def start_metrics_endpoint():
+    """Serve the Streamlit process's metrics on Config.METRICS_PORT (the JSON API has its own /metrics)"""
+    if not Config.METRICS_PORT:
+        return False
+    try:
+        get_flow_metrics().serve(Config.METRICS_PORT)
+        return True
+    except OSError as e:
+        logger.error("❌ Could not start metrics endpoint on port %s: %s", Config.METRICS_PORT, e)
+        return False
+
+# ============================================================================
+# RECORDS CACHE
+# ============================================================================
+class RecordsCache:
+    """Process-wide TTL cache of get_sow_records results keyed on the filter tuple"""
+    
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._key_locks = {}  # key -> [lock, number of callers using it]
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(filters):
+        """Build a hashable cache key from a filters dict"""
+        return tuple(sorted((name, str(value)) for name, value in filters.items()))
+    
+    def _evict_expired(self):
+        """Drop expired entries so one-off filter combinations don't pile up (caller holds _lock)"""
+        now = time.monotonic()
+        for key in [key for key, entry in self._entries.items() if now - entry[0] >= self.ttl_seconds]:
+            del self._entries[key]
+    
+    def _get_fresh(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                return entry[1]
+            return None
+    
+    def get_or_load(self, key, loader):
+        """Return the cached result for key, calling loader at most once per TTL across sessions"""
+        result = self._get_fresh(key)
+        if result is not None:
+            return result
+        
+        with self._lock:
+            self._evict_expired()
+            # Per-key locks are counted, and dropped only once no caller is using or waiting on them
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+        
+        try:
+            with key_lock[0]:
+                # Another session may have loaded it while we were waiting
+                result = self._get_fresh(key)
+                if result is not None:
+                    return result
+                
+                with self._lock:
+                    generation = self._generation
+                
+                result = loader()
+                
+                with self._lock:
+                    # Don't cache a listing that was invalidated while it was being fetched
+                    if result.get("success") and generation == self._generation:
+                        self._entries[key] = (time.monotonic(), result)
+                    self._evict_expired()
+                return result
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+    
+    def invalidate(self):
+        """Drop all cached listings (called after any write to SOW_Records)"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+class RecordsDeltaSync:
+    """Locally held SOW_Records frame kept current with "modified since" delta fetches"""
+    
+    # Re-request a little before the watermark so clock skew can't drop changes (merges are idempotent)
+    WATERMARK_OVERLAP = timedelta(minutes=1)
+    
+    def __init__(self, full_reconcile_seconds):
+        self.full_reconcile_seconds = full_reconcile_seconds
+        self.frame = None  # Indexed by ID
+        self.watermark = None
+        self.last_full_sync = 0.0
+        self._lock = threading.Lock()
+    
+    def has_full_listing(self):
+        """True once a full sync has completed in this process"""
+        return self.frame is not None
+    
+    def _needs_full_sync(self):
+        return (self.frame is None or not self.watermark or
+                time.monotonic() - self.last_full_sync >= self.full_reconcile_seconds)
+    
+    def _next_watermark(self, changes, started):
+        """Latest Modified stamp the server has returned so far
+        
+        A delta with no changes keeps the previous watermark. The local clock is only
+        used before the server has returned any Modified stamp - if SharePoint's clock
+        runs behind ours, a local-clock watermark would skip edits until the next full sync.
+        """
+        stamps = []
+        if not changes.empty and "Modified" in changes.columns:
+            # Compare as instants - string max breaks on mixed offsets or fractional seconds
+            stamps.append(pd.to_datetime(changes["Modified"], utc=True, errors="coerce").max())
+        if self.watermark:
+            stamps.append(pd.to_datetime(self.watermark, utc=True, errors="coerce"))
+        stamps = [stamp for stamp in stamps if not pd.isna(stamp)]
+        return (max(stamps) if stamps else started).strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    def _modified_since(self):
+        return (pd.to_datetime(self.watermark, utc=True) - self.WATERMARK_OVERLAP).strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    def sync(self, fetch):
+        """Bring the local frame up to date; fetch(filters) returns a get_records result dict"""
+        with self._lock:
+            full_sync = self._needs_full_sync()
+            started = datetime.now(timezone.utc)
+            
+            result = fetch({} if full_sync else {"modified_since": self._modified_since()})
+            if not result.get("success"):
+                return result
+            
+            changes = result["data"]
+            if not changes.empty and "ID" not in changes.columns:
+                # Can't merge without a key - keep the response as a full listing
+                full_sync = True
+            
+            if full_sync:
+                self.frame = changes.set_index("ID", drop=False) if "ID" in changes.columns else changes
+                self.last_full_sync = time.monotonic()
+            elif not changes.empty:
+                changes = changes.drop_duplicates("ID", keep="last").set_index("ID", drop=False)
+                self.frame = pd.concat([self.frame.drop(index=changes.index, errors="ignore"), changes])
+            
+            self.watermark = self._next_watermark(changes, started)
+            logger.info("✅ Records %s: %s changed, %s total",
+                        "full sync" if full_sync else "delta sync", len(changes), len(self.frame))
+            
+            return {
+                "success": True,
+                "data": self.frame.reset_index(drop=True),
+                "count": len(self.frame),
+                "changes": changes.reset_index(drop=True),
+                "full_sync": full_sync,
+                "message": "Records retrieved successfully"
+            }
+
+@st.cache_resource
+def get_records_delta_sync():
+    """Get the delta-synced SOW_Records frame shared across all user sessions"""
+    return RecordsDeltaSync(Config.RECORDS_FULL_RECONCILE)
+
+@st.cache_resource
+def get_records_cache():
+    """Get the SOW records cache shared across all user sessions"""
+    return RecordsCache(Config.RECORDS_CACHE_TTL)
+
+# ============================================================================
+# LOCAL SOW RECORDS MIRROR
+# ============================================================================
+class SowRecordsStore:
+    """Embedded SQLite mirror of SOW_Records with indexed filter columns"""
+    
+    INDEXED_COLUMNS = ["SOWNumber", "Status", "Client", "ProjectType", "CreatedBy", "GeneratedDate"]
+    
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{col} TEXT" for col in self.INDEXED_COLUMNS)
+            # record_key is "id:<ID>" for synced items, "local:<SOWNumber>" for saves not yet synced
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS sow_records ("
+                f"record_key TEXT PRIMARY KEY, ID TEXT, {columns}, data TEXT NOT NULL)"
+            )
+            for col in self.INDEXED_COLUMNS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_sow_records_{col} ON sow_records ({col})")
+    
+    def _to_row(self, record):
+        item_id = record.get("ID")
+        has_id = item_id is not None and not pd.isna(item_id)
+        record_key = f"id:{item_id}" if has_id else f"local:{record.get('SOWNumber', '')}"
+        values = [None if record.get(col) is None else str(record.get(col)) for col in self.INDEXED_COLUMNS]
+        return [record_key, str(item_id) if has_id else None] + values + [json.dumps(record, default=str)]
+    
+    def _rows(self, records):
+        if isinstance(records, pd.DataFrame):
+            records = records.to_dict(orient="records")
+        return [self._to_row(record) for record in records or []]
+    
+    def _write_rows(self, rows):
+        """Insert or replace rows (caller holds _lock inside a transaction)"""
+        if not rows:
+            return
+        # A synced item supersedes the local placeholder saved before SharePoint assigned its ID
+        self._conn.executemany(
+            "DELETE FROM sow_records WHERE record_key = ?",
+            [(f"local:{row[2]}",) for row in rows if row[1] is not None]
+        )
+        placeholders = ", ".join("?" * len(rows[0]))
+        self._conn.executemany(f"INSERT OR REPLACE INTO sow_records VALUES ({placeholders})", rows)
+    
+    def upsert(self, records):
+        """Insert or update records (a DataFrame or list of dicts)"""
+        rows = self._rows(records)
+        with self._lock, self._conn:
+            self._write_rows(rows)
+    
+    def replace_all(self, records):
+        """Replace all synced records with a full listing (drops items deleted in SharePoint)
+        
+        One transaction, so readers never see the mirror emptied between the delete and the insert.
+        """
+        rows = self._rows(records)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sow_records WHERE record_key LIKE 'id:%'")
+            self._write_rows(rows)
+    
+    def update(self, item_id, fields):
+        """Apply a partial update to a mirrored record"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sow_records WHERE record_key = ?", (f"id:{item_id}",)
+            ).fetchone()
+        if row:
+            record = json.loads(row[0])
+            record.update(fields)
+            self.upsert([record])
+    
+    def query(self, status=None, client=None, project_type=None, created_by=None, limit=None, offset=0):
+        """Return mirrored records matching the filters as a DataFrame"""
+        conditions = []
+        params = []
+        for col, value in (("Status", status), ("Client", client),
+                           ("ProjectType", project_type), ("CreatedBy", created_by)):
+            if value:
+                conditions.append(f"{col} = ?")
+                params.append(value)
+        
+        sql = "SELECT data FROM sow_records"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        # INSERT OR REPLACE gives an updated row a new rowid, so page by SharePoint ID
+        # (local saves not yet synced last) to keep records from moving between pages
+        sql += " ORDER BY ID IS NULL, CAST(ID AS INTEGER), ID, record_key"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return pd.DataFrame([json.loads(row[0]) for row in rows])
+    
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sow_records").fetchone()[0]
+
+@st.cache_resource
+def get_records_store():
+    """Get the SQLite SOW records mirror shared across all user sessions"""
+    return SowRecordsStore(Config.RECORDS_DB_PATH)
+
+# ============================================================================
+# LOCAL FALLBACK LOG
+# ============================================================================
+class LocalRecordLog:
+    """Append-only SQLite (WAL) log of SOW records saved locally
+    
+    Appends are single-row inserts, so their cost doesn't grow with the log.
+    Commits are not fsynced individually - the WAL is checkpointed (and fsynced)
+    every sync_every appends. compact() drops entries superseded by a later save
+    of the same SOW number.
+    """
+    
+    def __init__(self, db_path, sync_every=100):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self.sync_every = max(1, int(sync_every))
+        self._unsynced = 0
+        
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL in WAL mode only fsyncs at checkpoints
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS local_records ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, SOWNumber TEXT, "
+                "saved_at TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_local_records_sow ON local_records (SOWNumber)")
+    
+    def _insert(self, records):
+        saved_at = datetime.now().isoformat()
+        self._conn.executemany(
+            "INSERT INTO local_records (SOWNumber, saved_at, data) VALUES (?, ?, ?)",
+            [(record.get("SOWNumber"), saved_at, json.dumps(record, default=str)) for record in records]
+        )
+    
+    def append(self, record):
+        """Append a record to the log"""
+        with self._lock:
+            with self._conn:
+                self._insert([record])
+            
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self._checkpoint()
+    
+    def _checkpoint(self):
+        self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        self._unsynced = 0
+    
+    def sync(self):
+        """Flush pending appends to the main database file"""
+        with self._lock:
+            self._checkpoint()
+    
+    def compact(self):
+        """Keep only the latest entry per SOW number. Returns the number of entries removed"""
+        with self._lock:
+            with self._conn:
+                removed = self._conn.execute(
+                    "DELETE FROM local_records WHERE SOWNumber IS NOT NULL AND seq NOT IN "
+                    "(SELECT MAX(seq) FROM local_records WHERE SOWNumber IS NOT NULL GROUP BY SOWNumber)"
+                ).rowcount
+            self._checkpoint()
+        return removed
+    
+    def import_legacy_csv(self, csv_file):
+        """One-off import of the old sow_records_local.csv fallback file"""
+        if not os.path.exists(csv_file):
+            return 0
+        
+        legacy_df = pd.read_csv(csv_file)
+        records = legacy_df.astype(object).where(legacy_df.notna(), None).to_dict(orient="records")
+        with self._lock:
+            with self._conn:
+                self._insert(records)
+            self._checkpoint()
+        
+        os.replace(csv_file, csv_file + ".imported")
+        return len(records)
+    
+    def read_all(self):
+        """Return all logged records as a DataFrame, oldest first"""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM local_records ORDER BY seq").fetchall()
+        return pd.DataFrame([json.loads(row[0]) for row in rows])
+    
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM local_records").fetchone()[0]
+
+@st.cache_resource
+def get_local_record_log():
+    """Get the local fallback log shared across all user sessions (compacted on startup)"""
+    local_log = LocalRecordLog(Config.LOCAL_LOG_DB_PATH, sync_every=Config.LOCAL_LOG_SYNC_EVERY)
+    try:
+        imported = local_log.import_legacy_csv(Config.LOCAL_LOG_LEGACY_CSV)
+        if imported:
+            logger.info("📋 Imported %s records from %s", imported, Config.LOCAL_LOG_LEGACY_CSV)
+        removed = local_log.compact()
+        if removed:
+            logger.info("🧹 Compacted local record log: removed %s superseded entries", removed)
+    except Exception as e:
+        logger.warning("⚠️ Local record log maintenance failed: %s", e)
+    return local_log
+
+# ============================================================================
+# CHUNKED UPLOAD SESSIONS
+# ============================================================================
+class UploadSessionStore:
+    """Chunked uploads started but not yet committed, keyed on file content and destination
+    
+    The flow is the source of truth for how much of an upload it has acknowledged;
+    this only remembers the upload_id so a later attempt can ask and carry on.
+    """
+    
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_sessions ("
+                "session_key TEXT PRIMARY KEY, upload_id TEXT NOT NULL, file_name TEXT, "
+                "file_size INTEGER, created_at TEXT)"
+            )
+        finally:
+            conn.close()
+    
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    @staticmethod
+    def make_key(payload, file_bytes):
+        """Same file to the same library/folder/name -> same session"""
+        destination = f"{payload.get('library_name', '')}/{payload.get('folder_path', '')}/{payload.get('file_name', '')}"
+        return f"{hashlib.sha256(file_bytes).hexdigest()}:{destination}"
+    
+    def get(self, session_key):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT upload_id FROM upload_sessions WHERE session_key = ?", (session_key,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    
+    def put(self, session_key, upload_id, file_name, file_size):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO upload_sessions (session_key, upload_id, file_name, file_size, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_key, upload_id, file_name, file_size, datetime.now().isoformat())
+            )
+        finally:
+            conn.close()
+    
+    def delete(self, session_key):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM upload_sessions WHERE session_key = ?", (session_key,))
+        finally:
+            conn.close()
+
+@st.cache_resource
+def get_upload_session_store():
+    """Get the chunked upload session store shared across all user sessions"""
+    return UploadSessionStore(Config.UPLOAD_DB_PATH)
+
+class FlowCapabilities:
+    """Optional flow operations that a flow answered without supporting, remembered for the process
+    
+    Lets optional protocols (chunked uploads) be tried once and then skipped,
+    instead of costing a wasted round-trip on every call.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._unsupported = set()
+    
+    def supports(self, flow_name, operation):
+        with self._lock:
+            return (flow_name, operation) not in self._unsupported
+    
+    def mark_unsupported(self, flow_name, operation):
+        with self._lock:
+            self._unsupported.add((flow_name, operation))
+
+@st.cache_resource
+def get_flow_capabilities():
+    """Get the flow capabilities shared across all user sessions"""
+    return FlowCapabilities()
+
+# ============================================================================
+# UPLOAD DEDUPE INDEX
+# ============================================================================
+def document_content_hash(file_bytes):
+    """sha256 of a document's content
+    
+    .docx/.xlsx files are zip packages whose entry timestamps and docProps/core.xml
+    change every time they are rendered, so for those the hash covers the other
+    entries' names and uncompressed bytes. Anything else is hashed as-is.
+    """
+    try:
+        package = zipfile.ZipFile(BytesIO(file_bytes))
+    except zipfile.BadZipFile:
+        return hashlib.sha256(file_bytes).hexdigest()
+    
+    digest = hashlib.sha256()
+    with package:
+        for name in sorted(package.namelist()):
+            if name == "docProps/core.xml":
+                continue
+            data = package.read(name)
+            digest.update(f"{name}\0{len(data)}\0".encode("utf-8"))
+            digest.update(data)
+    return digest.hexdigest()
+
+class UploadIndex:
+    """What was last uploaded to each destination for each SOW number (content hash and metadata)"""
+    
+    # Changes on every call, so it is not compared
+    VOLATILE_METADATA = ("upload_timestamp",)
+    
+    def __init__(self, db_path, max_age):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.max_age = max_age
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploaded_files ("
+                "sow_number TEXT NOT NULL, destination TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "metadata TEXT, result TEXT, uploaded_at REAL, PRIMARY KEY (sow_number, destination))"
+            )
+        finally:
+            conn.close()
+    
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    @classmethod
+    def comparable_metadata(cls, metadata):
+        return json.dumps(
+            {key: value for key, value in (metadata or {}).items() if key not in cls.VOLATILE_METADATA},
+            sort_keys=True, default=str
+        )
+    
+    def lookup(self, sow_number, destination):
+        """The last upload to destination for this SOW, if recent enough to trust"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT content_hash, metadata, result FROM uploaded_files "
+                "WHERE sow_number = ? AND destination = ? AND uploaded_at >= ?",
+                (sow_number, destination, time.time() - self.max_age)
+            ).fetchone()
+        finally:
+            conn.close()
+        
+        if not row:
+            return None
+        return {"content_hash": row[0], "metadata": row[1], "result": json.loads(row[2] or "null")}
+    
+    def record(self, sow_number, destination, content_hash, metadata, result):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO uploaded_files "
+                "(sow_number, destination, content_hash, metadata, result, uploaded_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (sow_number, destination, content_hash, self.comparable_metadata(metadata),
+                 json.dumps(result, default=str), time.time())
+            )
+        finally:
+            conn.close()
+
+@st.cache_resource
+def get_upload_index():
+    """Get the uploaded-files index shared across all user sessions"""
+    return UploadIndex(Config.UPLOAD_DB_PATH, Config.UPLOAD_INDEX_MAX_AGE)
+
+# ============================================================================
+# DOCUMENT CACHE
+# ============================================================================
+class DocumentCache:
+    """Bounded on-disk LRU cache of downloaded SOW documents
+    
+    Entries are keyed by SharePoint item ID and a version stamp (see
+    document_version), so a changed document is fetched again. File mtimes track
+    recency; the least recently used files are evicted once the folder grows
+    past max_bytes.
+    """
+    
+    def __init__(self, folder, max_bytes):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        # Least recently used first
+        files = [entry for entry in os.scandir(folder) if entry.is_file() and entry.name.endswith(".bin")]
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        self._entries = OrderedDict((entry.path, entry.stat().st_size) for entry in files)
+        self._size = sum(self._entries.values())
+    
+    def _path(self, item_id, version):
+        item = re.sub(r"[^A-Za-z0-9_-]", "_", str(item_id))
+        version_hash = hashlib.sha256(str(version).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.folder, f"{item}__{version_hash}.bin")
+    
+    def get(self, item_id, version):
+        path = self._path(item_id, version)
+        with self._lock:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                self.misses += 1
+                self._forget(path)
+                return None
+            
+            self.hits += 1
+            self._entries[path] = len(data)
+            self._entries.move_to_end(path)
+            return data
+    
+    def put(self, item_id, version, data):
+        path = self._path(item_id, version)
+        item_prefix = os.path.basename(path).split("__")[0] + "__"
+        with self._lock:
+            # Older versions of the same document will not be asked for again
+            for stale in [p for p in self._entries if os.path.basename(p).startswith(item_prefix) and p != path]:
+                self._remove(stale)
+            
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            
+            self._forget(path)
+            self._entries[path] = len(data)
+            self._size += len(data)
+            
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+    
+    def _forget(self, path):
+        self._size -= self._entries.pop(path, 0)
+    
+    def _remove(self, path):
+        self._forget(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    def contains(self, item_id, version):
+        """Whether a version is cached (does not count as a hit or miss)"""
+        return os.path.exists(self._path(item_id, version))
+    
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
+
+@st.cache_resource
+def get_document_cache():
+    """Get the document download cache shared across all user sessions"""
+    return DocumentCache(Config.DOCUMENT_CACHE_FOLDER, Config.DOCUMENT_CACHE_MAX_BYTES)
+
+def document_version(record):
+    """Version stamp for a SOW record's document, or None if the record carries no modification stamp
+    
+    The item's ETag (else its Modified time) changes whenever the item does, and
+    DocumentURL changes when a document is uploaded under a new name. Without a
+    stamp the document is not cached - Status alone does not change on re-upload.
+    """
+    def value(name):
+        field = record.get(name)
+        return "" if field is None or pd.isna(field) else str(field)
+    
+    stamp = value("@odata.etag") or value("ETag") or value("Modified")
+    if not stamp:
+        return None
+    return f"{stamp}|{value('DocumentURL')}"
+
+class DocumentPrefetcher:
+    """Downloads SOW documents into the document cache on a background thread pool"""
+    
+    def __init__(self, workers):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="document-prefetch")
+        self._lock = threading.Lock()
+        self._in_flight = {}
+    
+    def prefetch(self, records):
+        """Queue downloads for records whose documents are not cached or already on the way
+        
+        Records without a modification stamp are skipped - their downloads are not cached.
+        """
+        cache = get_document_cache()
+        for record in records:
+            item_id = record.get("ID")
+            version = document_version(record)
+            if not item_id or not version or cache.contains(item_id, version):
+                continue
+            
+            key = (str(item_id), str(version))
+            with self._lock:
+                if key not in self._in_flight:
+                    self._in_flight[key] = self._executor.submit(self._fetch, key, item_id, version)
+    
+    def wait(self, item_id, version, timeout=None):
+        """Block until an in-flight prefetch of this document finishes, so it is not downloaded twice"""
+        if not version:
+            return
+        with self._lock:
+            future = self._in_flight.get((str(item_id), str(version)))
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+    
+    def _fetch(self, key, item_id, version):
+        try:
+            SharePointService().get_document(item_id=item_id, version=version)
+            logger.debug("📦 Prefetched document %s", item_id)
+        except Exception as e:
+            logger.warning("⚠️ Prefetch of document %s failed: %s", item_id, e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+@st.cache_resource
+def get_document_prefetcher():
+    """Get the document prefetcher shared across all user sessions"""
+    return DocumentPrefetcher(Config.PREFETCH_WORKERS)
+
+# ============================================================================
+# BACKGROUND APPROVAL JOBS
+# ============================================================================
+class ApprovalJobQueue:
+    """Durable SQLite queue of approval jobs, processed by background worker threads
+    
+    A job renders the SOW documents, uploads them and then marks the SOW approved
+    (see run_approval_job). Failed attempts are retried with exponential backoff.
+    
+    Each claim issues a fresh lease token. The worker renews its lease while the
+    job runs, and only the current holder of the token can complete or fail it -
+    a worker whose lease expired and was re-claimed can't overwrite the result.
+    """
+    
+    STATUS_QUEUED = "Queued"
+    STATUS_RUNNING = "Running"
+    STATUS_DONE = "Done"
+    STATUS_FAILED = "Failed"
+    
+    def __init__(self, db_path, max_attempts=5, retry_base_seconds=30, lease_seconds=300):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS approval_jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, item_id TEXT, sow_number TEXT, "
+                "payload TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_run_at REAL NOT NULL, lease_until REAL, lease_token TEXT, last_error TEXT, result TEXT, "
+                "created_by TEXT, created_at TEXT, updated_at TEXT)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(approval_jobs)")}
+            if "lease_token" not in columns:
+                conn.execute("ALTER TABLE approval_jobs ADD COLUMN lease_token TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_approval_jobs_status ON approval_jobs (status, next_run_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_approval_jobs_item ON approval_jobs (item_id)")
+        finally:
+            conn.close()
+    
+    def _connect(self):
+        # Autocommit mode so claim() can take the write lock explicitly
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    def enqueue(self, item_id, sow_number, payload, created_by=""):
+        """Queue an approval job. Returns (job_id, created) - an active job for the same item is reused"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = conn.execute(
+                "SELECT id FROM approval_jobs WHERE item_id = ? AND status IN (?, ?)",
+                (str(item_id), self.STATUS_QUEUED, self.STATUS_RUNNING)
+            ).fetchone()
+            if existing:
+                conn.execute("COMMIT")
+                return existing[0], False
+            
+            now = datetime.now().isoformat()
+            cursor = conn.execute(
+                "INSERT INTO approval_jobs (item_id, sow_number, payload, status, next_run_at, created_by, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(item_id), sow_number, json.dumps(payload, default=str), self.STATUS_QUEUED,
+                 time.time(), created_by, now, now)
+            )
+            conn.execute("COMMIT")
+            return cursor.lastrowid, True
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def claim(self):
+        """Take the next due job (or one whose worker died) and lease it to the caller"""
+        now = time.time()
+        lease_token = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM approval_jobs "
+                "WHERE (status = ? AND next_run_at <= ?) OR (status = ? AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (self.STATUS_QUEUED, now, self.STATUS_RUNNING, now)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE approval_jobs SET status = ?, attempts = attempts + 1, lease_until = ?, lease_token = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (self.STATUS_RUNNING, now + self.lease_seconds, lease_token, datetime.now().isoformat(), row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        
+        if not row:
+            return None
+        return {"id": row[0], "payload": json.loads(row[1]), "attempts": row[2] + 1, "lease_token": lease_token}
+    
+    def _update(self, job, **fields):
+        """Update a leased job. Returns False if the caller no longer holds its lease"""
+        fields["updated_at"] = datetime.now().isoformat()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._connect()
+        try:
+            return conn.execute(
+                f"UPDATE approval_jobs SET {assignments} WHERE id = ? AND status = ? AND lease_token = ?",
+                list(fields.values()) + [job["id"], self.STATUS_RUNNING, job["lease_token"]]
+            ).rowcount > 0
+        finally:
+            conn.close()
+    
+    def renew(self, job):
+        """Extend the caller's lease on a running job"""
+        return self._update(job, lease_until=time.time() + self.lease_seconds)
+    
+    def complete(self, job, result):
+        return self._update(job, status=self.STATUS_DONE, lease_until=None, lease_token=None, last_error=None,
+                            result=json.dumps(result, default=str))
+    
+    def fail(self, job, error):
+        """Schedule a retry with exponential backoff, or give up after max_attempts"""
+        if job["attempts"] >= self.max_attempts:
+            return self._update(job, status=self.STATUS_FAILED, lease_until=None, lease_token=None, last_error=error)
+        
+        delay = self.retry_base_seconds * (2 ** (job["attempts"] - 1))
+        return self._update(job, status=self.STATUS_QUEUED, lease_until=None, lease_token=None, last_error=error,
+                            next_run_at=time.time() + delay)
+    
+    def _keep_leased(self, job, stop):
+        """Renew the job's lease until stop is set, so a long-running job isn't handed to another worker"""
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.renew(job):
+                    logger.warning("⚠️ Approval job #%s lease was lost", job['id'])
+                    return
+            except Exception as e:
+                logger.error("❌ Could not renew lease of approval job #%s: %s", job['id'], e)
+    
+    def get(self, job_id):
+        """Status of one job as a dict, or None if there is no such job"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, sow_number, item_id, status, attempts, last_error, result, created_at, updated_at "
+                "FROM approval_jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        
+        if not row:
+            return None
+        job = dict(zip(("id", "sow_number", "item_id", "status", "attempts", "last_error", "result",
+                        "created_at", "updated_at"), row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+    
+    def retry_failed(self):
+        """Re-queue all failed jobs. Returns how many were re-queued"""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "UPDATE approval_jobs SET status = ?, attempts = 0, next_run_at = ?, updated_at = ? WHERE status = ?",
+                (self.STATUS_QUEUED, time.time(), datetime.now().isoformat(), self.STATUS_FAILED)
+            ).rowcount
+        finally:
+            conn.close()
+    
+    def recent(self, limit=50):
+        """Most recent jobs as a DataFrame for the dashboard"""
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT id, sow_number, item_id, status, attempts, last_error, created_by, created_at, updated_at "
+                "FROM approval_jobs ORDER BY id DESC LIMIT ?",
+                conn, params=(limit,)
+            )
+        finally:
+            conn.close()
+    
+    def work_forever(self):
+        """Worker loop - claim and run jobs until the process exits"""
+        while True:
+            try:
+                job = self.claim()
+            except Exception as e:
+                logger.error("❌ Approval job queue error: %s", e)
+                job = None
+            
+            if not job:
+                time.sleep(Config.JOB_POLL_SECONDS)
+                continue
+            
+            logger.info("⚙️ Running approval job #%s (attempt %s)", job['id'], job['attempts'])
+            stop_renewing = threading.Event()
+            threading.Thread(target=self._keep_leased, args=(job, stop_renewing),
+                             name=f"approval-job-lease-{job['id']}", daemon=True).start()
+            try:
+                result = run_approval_job(job["payload"])
+            except Exception as e:
+                result = {"success": False, "message": f"Error: {str(e)}"}
+            finally:
+                stop_renewing.set()
+            
+            try:
+                if result.get("success"):
+                    recorded = self.complete(job, result)
+                    logger.info("✅ Approval job #%s done", job['id'])
+                else:
+                    recorded = self.fail(job, result.get("message", "Unknown error"))
+                    logger.error("❌ Approval job #%s failed: %s", job['id'], result.get('message'))
+                if not recorded:
+                    logger.warning("⚠️ Approval job #%s was re-claimed by another worker - result not recorded", job['id'])
+            except Exception as e:
+                logger.error("❌ Could not record result of approval job #%s: %s", job['id'], e)
+    
+    def start_workers(self, count):
+        for number in range(count):
+            threading.Thread(target=self.work_forever, name=f"approval-job-worker-{number}", daemon=True).start()
+
+@st.cache_resource
+def get_approval_job_queue():
+    """Get the approval job queue and start its worker threads (once per server process)"""
+    job_queue = ApprovalJobQueue(
+        Config.JOBS_DB_PATH,
+        max_attempts=Config.JOB_MAX_ATTEMPTS,
+        retry_base_seconds=Config.JOB_RETRY_BASE_SECONDS,
+        lease_seconds=Config.JOB_LEASE_SECONDS
+    )
+    job_queue.start_workers(Config.JOB_WORKERS)
+    return job_queue
 
 # ============================================================================
 # SHAREPOINT SERVICE VIA POWER AUTOMATE
@@ -238,29 +1571,26 @@ class SharePointService:
                 "email": email
             }
             
-            print(f"🔍 DEBUG: Checking user {email} in SharePoint")
-            print(f"Payload: {json.dumps(payload, indent=2)}")
+            logger.debug("🔍 Checking user %s in SharePoint", email)
             
             result = self._call_power_automate("check_user", payload)
             
-            print(f"🔍 DEBUG: Raw result from flow: {result}")
-            print(f"🔍 DEBUG: Result type: {type(result)}")
+            log_payload("check_user result", result)
             
             # Handle the response based on your flow structure
             if result:
                 # If result is a dictionary
                 if isinstance(result, dict):
-                    print(f"🔍 DEBUG: Result keys: {list(result.keys())}")
+                    logger.debug("🔍 Result keys: %s", list(result.keys()))
                     
                     # Case 1: SharePoint Get Items response (has 'value' array)
                     if "value" in result:
                         items = result.get("value", [])
-                        print(f"🔍 DEBUG: Found {len(items)} items in 'value' array")
+                        logger.debug("🔍 Found %s items in 'value' array", len(items))
                         
                         if len(items) > 0:
                             user_data = items[0]
-                            print(f"🔍 DEBUG: User data keys: {list(user_data.keys())}")
-                            print(f"🔍 DEBUG: User data: {user_data}")
+                            logger.debug("🔍 User data keys: %s", list(user_data.keys()))
                             
                             # Try different possible field names for role
                             role_value = None
@@ -270,35 +1600,35 @@ class SharePointService:
                                 if role_field in user_data:
                                     role_field_found = role_field
                                     role_value = user_data.get(role_field)
-                                    print(f"🔍 DEBUG: Found role in field '{role_field}': '{role_value}' (type: {type(role_value)})")
+                                    logger.debug("🔍 Found role in field '%s': '%s' (type: %s)", role_field, role_value, type(role_value))
                                     break
                             
                             if role_value is None:
-                                print(f"⚠️ DEBUG: No role field found. Available fields: {list(user_data.keys())}")
+                                logger.warning("⚠️ No role field found. Available fields: %s", list(user_data.keys()))
                                 role_value = "user"  # Default
                             
                             # CRITICAL FIX: Handle different role value formats
                             # SharePoint often returns lookup fields as objects with Value property
                             if isinstance(role_value, dict):
-                                print(f"🔍 DEBUG: Role value is a dictionary. Attempting to extract Value...")
+                                logger.debug("🔍 Role value is a dictionary. Attempting to extract Value...")
                                 # Try to get Value from the dictionary (common in SharePoint lookups)
                                 if "Value" in role_value:
                                     role_value = role_value.get("Value", "user")
-                                    print(f"🔍 DEBUG: Extracted Value: '{role_value}'")
+                                    logger.debug("🔍 Extracted Value: '%s'", role_value)
                                 elif "value" in role_value:
                                     role_value = role_value.get("value", "user")
-                                    print(f"🔍 DEBUG: Extracted value: '{role_value}'")
+                                    logger.debug("🔍 Extracted value: '%s'", role_value)
                                 elif "results" in role_value:
                                     # For multi-value fields
                                     results = role_value.get("results", [])
                                     if results and len(results) > 0:
                                         role_value = results[0]
-                                        print(f"🔍 DEBUG: Extracted from results: '{role_value}'")
+                                        logger.debug("🔍 Extracted from results: '%s'", role_value)
                                     else:
                                         role_value = "user"
                                 else:
                                     # If we can't find a Value property, use a default
-                                    print(f"⚠️ DEBUG: Dictionary format not recognized: {role_value}")
+                                    logger.warning("⚠️ Dictionary format not recognized: %s", role_value)
                                     role_value = "user"
                             
                             # Ensure role_value is a string
@@ -306,7 +1636,7 @@ class SharePointService:
                             
                             # Now safely convert to lowercase
                             role_normalized = role_value.lower()
-                            print(f"🔍 DEBUG: Normalized role: '{role_normalized}'")
+                            logger.debug("🔍 Normalized role: '%s'", role_normalized)
                             
                             # Get email from response
                             email_value = None
@@ -400,7 +1730,7 @@ class SharePointService:
                     
                     # Case 4: Empty or unrecognized response
                     else:
-                        print(f"⚠️ DEBUG: Unrecognized response structure: {result}")
+                        logger.warning("⚠️ Unrecognized response structure: %s", result)
                         return {
                             "success": True,
                             "user_found": False,
@@ -424,9 +1754,7 @@ class SharePointService:
             }
             
         except Exception as e:
-            print(f"❌ Error checking user: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error checking user: %s", e)
             return {
                 "success": False,
                 "user_found": False,
@@ -444,12 +1772,14 @@ class SharePointService:
                 "updates": sow_data
             }
             
-            print(f"🔍 DEBUG: Updating SOW record {item_id}")
-            print(f"Update data: {json.dumps(sow_data, default=str, indent=2)}")
+            logger.debug("🔍 Updating SOW record %s (%s fields)", item_id, len(sow_data))
+            log_payload("update_item data", sow_data)
             
             result = self._call_power_automate("update_status", payload)  # Reusing update_status flow
             
             if result:
+                get_records_cache().invalidate()
+                get_records_store().update(item_id, sow_data)
                 return {
                     "success": True,
                     "data": result,
@@ -460,7 +1790,7 @@ class SharePointService:
                     "message": "Failed to update SOW record"
                 }
         except Exception as e:
-            print(f"❌ Error updating SOW record: {str(e)}")
+            logger.error("❌ Error updating SOW record: %s", e)
             return {
                 "success": False,
                 "message": f"Error: {str(e)}"
@@ -468,50 +1798,42 @@ class SharePointService:
     
     def __init__(self):
         self.config = Config()
+        self.http = get_http_session()
     
-    def _call_power_automate(self, flow_name, payload=None):
-        """Call Power Automate flow - FIXED VERSION"""
+    def _call_power_automate(self, flow_name, payload=None, file_bytes=None):
+        """Call Power Automate flow - FIXED VERSION
+        
+        Pass file_bytes to send them as the payload's base64 "file_content" field,
+        streamed into the request body rather than built up in memory.
+        """
         try:
             url = self.config.POWER_AUTOMATE_URLS.get(flow_name)
             if not url:
-                print(f"❌ No URL for flow: {flow_name}")
+                logger.error("❌ No URL for flow: %s", flow_name)
                 return None
             
-            headers = {"Content-Type": "application/json"}
-            
-            print(f"🔍 DEBUG: Calling {flow_name} flow")
-            print(f"🔍 DEBUG: URL: {url}")
-            
-            if payload:
+            if file_bytes is not None:
+                body = StreamingJsonBody(payload or {}, "file_content", file_bytes)
+                logger.debug("🔍 Calling %s flow (%s bytes, streamed)", flow_name, len(body))
+                
+                response = self._post_flow(flow_name, url, body)
+            elif payload:
                 # CRITICAL FIX: Use ensure_ascii=False to preserve binary data
                 json_payload = json.dumps(payload, ensure_ascii=False)
+                logger.debug("🔍 Calling %s flow (%s chars)", flow_name, len(json_payload))
                 
-                # Debug: Check if file_content is in the payload
-                if 'file_content' in payload:
-                    fc = payload['file_content']
-                    print(f"🔍 DEBUG: file_content in payload:")
-                    print(f"  - Type: {type(fc)}")
-                    print(f"  - Length: {len(fc) if fc else 0}")
-                    print(f"  - First 50 chars: {fc[:50] if fc else 'EMPTY'}")
-                    print(f"  - Is string: {isinstance(fc, str)}")
-                    print(f"  - Not empty: {bool(fc)}")
-                else:
-                    print("❌ ERROR: file_content NOT in payload!")
-                
-                print(f"🔍 DEBUG: Sending JSON payload ({len(json_payload)} chars)")
-                
-                try:
-                    response = requests.post(url, data=json_payload.encode('utf-8'), headers=headers, timeout=30)
-                except Exception as req_error:
-                    print(f"❌ Request error: {req_error}")
-                    return None
+                response = self._post_flow(flow_name, url, json_payload.encode('utf-8'))
             else:
-                response = requests.post(url, headers=headers, timeout=30)
+                logger.debug("🔍 Calling %s flow", flow_name)
+                response = self._post_flow(flow_name, url)
+            
+            if response is None:
+                return None
             
-            print(f"🔍 DEBUG: Response status: {response.status_code}")
+            logger.debug("🔍 %s flow responded %s", flow_name, response.status_code)
             
             if response.status_code != 200:
-                print(f"❌ ERROR Response: {response.text[:500]}")
+                logger.error("❌ %s flow returned %s: %s", flow_name, response.status_code, response.text[:500])
             
             response.raise_for_status()
             
@@ -521,9 +1843,95 @@ class SharePointService:
                 return {"success": True, "raw": response.text}
                 
         except Exception as e:
-            print(f"❌ Error in _call_power_automate: {str(e)}")
+            logger.error("❌ Error in _call_power_automate: %s", e)
             return None
     
+    def _post_flow(self, flow_name, url, data=None):
+        """POST to a flow with retries, the flow's timeout and its circuit breaker
+        
+        Returns the last response, or None when the circuit is open or no response came back.
+        """
+        metrics = get_flow_metrics()
+        started = time.monotonic()
+        request_bytes = len(data) if data else 0
+        
+        breaker = get_circuit_breakers()[flow_name]
+        if not breaker.allow():
+            logger.warning("⚡ %s flow is failing - circuit open, not calling it for now", flow_name)
+            metrics.record(flow_name, 0.0, error=True, attempts=0)
+            return None
+        
+        read_timeout = self.config.HTTP_FLOW_TIMEOUTS.get(flow_name, self.config.HTTP_TIMEOUT)
+        deadline = time.monotonic() + self.config.HTTP_CALL_BUDGET
+        retry_any_failure = flow_name not in self.config.HTTP_NON_IDEMPOTENT_FLOWS
+        
+        attempt = 1
+        try:
+            while True:
+                # Counts as a failure until this attempt gets a response
+                failed = True
+                response = None
+                timeout = (self.config.HTTP_CONNECT_TIMEOUT, max(1, min(read_timeout, deadline - time.monotonic())))
+                try:
+                    response = self.http.post(url, data=data, timeout=timeout)
+                    failed = response.status_code >= 500
+                    # 429/503 mean the flow did not run; 502/504 may come back after it did
+                    retryable = response.status_code in (429, 503) or (
+                        retry_any_failure and response.status_code in (502, 504)
+                    )
+                    error = f"HTTP {response.status_code}"
+                except requests.exceptions.RequestException as req_error:
+                    failed = True
+                    # A connect timeout never reached the flow, so it is safe to retry for every flow
+                    retryable = retry_any_failure or isinstance(req_error, requests.exceptions.ConnectTimeout)
+                    error = str(req_error)
+                
+                if not retryable or attempt >= self.config.HTTP_RETRY_ATTEMPTS:
+                    break
+                
+                delay = self._retry_delay(attempt, response)
+                if time.monotonic() + delay >= deadline:
+                    logger.warning("⏱️ %s flow: no time left in the call budget to retry", flow_name)
+                    break
+                
+                logger.warning("🔁 %s flow: %s - retrying in %.1fs (attempt %s/%s)", flow_name, error, delay, attempt + 1, self.config.HTTP_RETRY_ATTEMPTS)
+                time.sleep(delay)
+                attempt += 1
+        finally:
+            # Also reached when something other than a RequestException escapes (e.g. the body fails
+            # mid-send) - a half-open trial that never reports back would keep the circuit open for good
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        
+        metrics.record(
+            flow_name,
+            time.monotonic() - started,
+            request_bytes=request_bytes * attempt,
+            response_bytes=len(response.content) if response is not None else 0,
+            error=response is None or response.status_code >= 400,
+            attempts=attempt
+        )
+        
+        if response is None:
+            logger.error("❌ Request error: %s", error)
+        return response
+    
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt - Retry-After if the flow sent one, else backoff with full jitter"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+        
+        return random.uniform(0, min(self.config.HTTP_RETRY_MAX_DELAY, self.config.HTTP_RETRY_BASE_DELAY * 2 ** attempt))
+    
     def save_sow_record(self, sow_data):
         """Save SOW record to SharePoint list - MATCHES POWER AUTOMATE SCHEMA"""
         
@@ -533,13 +1941,16 @@ class SharePointService:
             "sow_data": sow_data
         }
         
-        # Debug: Show what we're sending
-        print("=== Sending to Power Automate ===")
-        print(json.dumps(payload, default=str, indent=2))
+        log_payload("create_sow_record payload", payload)
         
         result = self._call_power_automate("save_record", payload)
         
         if result:
+            get_records_cache().invalidate()
+            mirrored = dict(sow_data)
+            if isinstance(result, dict) and result.get("ID") is not None:
+                mirrored["ID"] = result["ID"]
+            get_records_store().upsert([mirrored])
             return {
                 "success": True,
                 "data": result,
@@ -552,9 +1963,13 @@ class SharePointService:
     
     def get_sow_records(self, status=None, status_filter=None, user_filter=None, 
                client_filter=None, project_type_filter=None,
-               date_from=None, date_to=None):
-        """Get SOW records from SharePoint"""
+               date_from=None, date_to=None, page_size=None, continuation_token=None,
+               force_refresh=False):
+        """Get SOW records from SharePoint (served from the shared records cache when fresh)
         
+        Pass page_size to fetch one page at a time; the result's next_token is the
+        continuation_token for the following page (None on the last page).
+        """
         # Handle both 'status' and 'status_filter' for backwards compatibility
         if status is not None:
             status_filter = status
@@ -582,49 +1997,83 @@ class SharePointService:
         
         payload["filters"] = filters
         
-        # DEBUG: Print what we're sending
-        print("=== GET RECORDS DEBUG ===")
-        print(f"Payload: {json.dumps(payload, indent=2)}")
+        # Paging parameters
+        page_params = {}
+        if page_size:
+            page_params["page_size"] = page_size
+            if continuation_token:
+                page_params["continuation_token"] = continuation_token
+        payload.update(page_params)
+        
+        records_cache = get_records_cache()
+        if force_refresh:
+            records_cache.invalidate()
+        
+        # Unfiltered listings are kept current with delta fetches instead of full re-fetches
+        if filters or page_params:
+            loader = lambda: self._fetch_filtered_records(payload)
+        else:
+            loader = lambda: self._sync_all_records(payload)
         
-        result = self._call_power_automate("get_records", payload)
+        result = records_cache.get_or_load(RecordsCache.make_key(dict(filters, **page_params)), loader)
         
-        # DEBUG: Print what we got back
-        print(f"Result type: {type(result)}")
-        print(f"Result: {result}")
+        # Hand each caller its own copy so sessions can't mutate the shared frame
+        if result.get("success"):
+            result = dict(result, data=result["data"].copy())
+        return result
+    
+    def _sync_all_records(self, payload):
+        """Refresh the full SOW_Records listing by merging a delta fetch into the shared frame"""
+        result = get_records_delta_sync().sync(
+            lambda filters: self._fetch_sow_records(dict(payload, filters=filters))
+        )
         
-        if result:
-            print(f"Result keys: {result.keys() if isinstance(result, dict) else 'Not a dict'}")
-            if isinstance(result, dict) and "items" in result:
-                print(f"Items count: {len(result['items'])}")
-                print(f"First item (if exists): {result['items'][0] if len(result['items']) > 0 else 'No items'}")
+        if result.get("success"):
+            # Feed only what changed into the local mirror
+            changes = result.pop("changes")
+            if result.pop("full_sync"):
+                get_records_store().replace_all(changes)
             else:
-                print(f"❌ 'items' key not found in result. Available keys: {list(result.keys()) if isinstance(result, dict) else 'N/A'}")
-        else:
-            print("❌ Result is None or empty")
+                get_records_store().upsert(changes)
+        return result
+    
+    def _fetch_filtered_records(self, payload):
+        """Fetch a filtered listing and feed it into the local mirror"""
+        result = self._fetch_sow_records(payload)
+        if result.get("success"):
+            get_records_store().upsert(result["data"])
+        return result
+    
+    def _fetch_sow_records(self, payload):
+        """Call the get_records flow and build a DataFrame from the returned items"""
+        log_payload("get_records payload", payload)
+        
+        result = self._call_power_automate("get_records", payload)
         
         if result and "items" in result:
             try:
-                print(f"✅ Attempting to create DataFrame from {len(result['items'])} items...")
                 df = pd.DataFrame(result["items"])
-                print(f"✅ DataFrame created successfully with {len(df)} rows")
-                print(f"DataFrame columns: {list(df.columns)}")
+                logger.debug("✅ get_records returned %s rows", len(df))
                 return {
                     "success": True,
                     "data": df,
                     "count": len(df),
+                    "next_token": result.get("next_token") or result.get("@odata.nextLink"),
                     "message": "Records retrieved successfully"
                 }
             except Exception as e:
-                print(f"❌ DataFrame creation error: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("❌ DataFrame creation error: %s", e)
                 return {
                     "success": False,
                     "error": str(e),
                     "message": f"Failed to parse records: {str(e)}"
                 }
         
-        print("❌ No items in result or result is None")
+        if result:
+            logger.error("❌ 'items' key not found in get_records result. Available keys: %s",
+                         list(result.keys()) if isinstance(result, dict) else "N/A")
+        else:
+            logger.error("❌ get_records returned no result")
         return {
             "success": False,
             "data": pd.DataFrame(),
@@ -669,6 +2118,8 @@ class SharePointService:
         
         result = self._call_power_automate("update_status", payload)
         if result:
+            get_records_cache().invalidate()
+            get_records_store().update(item_id, {"Status": status})
             return {
                 "success": True,
                 "data": result,
@@ -679,43 +2130,172 @@ class SharePointService:
             "message": "Failed to update status"
         }
     
+    def upload_file(self, payload, file_bytes):
+        """Send an upload_document payload with its file, unless SharePoint already has it
+        
+        With Config.UPLOAD_DEDUPE, if the same content was recently uploaded to the
+        same place for the same SOW number and the file_info operation confirms the
+        file in SharePoint still carries that content hash, nothing is sent when the
+        metadata is also unchanged; otherwise only the metadata is updated
+        (update_metadata operation). Anything else is a full upload.
+        
+        Only an index hit costs a file_info call; a first upload sends the file
+        straight away. See Config.UPLOAD_DEDUPE for what the flow must support.
+        """
+        capabilities = get_flow_capabilities()
+        if not self.config.UPLOAD_DEDUPE or not capabilities.supports("upload_document", "file_info"):
+            return self._send_file(payload, file_bytes)
+        
+        metadata = payload.get("metadata") or {}
+        sow_number = metadata.get("sow_number", "")
+        destination = f"{payload.get('library_name', '')}/{payload.get('folder_path', '')}/{payload.get('file_name', '')}"
+        content_hash = document_content_hash(file_bytes)
+        upload_index = get_upload_index()
+        # Stored with the file so a later upload can check what SharePoint actually has
+        payload = dict(payload, metadata=dict(metadata, content_hash=content_hash))
+        
+        previous = upload_index.lookup(sow_number, destination) if sow_number else None
+        unchanged_metadata = previous is not None and previous["metadata"] == UploadIndex.comparable_metadata(metadata)
+        # Confirming the content is only worth a call when it can save the upload
+        if (previous and previous["content_hash"] == content_hash
+                and (unchanged_metadata or capabilities.supports("upload_document", "update_metadata"))
+                and self._remote_content_hash(payload) == content_hash):
+            if unchanged_metadata:
+                logger.info("♻️ %s is unchanged in SharePoint - not sending it again", payload.get("file_name"))
+                return previous["result"]
+            
+            result = self._call_power_automate("upload_document", dict(payload, operation="update_metadata"))
+            if isinstance(result, dict) and "success" not in result:
+                capabilities.mark_unsupported("upload_document", "update_metadata")
+            elif result and result.get("success"):
+                logger.info("♻️ %s is unchanged - updated its metadata only", payload.get("file_name"))
+                upload_index.record(sow_number, destination, content_hash, metadata, result)
+                return result
+        
+        result = self._send_file(payload, file_bytes)
+        if result and sow_number:
+            upload_index.record(sow_number, destination, content_hash, metadata, result)
+        return result
+    
+    def _remote_content_hash(self, payload):
+        """content_hash stored on the file in SharePoint, or None if it is missing or can't be read"""
+        result = self._call_power_automate("upload_document", {
+            "operation": "file_info",
+            "library_name": payload.get("library_name", ""),
+            "folder_path": payload.get("folder_path", ""),
+            "file_name": payload.get("file_name", "")
+        })
+        if not isinstance(result, dict):
+            return None
+        if "content_hash" not in result and "metadata" not in result:
+            # The flow answered without either field - it has no file_info
+            get_flow_capabilities().mark_unsupported("upload_document", "file_info")
+            return None
+        return result.get("content_hash") or (result.get("metadata") or {}).get("content_hash")
+    
+    def _send_file(self, payload, file_bytes):
+        """Send an upload_document payload with its file
+        
+        With Config.UPLOAD_CHUNKED, files of UPLOAD_CHUNKED_THRESHOLD bytes or more
+        use the chunked protocol (start_upload / append_chunk / commit_upload on the
+        upload_document flow), which resumes from the last acknowledged chunk when
+        retried. If the flow does not support it, the file goes in a single request
+        and chunking is not tried again by this process.
+        """
+        if (not self.config.UPLOAD_CHUNKED or len(file_bytes) < self.config.UPLOAD_CHUNKED_THRESHOLD
+                or not get_flow_capabilities().supports("upload_document", "start_upload")):
+            return self._call_power_automate("upload_document", payload, file_bytes=file_bytes)
+        
+        session_key = UploadSessionStore.make_key(payload, file_bytes)
+        upload_id, offset = self._open_upload_session(session_key, payload, len(file_bytes))
+        if upload_id is None:
+            logger.warning("⚠️ Chunked upload not available for %s - sending it in one request", payload.get("file_name"))
+            return self._call_power_automate("upload_document", payload, file_bytes=file_bytes)
+        
+        return self._upload_chunks(session_key, upload_id, offset, payload, file_bytes)
+    
+    def _open_upload_session(self, session_key, payload, file_size):
+        """Resume this file's unfinished upload, or start a new one. Returns (upload_id, offset)"""
+        sessions = get_upload_session_store()
+        
+        upload_id = sessions.get(session_key)
+        if upload_id:
+            status = self._call_power_automate("upload_document", {"operation": "upload_status", "upload_id": upload_id})
+            if status and status.get("offset") is not None:
+                logger.info("⏯️ Resuming upload of %s at byte %s of %s", payload.get("file_name"), status["offset"], file_size)
+                return upload_id, int(status["offset"])
+            # The flow no longer knows the session (expired) - start again
+            sessions.delete(session_key)
+        
+        started = self._call_power_automate("upload_document", dict(
+            payload,
+            operation="start_upload",
+            file_size=file_size,
+            chunk_size=self.config.UPLOAD_CHUNKED_PART_BYTES
+        ))
+        if not isinstance(started, dict):
+            return None, 0
+        if not started.get("upload_id"):
+            # The flow answered but has no chunked upload - stop asking
+            get_flow_capabilities().mark_unsupported("upload_document", "start_upload")
+            return None, 0
+        
+        sessions.put(session_key, started["upload_id"], payload.get("file_name"), file_size)
+        return started["upload_id"], int(started.get("offset", 0))
+    
+    def _upload_chunks(self, session_key, upload_id, offset, payload, file_bytes):
+        """append_chunk from offset to the end, then commit_upload. Returns the commit result or None"""
+        file_view = memoryview(file_bytes)
+        part_size = self.config.UPLOAD_CHUNKED_PART_BYTES
+        failures = 0
+        
+        while offset < len(file_view):
+            result = self._call_power_automate(
+                "upload_document",
+                {"operation": "append_chunk", "upload_id": upload_id, "offset": offset},
+                file_bytes=file_view[offset:offset + part_size]
+            )
+            if result and result.get("offset") is not None:
+                # The flow acknowledges the offset it now has - normally offset + chunk length
+                offset = int(result["offset"])
+                failures = 0
+                continue
+            
+            failures += 1
+            if failures > self.config.UPLOAD_CHUNK_RETRIES:
+                logger.error("❌ Upload of %s stopped at byte %s of %s - the next attempt resumes from there",
+                             payload.get("file_name"), offset, len(file_view))
+                return None
+            
+            # The chunk may have landed even though the response was lost - ask the flow where it is
+            status = self._call_power_automate("upload_document", {"operation": "upload_status", "upload_id": upload_id})
+            if status and status.get("offset") is not None:
+                offset = int(status["offset"])
+        
+        result = self._call_power_automate("upload_document", {"operation": "commit_upload", "upload_id": upload_id})
+        if result:
+            get_upload_session_store().delete(session_key)
+        return result
+    
     def upload_document(self, file_bytes, file_name, metadata):
         """Upload document to SharePoint - UPDATED FOR CORRECT PATH"""
         try:
-            print(f"🔍 DEBUG upload_document called:")
-            print(f"  - file_name: {file_name}")
-            print(f"  - file_bytes length: {len(file_bytes) if file_bytes else 'EMPTY'}")
+            logger.debug("🔍 upload_document %s (%s bytes)", file_name, len(file_bytes) if file_bytes else 0)
             
             if not file_bytes or len(file_bytes) == 0:
-                print("❌ ERROR: file_bytes is empty!")
+                logger.error("❌ ERROR: file_bytes is empty!")
                 return {"success": False, "message": "File bytes are empty"}
             
-            # Convert to Base64
-            try:
-                if hasattr(file_bytes, 'read'):
-                    file_bytes = file_bytes.read()
-                
-                file_base64 = base64.b64encode(file_bytes).decode('utf-8')
-                print(f"✅ DEBUG: Base64 conversion successful ({len(file_base64)} chars)")
-                
-                if not file_base64 or len(file_base64) < 10:
-                    raise ValueError("Base64 string too short or empty")
-                    
-            except Exception as conv_error:
-                print(f"❌ Base64 conversion error: {conv_error}")
-                return {
-                    "success": False,
-                    "error": str(conv_error),
-                    "message": "Failed to convert file to Base64"
-                }
+            if hasattr(file_bytes, 'read'):
+                file_bytes = file_bytes.read()
             
             # Build payload - UPDATED library_name
+            # file_content is base64-encoded into the request body as it is sent
             payload = {
                 "operation": "upload_document",
                 "library_name": "Onboarding Details",  # ✅ Changed
                 "folder_path": "SOWs",  # ✅ Added folder
                 "file_name": file_name,
-                "file_content": file_base64,
                 "metadata": {
                     "sow_number": metadata.get("sow_number", ""),
                     "created_by": metadata.get("created_by", ""),
@@ -725,13 +2305,11 @@ class SharePointService:
                 }
             }
             
-            print(f"✅ DEBUG: Final payload ready")
-            
             # Call Power Automate
-            result = self._call_power_automate("upload_document", payload)
+            result = self.upload_file(payload, file_bytes)
             
             if result:
-                print(f"✅ SUCCESS: Power Automate returned: {result}")
+                logger.info("✅ Uploaded %s", file_name)
                 return {
                     "success": True,
                     "data": result,
@@ -744,18 +2322,27 @@ class SharePointService:
             }
                 
         except Exception as e:
-            print(f"❌ FATAL ERROR in upload_document: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ FATAL ERROR in upload_document: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "message": f"Fatal error: {str(e)}"
             }
     
-    def get_document(self, item_id=None, file_name=None, library_name=None):
-        """Get document from SharePoint"""
+    def get_document(self, item_id=None, file_name=None, library_name=None, version=None):
+        """Get document from SharePoint
+        
+        With item_id and version (see document_version), repeat downloads are
+        served from the local document cache without calling the flow.
+        """
         try:
+            use_cache = bool(item_id) and bool(version)
+            if use_cache:
+                cached = get_document_cache().get(item_id, version)
+                if cached is not None:
+                    logger.debug("📦 Document %s served from cache", item_id)
+                    return cached
+            
             # Build payload based on available parameters
             if item_id:
                 # Get document using item ID from list
@@ -773,7 +2360,7 @@ class SharePointService:
             else:
                 return None
             
-            print(f"🔍 DEBUG: Getting document with payload: {payload}")
+            logger.debug("🔍 Getting document %s", item_id or file_name)
             
             result = self._call_power_automate("get_document", payload)
             
@@ -782,30 +2369,194 @@ class SharePointService:
                 file_content_base64 = result.get("file_content")
                 if file_content_base64:
                     file_bytes = base64.b64decode(file_content_base64)
+                    if use_cache:
+                        get_document_cache().put(item_id, version, file_bytes)
                     return file_bytes
             
             return None
             
         except Exception as e:
-            print(f"❌ Error getting document: {str(e)}")
+            logger.error("❌ Error getting document: %s", e)
             return None
 
+# ============================================================================
+# ASYNC SHAREPOINT SERVICE
+# ============================================================================
+class AsyncSharePointService:
+    """Asyncio variant of SharePointService for issuing independent flow calls concurrently"""
+    
+    def __init__(self, sharepoint_service=None):
+        # Reuse the caller's service so calls share the same keep-alive session
+        self.service = sharepoint_service or SharePointService()
+    
+    async def call(self, func, *args, **kwargs):
+        """Run a blocking flow call on a worker thread without blocking the event loop"""
+        return await asyncio.to_thread(func, *args, **kwargs)
+    
+    async def upload_document(self, file_bytes, file_name, metadata):
+        return await self.call(self.service.upload_document, file_bytes, file_name, metadata)
+    
+    async def upload_excel(self, file_data, file_name, metadata, folder_name):
+        return await self.call(upload_excel_to_sharepoint_folder, self.service,
+                               file_data, file_name, metadata, folder_name)
+    
+    async def update_sow_status(self, item_id, status, comments="", approver_email=""):
+        return await self.call(self.service.update_sow_status, item_id, status, comments, approver_email)
+    
+    async def save_sow_record(self, sow_data):
+        return await self.call(self.service.save_sow_record, sow_data)
+    
+    async def get_document(self, item_id=None, file_name=None, library_name=None, version=None):
+        return await self.call(self.service.get_document, item_id, file_name, library_name, version)
+    
+    async def gather(self, *calls, limit=None):
+        """Await independent flow calls concurrently - failures come back as error results
+        
+        limit caps how many calls are in flight at once (None = all of them).
+        """
+        if limit:
+            semaphore = asyncio.Semaphore(limit)
+            
+            async def bounded(call):
+                async with semaphore:
+                    return await call
+            
+            calls = [bounded(call) for call in calls]
+        
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        return [
+            {"success": False, "error": str(r), "message": f"Error: {str(r)}"}
+            if isinstance(r, Exception) else r
+            for r in results
+        ]
+    
+    def run_concurrently(self, *calls, limit=None):
+        """Sync facade for Streamlit pages - returns results in the same order as the calls"""
+        return asyncio.run(self.gather(*calls, limit=limit))
+
 # ============================================================================
 # EXCEL EXPORTER CLASS
 # ============================================================================
 class ExcelExporter:
-    """Class to handle Excel file creation for SOW data"""
+    """Class to handle Excel file creation for SOW data
     
-    def __init__(self, output_folder="generated_excels"):
+    Workbooks are built in memory and returned as bytes. Pass persist=True to
+    also keep a copy in output_folder. Large tables are written with write-only
+    (streaming) worksheets; styles are shared named styles built once per exporter.
+    """
+    
+    def __init__(self, output_folder="generated_excels", persist=False, streaming=None):
         self.output_folder = output_folder
-        self.ensure_folder_exists()
+        self.persist = persist
+        # None = switch to write-only worksheets once a table exceeds Config.EXCEL_STREAMING_ROWS
+        self.streaming = streaming
+        self.styles = self._build_named_styles()
+        if self.persist:
+            self.ensure_folder_exists()
     
     def ensure_folder_exists(self):
         """Create output folder if it doesn't exist"""
         os.makedirs(self.output_folder, exist_ok=True)
     
+    @staticmethod
+    def _build_named_styles():
+        """Build the named styles shared by every workbook this exporter writes"""
+        thin = Side(style='thin')
+        thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        
+        styles = [
+            NamedStyle(name="sow_bold", font=Font(bold=True)),
+            NamedStyle(name="sow_section", font=Font(bold=True, size=12)),
+            # Plain data cells keep the workbook's default font
+            NamedStyle(name="sow_cell", font=DEFAULT_FONT, border=thin_border),
+            NamedStyle(name="sow_number", font=DEFAULT_FONT, border=thin_border, number_format='#,##0.00'),
+            NamedStyle(name="sow_amount", font=Font(bold=True), border=thin_border, number_format='#,##0.00'),
+            NamedStyle(name="sow_total", font=Font(bold=True), number_format='#,##0.00')
+        ]
+        for color in ("366092", "4472C4"):
+            styles.append(NamedStyle(name=f"sow_title_{color}", font=Font(bold=True, size=14, color=color)))
+            styles.append(NamedStyle(
+                name=f"sow_header_{color}",
+                font=Font(bold=True, color="FFFFFF", size=12),
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+                alignment=Alignment(horizontal="center"),
+                border=thin_border
+            ))
+        
+        return {style.name: style for style in styles}
+    
+    def _use_streaming(self, table_df):
+        if self.streaming is not None:
+            return self.streaming
+        return table_df is not None and len(table_df) > Config.EXCEL_STREAMING_ROWS
+    
+    def _write_workbook(self, title, rows, merges, widths, streaming):
+        """Write rows of (value, style_name) cells to a single-sheet workbook
+        
+        In streaming mode rows are appended to a write-only worksheet as they are
+        generated, so no per-cell objects are kept in memory.
+        """
+        wb = openpyxl.Workbook(write_only=streaming)
+        for style in self.styles.values():
+            wb.add_named_style(style)
+        
+        if streaming:
+            ws = wb.create_sheet(title)
+        else:
+            ws = wb.active
+            ws.title = title
+        
+        # Column widths and merges must be set before a write-only sheet receives rows
+        for column_letter, width in widths.items():
+            ws.column_dimensions[column_letter].width = width
+        for cell_range in merges:
+            if streaming:
+                ws.merged_cells.add(CellRange(cell_range))
+            else:
+                ws.merge_cells(cell_range)
+        
+        for row_idx, row in enumerate(rows, 1):
+            if streaming:
+                ws.append([self._write_only_cell(ws, value, style) for value, style in row])
+                continue
+            
+            for col_idx, (value, style) in enumerate(row, 1):
+                if value is None and style is None:
+                    continue
+                cell = ws.cell(row=row_idx, column=col_idx, value=value)
+                if style:
+                    cell.style = style
+        
+        return wb
+    
+    @staticmethod
+    def _write_only_cell(ws, value, style):
+        if style is None:
+            return value
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    
+    @staticmethod
+    def _format_date(value):
+        return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+    
+    def _workbook_bytes(self, wb, file_name):
+        """Serialize a workbook to bytes, writing a copy to disk only when persisting"""
+        buffer = BytesIO()
+        wb.save(buffer)
+        excel_bytes = buffer.getvalue()
+        
+        if self.persist:
+            file_path = os.path.join(self.output_folder, file_name)
+            with open(file_path, "wb") as f:
+                f.write(excel_bytes)
+            logger.info("💾 Saved Excel copy: %s", file_path)
+        
+        return excel_bytes
+    
     def create_fixed_fee_milestone_excel(self, sow_data, milestone_df):
-        """Create Excel file for Fixed Fee milestone payments - UPDATED WITH BETTER ERROR HANDLING"""
+        """Create Excel workbook for Fixed Fee milestone payments and return its bytes (None on failure)"""
         try:
             # Extract data with better defaults
             sow_number = sow_data.get("sow_num", "UNKNOWN")
@@ -828,51 +2579,8 @@ class ExcelExporter:
                 except:
                     end_date = date.today()
             
-            # Create workbook
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Milestone Payments"
-            
-            # Header styling
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            thin_border = Border(left=Side(style='thin'), 
-                                right=Side(style='thin'), 
-                                top=Side(style='thin'), 
-                                bottom=Side(style='thin'))
-            
-            # Write SOW Information
-            ws['A1'] = f"SOW: {sow_number} - {sow_name}"
-            ws['A1'].font = Font(bold=True, size=14, color="366092")
-            ws.merge_cells('A1:E1')
-            
-            ws['A2'] = f"Client: {client}"
-            ws['A2'].font = Font(bold=True)
-            
-            ws['A3'] = f"Total Contract Value: ${total_fees:,.2f}"
-            ws['A3'].font = Font(bold=True)
-            
-            ws['A4'] = f"Contract Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-            
-            # Blank row
-            ws['A6'] = "Milestone Payment Schedule"
-            ws['A6'].font = Font(bold=True, size=12)
-            ws.merge_cells('A6:E6')
-            
-            # Column headers for milestones
-            headers = ["Milestone #", "Services / Deliverables", "Due Date", 
-                    "Payment Allocation (%)", "Payment Amount ($)"]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=8, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = Alignment(horizontal="center")
-                cell.border = thin_border
-                ws.column_dimensions[get_column_letter(col)].width = 25
-            
-            # Write milestone data
-            if milestone_df is not None and not milestone_df.empty:
+            has_milestones = milestone_df is not None and not milestone_df.empty
+            if has_milestones:
                 # Ensure we have the right column names
                 column_mapping = {
                     'milestone_no': ['milestone_no', 'Milestone #', 'Milestone No'],
@@ -893,187 +2601,303 @@ class ExcelExporter:
                 # Convert date columns
                 if 'due_date' in milestone_df.columns:
                     milestone_df['due_date'] = pd.to_datetime(milestone_df['due_date']).dt.date
+            
+            def rows():
+                # SOW Information
+                yield [(f"SOW: {sow_number} - {sow_name}", "sow_title_366092")]
+                yield [(f"Client: {client}", "sow_bold")]
+                yield [(f"Total Contract Value: ${total_fees:,.2f}", "sow_bold")]
+                yield [(f"Contract Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}", None)]
+                yield []
+                yield [("Milestone Payment Schedule", "sow_section")]
+                yield []
+                
+                # Column headers for milestones
+                headers = ["Milestone #", "Services / Deliverables", "Due Date", 
+                        "Payment Allocation (%)", "Payment Amount ($)"]
+                yield [(header, "sow_header_366092") for header in headers]
                 
-                # Write data rows
-                for idx, row in enumerate(milestone_df.itertuples(), 9):
+                if not has_milestones:
+                    yield from ([] for _ in range(6))
+                    yield [("Summary", "sow_section")]
+                    return
+                
+                # Milestone data rows
+                for number, row in enumerate(milestone_df.itertuples(), 1):
                     # Get values with defaults
-                    milestone_no = getattr(row, 'milestone_no', f'M{idx-8}') if hasattr(row, 'milestone_no') else f'M{idx-8}'
-                    services = getattr(row, 'services', '') if hasattr(row, 'services') else ''
-                    due_date = getattr(row, 'due_date', date.today()) if hasattr(row, 'due_date') else date.today()
-                    allocation = float(getattr(row, 'allocation', 0)) if hasattr(row, 'allocation') else 0
-                    net_pay = float(getattr(row, 'net_pay', 0)) if hasattr(row, 'net_pay') else 0
-                    
-                    # Write values
-                    ws.cell(row=idx, column=1, value=milestone_no)
-                    ws.cell(row=idx, column=2, value=services)
-                    ws.cell(row=idx, column=3, value=due_date.strftime('%Y-%m-%d') if hasattr(due_date, 'strftime') else str(due_date))
-                    ws.cell(row=idx, column=4, value=allocation)
-                    ws.cell(row=idx, column=5, value=net_pay)
+                    milestone_no = getattr(row, 'milestone_no', f'M{number}')
+                    services = getattr(row, 'services', '')
+                    due_date = getattr(row, 'due_date', date.today())
+                    allocation = float(getattr(row, 'allocation', 0))
+                    net_pay = float(getattr(row, 'net_pay', 0))
                     
-                    # Add formatting
-                    for col in range(1, 6):
-                        cell = ws.cell(row=idx, column=col)
-                        cell.border = thin_border
-                        if col in [4, 5]:
-                            cell.number_format = '#,##0.00'
-                        if col == 5:
-                            cell.font = Font(bold=True)
+                    yield [
+                        (milestone_no, "sow_cell"),
+                        (services, "sow_cell"),
+                        (self._format_date(due_date), "sow_cell"),
+                        (allocation, "sow_number"),
+                        (net_pay, "sow_amount")
+                    ]
                 
-                # Calculate totals
-                total_row = len(milestone_df) + 10
-                ws.cell(row=total_row, column=4, value="Total:").font = Font(bold=True)
+                # Totals
                 total_pay = milestone_df['net_pay'].sum() if 'net_pay' in milestone_df.columns else 0
-                ws.cell(row=total_row, column=5, value=total_pay)
-                ws.cell(row=total_row, column=5).font = Font(bold=True)
-                ws.cell(row=total_row, column=5).number_format = '#,##0.00'
-            
-            # Add summary section
-            summary_row = total_row + 2 if milestone_df is not None and not milestone_df.empty else 15
-            ws.cell(row=summary_row, column=1, value="Summary").font = Font(bold=True, size=12)
+                yield []
+                yield [(None, None), (None, None), (None, None), ("Total:", "sow_bold"), (total_pay, "sow_total")]
+                
+                # Summary section
+                yield []
+                yield [("Summary", "sow_section")]
+            
+            wb = self._write_workbook(
+                "Milestone Payments", rows(),
+                merges=["A1:E1", "A6:E6"],
+                widths={get_column_letter(col): 25 for col in range(1, 6)},
+                streaming=self._use_streaming(milestone_df)
+            )
             
-            # Save file
+            # Serialize in memory
             file_name = f"{sow_number}_Milestone_Payments.xlsx"
-            file_path = os.path.join(self.output_folder, file_name)
-            wb.save(file_path)
+            excel_bytes = self._workbook_bytes(wb, file_name)
             
-            print(f"✅ Created milestone Excel: {file_path}")
-            return file_path
+            logger.info("✅ Created milestone Excel: %s (%s bytes)", file_name, len(excel_bytes))
+            return excel_bytes
             
         except Exception as e:
-            print(f"❌ Error creating milestone Excel: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error creating milestone Excel: %s", e)
             return None
     
     def create_tm_resource_excel(self, sow_data, resources_df):
-        """Create Excel file for T&M resource details - FIXED VERSION"""
+        """Create Excel workbook for T&M resource details and return its bytes (None on failure)"""
         try:
             # Extract data
             sow_number = sow_data.get("sow_num", "UNKNOWN")
             sow_name = sow_data.get("sow_name", "Unknown SOW")
             client = sow_data.get("Client_Name", "Unknown Client")
             
-            # Create workbook
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Resource Details"
-            
-            # Header styling
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            thin_border = Border(left=Side(style='thin'), 
-                                right=Side(style='thin'), 
-                                top=Side(style='thin'), 
-                                bottom=Side(style='thin'))
-            
-            # Write SOW Information
-            ws['A1'] = f"SOW: {sow_number} - {sow_name}"
-            ws['A1'].font = Font(bold=True, size=14, color="4472C4")
-            ws.merge_cells('A1:H1')
-            
-            ws['A2'] = f"Client: {client}"
-            ws['A2'].font = Font(bold=True)
-            
-            ws['A3'] = f"Project Type: T&M (Time & Materials)"
-            ws['A3'].font = Font(bold=True)
-            
-            # Blank row
-            ws['A5'] = "Resource Allocation Details"
-            ws['A5'].font = Font(bold=True, size=12)
-            ws.merge_cells('A5:H5')
-            
-            # Column headers for resources - FIXED to match your DataFrame
-            headers = ["Role", "Location", "Start Date", "End Date", 
-                      "Allocation %", "Hrs/Day", "Rate/hr ($)", "Estimated $"]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=7, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = Alignment(horizontal="center")
-                cell.border = thin_border
-                # Adjust column widths
-                ws.column_dimensions[get_column_letter(col)].width = 15
-            ws.column_dimensions['B'].width = 12  # Location
-            ws.column_dimensions['C'].width = 12  # Start Date
-            ws.column_dimensions['D'].width = 12  # End Date
-            
-            # Write resource data
-            if resources_df is not None and not resources_df.empty:
-                # Make sure we have the right column names
-                print(f"🔍 DEBUG: Resources DataFrame columns: {list(resources_df.columns)}")
-                print(f"🔍 DEBUG: Resources DataFrame shape: {resources_df.shape}")
+            has_resources = resources_df is not None and not resources_df.empty
+            if has_resources:
+                logger.debug("🔍 Resources DataFrame columns: %s", list(resources_df.columns))
+                logger.debug("🔍 Resources DataFrame shape: %s", resources_df.shape)
+            
+            def column(name, default):
+                # Missing columns fall back to a default for every row
+                if name in resources_df.columns:
+                    return resources_df[name]
+                return repeat(default, len(resources_df))
+            
+            def rows():
+                # SOW Information
+                yield [(f"SOW: {sow_number} - {sow_name}", "sow_title_4472C4")]
+                yield [(f"Client: {client}", "sow_bold")]
+                yield [("Project Type: T&M (Time & Materials)", "sow_bold")]
+                yield []
+                yield [("Resource Allocation Details", "sow_section")]
+                yield []
                 
-                for idx, row in resources_df.iterrows():
-                    ws_row = idx + 8  # Start from row 8
-                    
-                    # Safely get values with default fallbacks
-                    role = row.get("Role", "")
-                    location = row.get("Location", "")
-                    start_date = row.get("Start Date", date.today())
-                    end_date = row.get("End Date", date.today())
-                    allocation = row.get("Allocation %", 0)
-                    hrs_day = row.get("Hrs/Day", 8)
-                    rate = row.get("Rate/hr ($)", 0)
-                    estimated = row.get("Estimated $", 0)
+                # Column headers for resources
+                headers = ["Role", "Location", "Start Date", "End Date", 
+                          "Allocation %", "Hrs/Day", "Rate/hr ($)", "Estimated $"]
+                yield [(header, "sow_header_4472C4") for header in headers]
+                
+                if has_resources:
+                    resource_rows = zip(
+                        column("Role", ""), column("Location", ""),
+                        column("Start Date", date.today()), column("End Date", date.today()),
+                        column("Allocation %", 0), column("Hrs/Day", 8),
+                        column("Rate/hr ($)", 0), column("Estimated $", 0)
+                    )
+                    for role, location, start_date, end_date, allocation, hrs_day, rate, estimated in resource_rows:
+                        yield [
+                            (role, "sow_cell"),
+                            (location, "sow_cell"),
+                            (self._format_date(start_date), "sow_cell"),
+                            (self._format_date(end_date), "sow_cell"),
+                            (allocation, "sow_number"),
+                            (hrs_day, "sow_number"),
+                            (rate, "sow_number"),
+                            (estimated, "sow_amount")
+                        ]
                     
-                    # Write values
-                    ws.cell(row=ws_row, column=1, value=role)
-                    ws.cell(row=ws_row, column=2, value=location)
-                    ws.cell(row=ws_row, column=3, value=start_date.strftime('%Y-%m-%d') if hasattr(start_date, 'strftime') else str(start_date))
-                    ws.cell(row=ws_row, column=4, value=end_date.strftime('%Y-%m-%d') if hasattr(end_date, 'strftime') else str(end_date))
-                    ws.cell(row=ws_row, column=5, value=allocation)
-                    ws.cell(row=ws_row, column=6, value=hrs_day)
-                    ws.cell(row=ws_row, column=7, value=rate)
-                    ws.cell(row=ws_row, column=8, value=estimated)
+                    # Totals
+                    total_estimated = resources_df["Estimated $"].sum() if "Estimated $" in resources_df.columns else 0
+                    yield []
+                    yield [(None, None)] * 6 + [("Total:", "sow_bold"), (total_estimated, "sow_total")]
                     
-                    # Add formatting
-                    for col in range(1, 9):
-                        cell = ws.cell(row=ws_row, column=col)
-                        cell.border = thin_border
-                        if col in [5, 6, 7, 8]:
-                            try:
-                                cell.number_format = '#,##0.00'
-                            except:
-                                pass
-                        if col == 8:
-                            cell.font = Font(bold=True)
-                
-                # Calculate totals
-                total_row = len(resources_df) + 9
-                ws.cell(row=total_row, column=7, value="Total:").font = Font(bold=True)
-                
-                total_estimated = resources_df["Estimated $"].sum() if "Estimated $" in resources_df.columns else 0
-                ws.cell(row=total_row, column=8, value=total_estimated)
-                ws.cell(row=total_row, column=8).font = Font(bold=True)
-                ws.cell(row=total_row, column=8).number_format = '#,##0.00'
+                    # Calculation details
+                    yield []
+                    yield [("Calculation Method:", "sow_bold")]
+                    yield [("Estimated Cost = Working Days × (Allocation%/100) × Hours/Day × Rate/Hour", None)]
+                    yield []
+                else:
+                    yield from ([] for _ in range(7))
                 
-                # Add calculation details
-                details_row = total_row + 2
-                ws.cell(row=details_row, column=1, value="Calculation Method:").font = Font(bold=True)
-                ws.cell(row=details_row+1, column=1, 
-                       value="Estimated Cost = Working Days × (Allocation%/100) × Hours/Day × Rate/Hour")
-                ws.merge_cells(f'A{details_row+1}:H{details_row+1}')
-            
-            # Add timestamp
-            timestamp_row = details_row + 3 if 'details_row' in locals() else 15
-            ws.cell(row=timestamp_row, column=1, 
-                   value=f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            
-            # Save file
+                # Timestamp
+                yield [(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", None)]
+            
+            merges = ["A1:H1", "A5:H5"]
+            if has_resources:
+                # Calculation method text row
+                merges.append(f"A{len(resources_df) + 12}:H{len(resources_df) + 12}")
+            
+            widths = {get_column_letter(col): 15 for col in range(1, 9)}
+            widths.update({'B': 12, 'C': 12, 'D': 12})  # Location, Start Date, End Date
+            
+            wb = self._write_workbook(
+                "Resource Details", rows(),
+                merges=merges,
+                widths=widths,
+                streaming=self._use_streaming(resources_df)
+            )
+            
+            # Serialize in memory
             file_name = f"{sow_number}_Resource_Details.xlsx"
-            file_path = os.path.join(self.output_folder, file_name)
-            wb.save(file_path)
+            excel_bytes = self._workbook_bytes(wb, file_name)
             
-            print(f"✅ Created resource Excel: {file_path}")
-            return file_path
+            logger.info("✅ Created resource Excel: %s (%s bytes)", file_name, len(excel_bytes))
+            return excel_bytes
             
         except Exception as e:
-            print(f"❌ Error creating resource Excel: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error creating resource Excel: %s", e)
             return None
 
+# ============================================================================
+# SOW NUMBER ALLOCATOR
+# ============================================================================
+class SowNumberAllocator:
+    """Thread- and process-safe SOW number allocator backed by SQLite
+    
+    Each process reserves a block of numbers in a single write transaction and
+    hands them out from memory, so concurrent submitters rarely touch the database.
+    """
+    
+    def __init__(self, db_path, block_size=1, start_num=1000, legacy_counter_file=None):
+        self.db_path = db_path
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.Lock()
+        self._next = 0
+        self._block_end = 0  # Exclusive
+        
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._init_db(self._read_legacy_counter(legacy_counter_file, start_num))
+    
+    @staticmethod
+    def _read_legacy_counter(counter_file, default):
+        """Continue numbering from the old text counter if there is one"""
+        try:
+            with open(counter_file, "r") as f:
+                return max(int(f.read().strip()), default)
+        except Exception:
+            return default
+    
+    def _connect(self):
+        # Autocommit mode so transactions are controlled explicitly below
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    def _init_db(self, seed):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sow_counter ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), next_value INTEGER NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO sow_counter (id, next_value) VALUES (1, ?)", (seed,))
+        finally:
+            conn.close()
+    
+    def _reserve_block(self):
+        """Atomically reserve the next block of numbers across all processes"""
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the database write lock, serializing concurrent reservations
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                start = conn.execute("SELECT next_value FROM sow_counter WHERE id = 1").fetchone()[0]
+                conn.execute("UPDATE sow_counter SET next_value = ? WHERE id = 1", (start + self.block_size,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return start
+    
+    def allocate(self):
+        """Return the next unused SOW number"""
+        with self._lock:
+            if self._next >= self._block_end:
+                self._next = self._reserve_block()
+                self._block_end = self._next + self.block_size
+            
+            number = self._next
+            self._next += 1
+            return number
+
+@st.cache_resource
+def get_sow_number_allocator():
+    """Get the SOW number allocator shared across all user sessions"""
+    return SowNumberAllocator(
+        Config.SOW_NUMBER_DB_PATH,
+        block_size=Config.SOW_NUMBER_BLOCK_SIZE,
+        start_num=Config.SOW_NUMBER_START,
+        legacy_counter_file=Config.SOW_NUMBER_COUNTER_FILE
+    )
+
+# ============================================================================
+# BUSINESS DAY CALENDARS
+# ============================================================================
+class HolidayCalendars:
+    """Precompiled numpy business-day calendars keyed by resource Location
+    
+    Locations without a holiday file use a plain Mon-Fri calendar.
+    """
+    
+    def __init__(self, folder):
+        self.default_calendar = np.busdaycalendar()
+        self.calendars = {}
+        
+        if os.path.isdir(folder):
+            for file_name in sorted(os.listdir(folder)):
+                location, ext = os.path.splitext(file_name)
+                if ext.lower() != ".txt":
+                    continue
+                holidays = self._read_holidays(os.path.join(folder, file_name))
+                self.calendars[self._normalize(location)] = np.busdaycalendar(holidays=holidays)
+                logger.info("📅 Loaded %s holidays for location '%s'", len(holidays), location)
+    
+    @staticmethod
+    def _normalize(location):
+        return str(location).strip().lower()
+    
+    @staticmethod
+    def _read_holidays(file_path):
+        holidays = []
+        with open(file_path, "r") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    holidays.append(np.datetime64(line, "D"))
+        return holidays
+    
+    def get(self, location):
+        """Calendar for a Location (falls back to Mon-Fri)"""
+        return self.calendars.get(self._normalize(location), self.default_calendar)
+    
+    def business_days(self, start_dates, end_dates, locations):
+        """Vectorized busday_count using each row's Location calendar (one NumPy call per distinct Location)"""
+        days = np.zeros(len(start_dates), dtype=np.int64)
+        locations = pd.Series(locations).fillna("").map(self._normalize).to_numpy()
+        
+        for location in pd.unique(locations):
+            rows = locations == location
+            days[rows] = np.busday_count(start_dates[rows], end_dates[rows], busdaycal=self.get(location))
+        
+        return days
+
+@st.cache_resource
+def get_holiday_calendars():
+    """Get the holiday calendars, parsed once per server process"""
+    return HolidayCalendars(Config.HOLIDAYS_FOLDER)
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -1094,7 +2918,7 @@ def init_session_state():
         'form_data': {},
         'is_authenticated': False,
         # NEW: For approval dashboard persistence
-        'sow_dataframe': None,
+        'approval_pager': None,
         'selected_sow_for_download': None,
         'download_triggered': False,
         'document_bytes': None,
@@ -1135,30 +2959,52 @@ def networkdays(start_date, end_date):
     days = np.busday_count(start_date, end_date)
     return int(days)
 
-def get_next_sow_number():
-    """Generate next SOW number"""
-    counter_file = "data/sow_counter.txt"
-    start_num = 1000
+def calculate_resource_costs(resources_df):
+    """Vectorized T&M cost engine - Estimated $ for every resource row in one NumPy pass
     
-    # Create data directory if it doesn't exist
-    os.makedirs("data", exist_ok=True)
+    Estimated $ = working days × (Allocation % / 100) × Hrs/Day × Rate/hr, where
+    working days exclude the holidays of each row's Location. Rows with missing
+    or invalid values are priced at 0.
+    """
+    row_count = len(resources_df)
+    
+    def numeric_column(name):
+        if name not in resources_df.columns:
+            return np.full(row_count, np.nan)
+        return pd.to_numeric(resources_df[name], errors="coerce").to_numpy(dtype=float)
+    
+    def date_column(name):
+        if name not in resources_df.columns:
+            return np.full(row_count, np.datetime64("NaT"), dtype="datetime64[D]")
+        return pd.to_datetime(resources_df[name], errors="coerce").to_numpy().astype("datetime64[D]")
+    
+    start_dates = date_column("Start Date")
+    end_dates = date_column("End Date")
+    allocation = numeric_column("Allocation %")
+    hours_per_day = numeric_column("Hrs/Day")
+    rate = numeric_column("Rate/hr ($)")
+    
+    valid = (
+        ~np.isnat(start_dates) & ~np.isnat(end_dates)
+        & np.isfinite(allocation) & np.isfinite(hours_per_day) & np.isfinite(rate)
+    )
     
-    if not os.path.exists(counter_file):
-        with open(counter_file, "w") as f:
-            f.write(str(start_num))
-        return start_num
+    locations = resources_df["Location"] if "Location" in resources_df.columns else np.full(row_count, "")
     
-    try:
-        with open(counter_file, "r") as f:
-            current = int(f.read().strip())
-    except:
-        current = start_num
-    
-    next_num = current + 1
-    with open(counter_file, "w") as f:
-        f.write(str(next_num))
+    # busday_count rejects NaT, so invalid rows get a zero-length range before masking
+    placeholder = np.datetime64("1970-01-01")
+    days = get_holiday_calendars().business_days(
+        np.where(valid, start_dates, placeholder),
+        np.where(valid, end_dates, placeholder),
+        locations
+    )
     
-    return current
+    costs = np.round(days * (allocation / 100) * hours_per_day * rate, 2)
+    return pd.Series(np.where(valid, costs, 0.0), index=resources_df.index)
+
+def get_next_sow_number():
+    """Allocate the next SOW number - only call this when a SOW request is actually submitted"""
+    return get_sow_number_allocator().allocate()
 
 def reset_all_fields():
     """Reset form fields"""
@@ -1177,26 +3023,17 @@ def reset_all_fields():
     
     st.session_state.reset_trigger = st.session_state.get('reset_trigger', 0) + 1
 
-def save_to_local_csv(sow_data):
-    """Save SOW data to local CSV (fallback)"""
+def save_to_local_log(sow_data):
+    """Save SOW data to the local append-only fallback log"""
     try:
-        csv_file = "data/sow_records_local.csv"
-        os.makedirs("data", exist_ok=True)
-        
-        df = pd.DataFrame([sow_data])
-        
-        if os.path.exists(csv_file):
-            existing_df = pd.read_csv(csv_file)
-            df = pd.concat([existing_df, df], ignore_index=True)
-        
-        df.to_csv(csv_file, index=False)
+        get_local_record_log().append(sow_data)
         return True
     except Exception as e:
         st.error(f"Local save failed: {str(e)}")
         return False
 
-def prepare_sow_data_for_storage(form_data, document_url=""):
-    """Prepare complete SOW data for SharePoint storage - FIXED"""
+def prepare_sow_data_for_storage(form_data, document_url="", created_by=None):
+    """Prepare complete SOW data for SharePoint storage - FIXED (created_by defaults to the logged-in user)"""
     
     def convert_date(obj):
         if isinstance(obj, (date, datetime)):
@@ -1238,22 +3075,12 @@ def prepare_sow_data_for_storage(form_data, document_url=""):
                 
             return 0.0
         except Exception as e:
-            print(f"❌ Error in calculate_total_value: {e}")
+            logger.error("❌ Error in calculate_total_value: %s", e)
             return 0.0
     
     total_value = calculate_total_value()
     
-    # Debug print to check
-    print(f"🔍 DEBUG: Total Value Calculation Result:")
-    print(f"  - Project Type: {form_data.get('option')}")
-    print(f"  - Total Value: {total_value}")
-    print(f"  - Form data keys: {list(form_data.keys())}")
-    
-    # Check specific keys for debugging
-    if form_data.get("option") == "Fixed Fee":
-        print(f"  - Fees_al in form_data: {'Fees_al' in form_data}")
-        if 'Fees_al' in form_data:
-            print(f"  - Fees_al value: {form_data['Fees_al']}")
+    logger.debug("🔍 Total value for %s: %s", form_data.get("option"), total_value)
     
     # Calculate work days
     try:
@@ -1298,9 +3125,9 @@ def prepare_sow_data_for_storage(form_data, document_url=""):
                 total_milestone_payment = milestone_df["net_pay"].sum()
                 additional_data["project_specific"]["milestone_total"] = float(total_milestone_payment)
             
-            print(f"✅ DEBUG: Saved {len(milestones_list)} milestones to project_specific")
+            logger.debug("✅ Saved %s milestones to project_specific", len(milestones_list))
         else:
-            print("⚠️ DEBUG: No milestone_df found in form_data for Fixed Fee")
+            logger.warning("⚠️ No milestone_df found in form_data for Fixed Fee")
             
             # Save milestone data if available
             milestone_df = form_data.get("milestone_df")
@@ -1335,7 +3162,7 @@ def prepare_sow_data_for_storage(form_data, document_url=""):
         "GeneratedDate": datetime.now().strftime("%Y-%m-%d"),
         # FIX: Ensure TotalValue is properly set
         "TotalValue": float(total_value) if total_value else 0.0,
-        "CreatedBy": st.session_state.user_email,
+        "CreatedBy": created_by if created_by is not None else st.session_state.user_email,
         "ScopeSummary": form_data.get("scope_text", "")[:1000] if form_data.get("scope_text") else "",
         "ServicesDeliverables": form_data.get("ser_del", "")[:1000] if form_data.get("ser_del") else "",
         "AdditionalPersonnel": form_data.get("additional_personnel", ""),
@@ -1349,10 +3176,6 @@ def prepare_sow_data_for_storage(form_data, document_url=""):
         "AdditionalData": json.dumps(additional_data, default=str)
     }
     
-    # Final debug
-    print(f"🔍 FINAL SOW RECORD - TotalValue: {sow_record['TotalValue']}")
-    print(f"  - Type: {type(sow_record['TotalValue'])}")
-    
     return sow_record
 
 
@@ -1534,7 +3357,7 @@ def validate_user_in_sharepoint(email):
         
         # Check if the flow URL is configured
         if not Config.POWER_AUTOMATE_URLS.get("check_user"):
-            print("⚠️ Check user flow not configured, using fallback validation")
+            logger.warning("⚠️ Check user flow not configured, using fallback validation")
             # Fallback to local validation if flow not configured
             if email in ["legal@cloudlabsit.com", "admin@cloudlabsit.com"]:
                 return True, 'legal', ""
@@ -1545,19 +3368,17 @@ def validate_user_in_sharepoint(email):
         # Call SharePoint to validate user
         result = sharepoint_service.check_user(email)
         
-        print(f"🔍 DEBUG: Validation result from check_user: {result}")
-        
         if result and result.get("success"):
             if result.get("user_found"):
                 user_data = result.get("user_data", {})
                 role = user_data.get("role", "user")
                 
                 # role is already normalized to lowercase from check_user
-                print(f"✅ User validated: {email} with role: {role}")
+                logger.info("✅ User validated: %s with role: %s", email, role)
                 
                 # Double-check that role is valid
                 if role not in ['legal', 'user']:
-                    print(f"⚠️ Unknown role '{role}', defaulting to 'user'")
+                    logger.warning("⚠️ Unknown role '%s', defaulting to 'user'", role)
                     role = 'user'
                 
                 return True, role, ""
@@ -1568,9 +3389,7 @@ def validate_user_in_sharepoint(email):
             return False, None, f"Validation failed: {error_msg}"
             
     except Exception as e:
-        print(f"❌ Error validating user: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error validating user: %s", e)
         return False, None, f"Error validating user: {str(e)}"
 
 def login_page():
@@ -1613,10 +3432,10 @@ def login_page():
                         st.session_state.user_role = role
                         
                         # Clear any previous state
-                        if 'sow_dataframe' in st.session_state:
-                            del st.session_state.sow_dataframe
-                        if 'published_sows_df' in st.session_state:
-                            del st.session_state.published_sows_df
+                        if 'approval_pager' in st.session_state:
+                            del st.session_state.approval_pager
+                        if 'published_pager' in st.session_state:
+                            del st.session_state.published_pager
                         
                         st.success(f"Welcome, {email}! (Role: {role})")
                         time.sleep(1)
@@ -1683,6 +3502,8 @@ def render_header():
 # TEMPLATE MANAGEMENT
 # ============================================================================
 class TemplateManager:
+    """Locates SOW templates and caches their bytes (shared process-wide via get_template_manager)"""
+    
     def __init__(self):
         # Try multiple possible template locations
         self.template_locations = [
@@ -1692,9 +3513,46 @@ class TemplateManager:
             Path(__file__).parent / "templates",  # Same directory as main.py
         ]
         
+        # Cached templates by name: {"path", "mtime", "data", "checked", "document"}
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        
         # Also check for templates in the app directory
         self.ensure_templates_exist()
     
+    def _load_template(self, template_name):
+        """Return the cached template entry, re-reading the file only when its mtime changes"""
+        now = time.time()
+        with self._cache_lock:
+            entry = self._cache.get(template_name)
+            if entry:
+                # Only stat the file every TEMPLATE_CHECK_INTERVAL seconds
+                if now - entry["checked"] < Config.TEMPLATE_CHECK_INTERVAL:
+                    return entry
+                try:
+                    if entry["path"].stat().st_mtime_ns == entry["mtime"]:
+                        entry["checked"] = now
+                        return entry
+                except OSError:
+                    pass
+            
+            # First load, or the file changed / moved - search the locations again
+            for location in self.template_locations:
+                template_path = location / template_name
+                try:
+                    mtime = template_path.stat().st_mtime_ns
+                    data = template_path.read_bytes()
+                except OSError:
+                    continue
+                
+                logger.debug("✅ Loading template from: %s", template_path)
+                entry = {"path": template_path, "mtime": mtime, "data": data, "checked": now, "document": None}
+                self._cache[template_name] = entry
+                return entry
+            
+            self._cache.pop(template_name, None)
+            return None
+    
     def ensure_templates_exist(self):
         """Ensure template files exist in the current directory"""
         template_files = [
@@ -1708,12 +3566,12 @@ class TemplateManager:
             for location in self.template_locations:
                 template_path = location / template_file
                 if template_path.exists():
-                    print(f"✅ Found template at: {template_path}")
+                    logger.debug("✅ Found template at: %s", template_path)
                     found = True
                     break
             
             if not found:
-                print(f"⚠️ Template not found: {template_file}")
+                logger.warning("⚠️ Template not found: %s", template_file)
                 # Create a default template
                 self.create_default_template_by_name(template_file)
     
@@ -1724,20 +3582,36 @@ class TemplateManager:
             st.error(f"No template defined for project type: {project_type}")
             return self.create_default_template(project_type)
         
-        # Try to find the template in multiple locations
-        for location in self.template_locations:
-            template_path = location / template_name
-            if template_path.exists():
-                try:
-                    print(f"✅ Loading template from: {template_path}")
-                    return BytesIO(template_path.read_bytes())
-                except Exception as e:
-                    print(f"❌ Error loading template {template_path}: {e}")
-        
+        # Served from the template cache (the file is only re-read after it changes)
+        entry = self._load_template(template_name)
+        if entry:
+            return BytesIO(entry["data"])
+                
         # If not found, create default
-        print(f"⚠️ Template {template_name} not found in any location. Creating default.")
+        logger.warning("⚠️ Template %s not found in any location. Creating default.", template_name)
         return self.create_default_template(project_type, template_name)
     
+    def get_docx_template(self, project_type):
+        """Get a DocxTemplate ready to render, cloned from the pre-parsed template
+        
+        Each template is parsed once per file version; renders work on a deep copy
+        so the parsed original is never modified.
+        """
+        template_name = Config.TEMPLATE_MAPPING.get(project_type)
+        entry = self._load_template(template_name) if template_name else None
+        if not entry:
+            return DocxTemplate(self.get_template(project_type))
+        
+        with self._cache_lock:
+            if entry["document"] is None:
+                entry["document"] = Document(BytesIO(entry["data"]))
+                logger.info("📄 Parsed template: %s", entry['path'])
+            document = entry["document"]
+        
+        doc = DocxTemplate(BytesIO(entry["data"]))
+        doc.docx = copy.deepcopy(document)
+        return doc
+    
     def create_default_template(self, project_type, template_name=None):
         """Create a default template"""
         from docx import Document
@@ -1799,10 +3673,10 @@ class TemplateManager:
                     location.mkdir(exist_ok=True)
                     save_path = location / template_name
                     save_path.write_bytes(buffer.getvalue())
-                    print(f"💾 Saved template to: {save_path}")
+                    logger.info("💾 Saved template to: %s", save_path)
                     break
                 except Exception as e:
-                    print(f"Could not save to {location}: {e}")
+                    logger.warning("Could not save to %s: %s", location, e)
         
         return buffer
     
@@ -1820,6 +3694,10 @@ class TemplateManager:
         
         return self.create_default_template(project_type, template_name)
 
+@st.cache_resource
+def get_template_manager():
+    """Get the template manager shared across all user sessions (templates are checked once per process)"""
+    return TemplateManager()
 
 
 def load_sow_data_for_edit_mode(sow_data):
@@ -1854,7 +3732,7 @@ def load_sow_data_for_edit_mode(sow_data):
         
         return True
     except Exception as e:
-        print(f"Error loading SOW data for edit mode: {str(e)}")
+        logger.error("Error loading SOW data for edit mode: %s", e)
         return False
 # ============================================================================
 # PAGE 1: SOW GENERATOR (UPDATED WITH EDIT MODE)
@@ -1880,7 +3758,7 @@ def page_sow_generator():
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    template_manager = TemplateManager()
+    template_manager = get_template_manager()
     
     # Show template info
     if not st.session_state.edit_sow_mode:
@@ -1953,12 +3831,13 @@ def page_sow_generator():
             )
         else:
             if option in ["T&M", "Fixed Fee"]:
-                auto_sow_num = get_next_sow_number()
+                # The number is reserved on submit, so reruns don't burn through the counter
                 sow_num = st.text_input(
                     "SOW Number",
-                    value=f"SOW-{auto_sow_num}",
+                    value="",
                     key=f"sow_num_{st.session_state.reset_trigger}",
-                    help="Auto-generated SOW number"
+                    placeholder="Auto-assigned on submit",
+                    help="Leave blank to assign the next SOW number when the request is submitted"
                 )
             else:
                 sow_num = st.text_input(
@@ -2313,14 +4192,7 @@ def page_sow_generator():
                     
                     # Recalculate Estimated $ if needed
                     if not edited_df.empty:
-                        def calculate_cost(row):
-                            try:
-                                days = networkdays(row["Start Date"], row["End Date"])
-                                return round(days * (row["Allocation %"]/100) * row["Hrs/Day"] * row["Rate/hr ($)"], 2)
-                            except:
-                                return 0.0
-                        
-                        edited_df["Estimated $"] = edited_df.apply(calculate_cost, axis=1)
+                        edited_df["Estimated $"] = calculate_resource_costs(edited_df)
                     
                     # Store in session state
                     st.session_state.editable_resources = edited_df
@@ -2376,14 +4248,7 @@ def page_sow_generator():
             
             # Calculate values
             if not resources_df.empty:
-                def calculate_resource_cost(row):
-                    try:
-                        days = networkdays(row["Start Date"], row["End Date"])
-                        return round(days * (row["Allocation %"]/100) * row["Hrs/Day"] * row["Rate/hr ($)"], 2)
-                    except:
-                        return 0.0
-                
-                resources_df["Estimated $"] = resources_df.apply(calculate_resource_cost, axis=1)
+                resources_df["Estimated $"] = calculate_resource_costs(resources_df)
                 
                 # Display calculated table
                 st.dataframe(resources_df)
@@ -2561,7 +4426,7 @@ def page_sow_generator():
         # Handle approval/rejection
         if approve_btn:
             if handle_approval_rejection(Config.STATUS_APPROVED):
-                st.success("SOW Approved successfully!")
+                st.success("SOW approval submitted!")
                 time.sleep(2)
                 # Reset edit mode and go back to approval dashboard
                 st.session_state.edit_sow_mode = False
@@ -2630,6 +4495,10 @@ def page_sow_generator():
             )
 
         if generate_btn:
+            # Reserve a SOW number only now that the request is being submitted
+            if option in ["T&M", "Fixed Fee"] and not sow_num.strip():
+                sow_num = f"SOW-{get_next_sow_number()}"
+            
             generate_sow_document(
                 option=option,
                 sow_num=sow_num,
@@ -2739,11 +4608,10 @@ def generate_sow_document(option, sow_num, sow_name, Client_Name, start_date, en
                     "sow_end": st.session_state.get(f"sow_end_{st.session_state.reset_trigger}", date.today()).strftime("%B %d, %Y")
                 })
             
-            # Get template
-            template_stream = template_manager.get_template(option)
+            # Get a copy of the pre-parsed template
+            doc = template_manager.get_docx_template(option)
             
             # Render document
-            doc = DocxTemplate(template_stream)
             doc.render(context)
             
             # Save to buffer
@@ -2797,22 +4665,20 @@ def generate_sow_document(option, sow_num, sow_name, Client_Name, start_date, en
             excel_exporter = ExcelExporter()
             
             if option == "Fixed Fee" and milestone_df is not None and not milestone_df.empty:
-                excel_path = excel_exporter.create_fixed_fee_milestone_excel(form_data, milestone_df)
-                if excel_path:
+                excel_data = excel_exporter.create_fixed_fee_milestone_excel(form_data, milestone_df)
+                if excel_data:
                     # Store Excel file data for download
-                    with open(excel_path, 'rb') as f:
-                        st.session_state.fixed_fee_excel_data = f.read()
+                    st.session_state.fixed_fee_excel_data = excel_data
                     st.session_state.fixed_fee_excel_name = f"{sow_num}_Milestone_Payments.xlsx"
-                    st.info(f"📊 Milestone payment Excel file created: {os.path.basename(excel_path)}")
+                    st.info(f"📊 Milestone payment Excel file created: {st.session_state.fixed_fee_excel_name}")
             
             elif option == "T&M" and resources_df is not None and not resources_df.empty:
-                excel_path = excel_exporter.create_tm_resource_excel(form_data, resources_df)
-                if excel_path:
+                excel_data = excel_exporter.create_tm_resource_excel(form_data, resources_df)
+                if excel_data:
                     # Store Excel file data for download
-                    with open(excel_path, 'rb') as f:
-                        st.session_state.tm_excel_data = f.read()
+                    st.session_state.tm_excel_data = excel_data
                     st.session_state.tm_excel_name = f"{sow_num}_Resource_Details.xlsx"
-                    st.info(f"📊 Resource details Excel file created: {os.path.basename(excel_path)}")
+                    st.info(f"📊 Resource details Excel file created: {st.session_state.tm_excel_name}")
             
             st.success("✅ SOW document generated successfully!")
             st.session_state.should_increment_on_download = True
@@ -2833,78 +4699,6 @@ def generate_sow_document(option, sow_num, sow_name, Client_Name, start_date, en
             st.exception(e)
 
 
-def generate_approved_documents(form_data):
-    """Generate SOW and Excel documents on approval"""
-    try:
-        template_manager = TemplateManager()
-        excel_exporter = ExcelExporter()
-        
-        result = {
-            "success": True,
-            "message": "",
-            "document_url": "",
-            "excel_url": ""
-        }
-        
-        # Generate SOW document
-        context = prepare_document_context(form_data)
-        template_stream = template_manager.get_template(form_data.get("option", ""))
-        
-        doc = DocxTemplate(template_stream)
-        doc.render(context)
-        
-        sow_buffer = BytesIO()
-        doc.save(sow_buffer)
-        sow_buffer.seek(0)
-        
-        # Store in session state for upload
-        st.session_state.file_data = sow_buffer.getvalue()
-        st.session_state.generated_file_path = f"{form_data.get('sow_num', '')} - {form_data.get('sow_name', '')}.docx"
-        st.session_state.form_data = form_data
-        
-        # Generate and store Excel files in session state
-        if form_data.get("option") == "Fixed Fee" and form_data.get("milestone_df") is not None:
-            milestone_df = form_data.get("milestone_df")
-            if not milestone_df.empty:
-                excel_path = excel_exporter.create_fixed_fee_milestone_excel(form_data, milestone_df)
-                if excel_path and os.path.exists(excel_path):
-                    with open(excel_path, 'rb') as f:
-                        st.session_state.fixed_fee_excel_data = f.read()
-                    st.session_state.fixed_fee_excel_name = f"{form_data.get('sow_num', '')}_Milestone_Payments.xlsx"
-                    st.info(f"📊 Milestone payment Excel file created for approval")
-        
-        elif form_data.get("option") == "T&M" and form_data.get("resources_df") is not None:
-            resources_df = form_data.get("resources_df")
-            if not resources_df.empty:
-                excel_path = excel_exporter.create_tm_resource_excel(form_data, resources_df)
-                if excel_path and os.path.exists(excel_path):
-                    with open(excel_path, 'rb') as f:
-                        st.session_state.tm_excel_data = f.read()
-                    st.session_state.tm_excel_name = f"{form_data.get('sow_num', '')}_Resource_Details.xlsx"
-                    st.info(f"📊 Resource details Excel file created for approval")
-        
-        # Upload all documents using the same function
-        upload_result = upload_document_to_sharepoint()
-        
-        if upload_result and upload_result.get("success"):
-            result["document_url"] = upload_result.get("word_url", "")
-            result["excel_url"] = upload_result.get("excel_url", "")
-            result["message"] = "Documents generated and uploaded successfully"
-        else:
-            result["success"] = False
-            result["message"] = upload_result.get("message", "Failed to upload documents")
-        
-        return result
-        
-    except Exception as e:
-        print(f"❌ Error generating approved documents: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            "success": False,
-            "message": str(e)
-        }
-
 def prepare_document_context(form_data):
     """Prepare document context for template rendering"""
     context = {
@@ -2947,6 +4741,182 @@ def prepare_document_context(form_data):
     
     return context
 
+# ============================================================================
+# HEADLESS GENERATION (no Streamlit session required)
+# ============================================================================
+MILESTONE_COLUMN_NAMES = {
+    "Milestone #": "milestone_no",
+    "Services / Deliverables": "services",
+    "Milestone Due Date": "due_date",
+    "Payment Allocation (%)": "allocation",
+    "Net Milestone Payment ($)": "net_pay"
+}
+
+def _parse_date(value, default=None):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value.strip():
+        return datetime.strptime(value.strip()[:10], "%Y-%m-%d").date()
+    return default
+
+def _parse_rows(value):
+    """Resource/milestone rows may arrive as a list or as a JSON string (e.g. a CSV cell)"""
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip() else None
+    return value or None
+
+def build_form_data(request):
+    """Build form_data, as collected by the SOW form, from a flat dict (CSV row, JSON line or API body)
+    
+    Dates are YYYY-MM-DD strings; "resources" (T&M) and "milestones" (Fixed Fee)
+    are lists of row dicts using the same column names as the form tables.
+    """
+    form_data = dict(request)
+    option = form_data.get("option", "")
+    
+    form_data["start_date"] = _parse_date(form_data.get("start_date"), date.today())
+    form_data["end_date"] = _parse_date(form_data.get("end_date"), date.today())
+    for key in ("sow_start_date", "sow_end_date"):
+        if key in form_data:
+            form_data[key] = _parse_date(form_data[key], date.today())
+    
+    resources = _parse_rows(form_data.pop("resources", None))
+    if option == "T&M" and resources:
+        resources_df = pd.DataFrame(resources)
+        for date_col in ["Start Date", "End Date"]:
+            if date_col in resources_df.columns:
+                resources_df[date_col] = pd.to_datetime(resources_df[date_col]).dt.date
+        if "Estimated $" not in resources_df.columns:
+            resources_df["Estimated $"] = calculate_resource_costs(resources_df)
+        form_data["resources_df"] = resources_df
+        form_data["currency_value"] = float(resources_df["Estimated $"].sum())
+    
+    milestones = _parse_rows(form_data.pop("milestones", None))
+    if option == "Fixed Fee" and milestones:
+        milestone_df = pd.DataFrame(milestones).rename(columns=MILESTONE_COLUMN_NAMES)
+        if "net_pay" not in milestone_df.columns and "allocation" in milestone_df.columns:
+            total_fees = pd.to_numeric(form_data.get("Fees_al", 0), errors="coerce") or 0
+            allocation = pd.to_numeric(milestone_df["allocation"], errors="coerce").fillna(0)
+            milestone_df["net_pay"] = (total_fees * allocation / 100).round(2)
+        form_data["milestone_df"] = milestone_df
+    
+    return form_data
+
+def render_sow_files(form_data, template_manager=None, excel_exporter=None):
+    """Render the SOW .docx and its Excel workbook (if any) from form_data
+    
+    Returns {"docx_name", "docx_data", "excel"}, where excel is None or
+    {"folder", "file_name", "data", "excel_type"} as uploaded by the app.
+    """
+    template_manager = template_manager or get_template_manager()
+    excel_exporter = excel_exporter or ExcelExporter()
+    option = form_data.get("option", "")
+    sow_num = form_data.get("sow_num", "")
+    
+    doc = template_manager.get_docx_template(option)
+    doc.render(prepare_document_context(form_data))
+    buffer = BytesIO()
+    doc.save(buffer)
+    
+    files = {
+        "docx_name": f"{sow_num} - {form_data.get('sow_name', '')}.docx",
+        "docx_data": buffer.getvalue(),
+        "excel": None
+    }
+    
+    milestone_df = form_data.get("milestone_df")
+    resources_df = form_data.get("resources_df")
+    if option == "Fixed Fee" and milestone_df is not None and not milestone_df.empty:
+        excel_data = excel_exporter.create_fixed_fee_milestone_excel(form_data, milestone_df)
+        if excel_data:
+            files["excel"] = {
+                "folder": "Fixed_Fee_Milestones",
+                "file_name": f"{sow_num}_Milestone_Payments.xlsx",
+                "data": excel_data,
+                "excel_type": "Milestone Payments"
+            }
+    elif option == "T&M" and resources_df is not None and not resources_df.empty:
+        excel_data = excel_exporter.create_tm_resource_excel(form_data, resources_df)
+        if excel_data:
+            files["excel"] = {
+                "folder": "TM_Resources",
+                "file_name": f"{sow_num}_Resource_Details.xlsx",
+                "data": excel_data,
+                "excel_type": "Resource Details"
+            }
+    
+    return files
+
+def build_upload_calls(async_service, form_data, files, created_by):
+    """Build the concurrent upload calls for rendered SOW files (Word first, then Excel)"""
+    metadata = {
+        "sow_number": form_data.get("sow_num", ""),
+        "sow_name": form_data.get("sow_name", ""),
+        "client": form_data.get("Client_Name", ""),
+        "created_by": created_by,
+        "status": Config.STATUS_PENDING,
+        "project_type": form_data.get("option", "")
+    }
+    
+    calls = [async_service.upload_document(files["docx_data"], files["docx_name"], metadata)]
+    excel = files.get("excel")
+    if excel:
+        calls.append(async_service.upload_excel(
+            excel["data"],
+            excel["file_name"],
+            dict(metadata, excel_type=excel["excel_type"]),
+            excel["folder"]
+        ))
+    return calls
+
+def serialize_form_data(form_data):
+    """JSON-safe request dict for form_data - the inverse of build_form_data"""
+    request = {
+        key: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for key, value in form_data.items()
+        if not isinstance(value, pd.DataFrame)
+    }
+    
+    for key, df_key in (("resources", "resources_df"), ("milestones", "milestone_df")):
+        table_df = form_data.get(df_key)
+        if table_df is not None and not table_df.empty:
+            request[key] = json.loads(json.dumps(table_df.to_dict(orient="records"), default=str))
+    
+    return request
+
+def run_approval_job(payload):
+    """Generate and upload a SOW's documents, then mark it approved
+    
+    payload: {"item_id", "approver_email", "comments", "sow"} where sow is a
+    request dict as accepted by build_form_data.
+    """
+    sharepoint_service = SharePointService()
+    form_data = build_form_data(payload["sow"])
+    files = render_sow_files(form_data)
+    
+    # Word and Excel upload concurrently; only approve once both are in SharePoint
+    async_service = AsyncSharePointService(sharepoint_service)
+    uploads = async_service.run_concurrently(
+        *build_upload_calls(async_service, form_data, files, payload["approver_email"])
+    )
+    failed = [result.get("message", "Unknown error") for result in uploads if not result.get("success")]
+    if failed:
+        return {"success": False, "message": f"Upload failed: {'; '.join(failed)}"}
+    
+    result = sharepoint_service.update_sow_status(
+        item_id=payload["item_id"],
+        status=Config.STATUS_APPROVED,
+        comments=payload.get("comments", ""),
+        approver_email=payload["approver_email"]
+    )
+    return dict(
+        result,
+        word_url=(uploads[0].get("data") or {}).get("url", ""),
+        excel_url=(uploads[1].get("data") or {}).get("url", "") if len(uploads) > 1 else ""
+    )
+
 
 def handle_approval_rejection(action):
     """Handle approval/rejection actions - Generate documents on approval"""
@@ -2954,41 +4924,29 @@ def handle_approval_rejection(action):
         try:
             sharepoint_service = st.session_state.sharepoint_service
             
-            # If approving, generate and upload documents first
+            # Approvals are queued - a background job generates and uploads the
+            # documents, then marks the SOW approved
             if action == Config.STATUS_APPROVED:
-                # Collect current form data
                 form_data = collect_form_data_from_session()
+                job_id, created = get_approval_job_queue().enqueue(
+                    item_id=st.session_state.edit_sow_id,
+                    sow_number=form_data.get("sow_num", ""),
+                    payload={
+                        "item_id": st.session_state.edit_sow_id,
+                        "approver_email": st.session_state.user_email,
+                        "comments": st.session_state.get("approval_comments", ""),
+                        "sow": serialize_form_data(form_data)
+                    },
+                    created_by=st.session_state.user_email
+                )
                 
-                # Show progress
-                with st.spinner("📄 Generating and uploading SOW documents..."):
-                    # Generate documents
-                    doc_result = generate_approved_documents(form_data)
-                    
-                    if not doc_result["success"]:
-                        st.error(f"Failed to generate documents: {doc_result.get('message', 'Unknown error')}")
-                        return False
-                    
-                    # Update status with document URLs
-                    updates = {
-                        "status": action,
-                        "approver_comments": st.session_state.get("approval_comments", ""),
-                        "approved_by": st.session_state.user_email,
-                        "approval_date": datetime.now().isoformat(),
-                        "DocumentURL": doc_result.get("document_url", ""),
-                        "ExcelURL": doc_result.get("excel_url", "")
-                    }
-                    
-                    st.success("✅ Documents generated and uploaded successfully!")
-            else:
-                # For rejection, just update status
-                updates = {
-                    "status": action,
-                    "approver_comments": st.session_state.get("approval_comments", ""),
-                    "rejected_by": st.session_state.user_email,
-                    "rejection_date": datetime.now().isoformat()
-                }
+                if created:
+                    st.success(f"📨 Approval queued as job #{job_id} - documents will be generated and uploaded in the background.")
+                else:
+                    st.info(f"⏳ This SOW already has an approval in progress (job #{job_id}).")
+                return True
             
-            # Update status in SharePoint
+            # Rejections update the status in SharePoint directly
             result = sharepoint_service.update_sow_status(
                 item_id=st.session_state.edit_sow_id,
                 status=action,
@@ -2997,8 +4955,6 @@ def handle_approval_rejection(action):
             )
             
             if result["success"]:
-                if action == Config.STATUS_APPROVED:
-                    st.balloons()
                 return True
             else:
                 st.error(f"Failed to {action.lower()} SOW: {result.get('message', 'Unknown error')}")
@@ -3023,12 +4979,6 @@ def auto_save_to_sharepoint():
             # Prepare SOW record
             sow_record = prepare_sow_data_for_storage(form_data)
             
-            # Debug the sow_record
-            print(f"🔍 SOW RECORD BEING SENT:")
-            print(f"  - TotalValue: {sow_record.get('TotalValue')}")
-            print(f"  - Type of TotalValue: {type(sow_record.get('TotalValue'))}")
-            print(f"  - Full record keys: {list(sow_record.keys())}")
-            
             # Save to SharePoint
             save_result = sharepoint_service.save_sow_record(sow_record)
             
@@ -3042,12 +4992,12 @@ def auto_save_to_sharepoint():
                     st.info(f"💵 **Total Value Saved:** ${sow_record['TotalValue']:,.2f}")
                 
                 # Also save locally as backup
-                save_to_local_csv(sow_record)
+                save_to_local_log(sow_record)
                 
             else:
                 st.warning("⚠️ Could not save to SharePoint. Data saved locally only.")
                 # Save locally as fallback
-                save_to_local_csv(sow_record)
+                save_to_local_log(sow_record)
                 
         except Exception as e:
             st.error(f"❌ Error saving to SharePoint: {str(e)}")
@@ -3055,43 +5005,24 @@ def auto_save_to_sharepoint():
             try:
                 form_data = st.session_state.form_data
                 sow_record = prepare_sow_data_for_storage(form_data)
-                save_to_local_csv(sow_record)
+                save_to_local_log(sow_record)
                 st.info("📋 Data saved locally as backup")
             except:
                 pass
 
 def debug_form_data(form_data):
     """Debug function to check form data"""
-    print("🔍 DEBUG FORM DATA STRUCTURE:")
-    print(f"Keys: {list(form_data.keys())}")
-    
-    for key, value in form_data.items():
-        if key in ['resources_df', 'milestone_df']:
-            print(f"  - {key}: {'DataFrame' if value is not None else 'None'}")
-            if value is not None:
-                print(f"    Shape: {value.shape if hasattr(value, 'shape') else 'N/A'}")
-                print(f"    Columns: {list(value.columns) if hasattr(value, 'columns') else 'N/A'}")
-        else:
-            print(f"  - {key}: {value} (Type: {type(value)})")
-    
-    # Check for financial values
-    print("\n🔍 FINANCIAL VALUES CHECK:")
-    print(f"  - Option: {form_data.get('option')}")
-    
-    if form_data.get('option') == 'T&M':
-        print(f"  - currency_value in form_data: {'currency_value' in form_data}")
-        if 'currency_value' in form_data:
-            print(f"  - currency_value: {form_data['currency_value']}")
-    
-    elif form_data.get('option') == 'Fixed Fee':
-        print(f"  - Fees_al in form_data: {'Fees_al' in form_data}")
-        if 'Fees_al' in form_data:
-            print(f"  - Fees_al: {form_data['Fees_al']}")
-    
-    elif form_data.get('option') == 'Change Order':
-        print(f"  - difference in form_data: {'difference' in form_data}")
-        if 'difference' in form_data:
-            print(f"  - difference: {form_data['difference']}")
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    
+    summary = {
+        key: f"DataFrame {value.shape}" if isinstance(value, pd.DataFrame) else value
+        for key, value in form_data.items()
+    }
+    log_payload("form data", summary)
+    logger.debug("🔍 %s financial values: currency_value=%s Fees_al=%s difference=%s",
+                 form_data.get("option"), form_data.get("currency_value"),
+                 form_data.get("Fees_al"), form_data.get("difference"))
 
 def show_download_section():
     """Show download and upload options - UPDATED with Excel downloads"""
@@ -3267,7 +5198,7 @@ def upload_document_to_sharepoint():
             upload_success = []
             upload_failed = []
             
-            # ===== 1. UPLOAD WORD DOCUMENT =====
+            # ===== 1. PREPARE WORD DOCUMENT UPLOAD =====
             st.info(f"📤 Uploading Word document: {st.session_state.generated_file_path}")
             
             word_metadata = {
@@ -3279,53 +5210,42 @@ def upload_document_to_sharepoint():
                 "project_type": project_type
             }
             
-            # Upload Word document to main SOWs folder
-            word_result = sharepoint_service.upload_document(
-                st.session_state.file_data,
-                st.session_state.generated_file_path,
-                word_metadata
-            )
-            
-            if word_result["success"]:
-                upload_success.append(f"Word document to 'SOWs' folder")
-                st.session_state.word_document_url = word_result.get("data", {}).get("url", "")
-            else:
-                upload_failed.append(f"Word document: {word_result.get('message', 'Unknown error')}")
-            
-            # ===== 2. UPLOAD EXCEL FILES =====
+            # ===== 2. PREPARE EXCEL UPLOAD =====
             # Determine folder based on project type
+            excel_upload = None
             if project_type == "Fixed Fee" and hasattr(st.session_state, 'fixed_fee_excel_data'):
-                excel_folder = "Fixed_Fee_Milestones"
-                st.info(f"📊 Uploading milestone Excel to '{excel_folder}' folder: {st.session_state.fixed_fee_excel_name}")
-                
-                excel_metadata = {
-                    "sow_number": form_data.get("sow_num", ""),
-                    "sow_name": form_data.get("sow_name", ""),
-                    "client": form_data.get("Client_Name", ""),
-                    "created_by": st.session_state.user_email,
-                    "status": Config.STATUS_PENDING,
-                    "project_type": project_type,
+                excel_upload = {
+                    "folder": "Fixed_Fee_Milestones",
+                    "label": "Milestone Excel",
+                    "data": st.session_state.fixed_fee_excel_data,
+                    "file_name": st.session_state.fixed_fee_excel_name,
                     "excel_type": "Milestone Payments"
                 }
-                
-                excel_result = upload_excel_to_sharepoint_folder(
-                    sharepoint_service,
-                    st.session_state.fixed_fee_excel_data,
-                    st.session_state.fixed_fee_excel_name,
-                    excel_metadata,
-                    excel_folder
-                )
-                
-                if excel_result["success"]:
-                    upload_success.append(f"Milestone Excel to '{excel_folder}' folder")
-                    st.session_state.excel_document_url = excel_result.get("data", {}).get("url", "")
-                else:
-                    upload_failed.append(f"Milestone Excel: {excel_result.get('message', 'Unknown error')}")
+                st.info(f"📊 Uploading milestone Excel to '{excel_upload['folder']}' folder: {excel_upload['file_name']}")
             
             elif project_type == "T&M" and hasattr(st.session_state, 'tm_excel_data'):
-                excel_folder = "TM_Resources"
-                st.info(f"👥 Uploading resource Excel to '{excel_folder}' folder: {st.session_state.tm_excel_name}")
-                
+                excel_upload = {
+                    "folder": "TM_Resources",
+                    "label": "Resource Excel",
+                    "data": st.session_state.tm_excel_data,
+                    "file_name": st.session_state.tm_excel_name,
+                    "excel_type": "Resource Details"
+                }
+                st.info(f"👥 Uploading resource Excel to '{excel_upload['folder']}' folder: {excel_upload['file_name']}")
+            
+            # ===== 3. RUN UPLOADS CONCURRENTLY =====
+            async_service = AsyncSharePointService(sharepoint_service)
+            
+            # Upload Word document to main SOWs folder
+            calls = [
+                async_service.upload_document(
+                    st.session_state.file_data,
+                    st.session_state.generated_file_path,
+                    word_metadata
+                )
+            ]
+            
+            if excel_upload:
                 excel_metadata = {
                     "sow_number": form_data.get("sow_num", ""),
                     "sow_name": form_data.get("sow_name", ""),
@@ -3333,24 +5253,35 @@ def upload_document_to_sharepoint():
                     "created_by": st.session_state.user_email,
                     "status": Config.STATUS_PENDING,
                     "project_type": project_type,
-                    "excel_type": "Resource Details"
+                    "excel_type": excel_upload["excel_type"]
                 }
-                
-                excel_result = upload_excel_to_sharepoint_folder(
-                    sharepoint_service,
-                    st.session_state.tm_excel_data,
-                    st.session_state.tm_excel_name,
+                calls.append(async_service.upload_excel(
+                    excel_upload["data"],
+                    excel_upload["file_name"],
                     excel_metadata,
-                    excel_folder
-                )
+                    excel_upload["folder"]
+                ))
+            
+            results = async_service.run_concurrently(*calls)
+            word_result = results[0]
+            
+            if word_result["success"]:
+                upload_success.append(f"Word document to 'SOWs' folder")
+                st.session_state.word_document_url = word_result.get("data", {}).get("url", "")
+            else:
+                upload_failed.append(f"Word document: {word_result.get('message', 'Unknown error')}")
+            
+            if excel_upload:
+                excel_result = results[1]
+                excel_folder = excel_upload["folder"]
                 
                 if excel_result["success"]:
-                    upload_success.append(f"Resource Excel to '{excel_folder}' folder")
+                    upload_success.append(f"{excel_upload['label']} to '{excel_folder}' folder")
                     st.session_state.excel_document_url = excel_result.get("data", {}).get("url", "")
                 else:
-                    upload_failed.append(f"Resource Excel: {excel_result.get('message', 'Unknown error')}")
+                    upload_failed.append(f"{excel_upload['label']}: {excel_result.get('message', 'Unknown error')}")
             
-            # ===== 3. SHOW RESULTS =====
+            # ===== 4. SHOW RESULTS =====
             if upload_success:
                 st.success("✅ Upload Summary:")
                 for success_item in upload_success:
@@ -3407,21 +5338,14 @@ def upload_document_to_sharepoint():
 def upload_excel_to_sharepoint_folder(sharepoint_service, file_data, file_name, metadata, folder_name):
     """Upload Excel file to specific SharePoint folder"""
     try:
-        # Convert to Base64
-        file_base64 = base64.b64encode(file_data).decode('utf-8')
+        logger.debug("🔍 Uploading Excel %s to '%s' folder", file_name, folder_name)
         
-        print(f"🔍 DEBUG: Uploading Excel to '{folder_name}' folder")
-        print(f"  - File: {file_name}")
-        print(f"  - Folder: {folder_name}")
-        print(f"  - Metadata: {metadata}")
-        
-        # Build payload for specific folder
+        # Build payload for specific folder (file_content is added by upload_file)
         payload = {
             "operation": "upload_document",
             "library_name": "Onboarding Details",  # Main library
             "folder_path": folder_name,  # Different folder for Excel files
             "file_name": file_name,
-            "file_content": file_base64,
             "metadata": {
                 "sow_number": metadata.get("sow_number", ""),
                 "sow_name": metadata.get("sow_name", ""),
@@ -3435,10 +5359,10 @@ def upload_excel_to_sharepoint_folder(sharepoint_service, file_data, file_name,
         }
         
         # Call Power Automate
-        result = sharepoint_service._call_power_automate("upload_document", payload)
+        result = sharepoint_service.upload_file(payload, file_data)
         
         if result:
-            print(f"✅ SUCCESS: Excel uploaded to '{folder_name}' folder")
+            logger.info("✅ SUCCESS: Excel uploaded to '%s' folder", folder_name)
             return {
                 "success": True,
                 "data": result,
@@ -3451,15 +5375,156 @@ def upload_excel_to_sharepoint_folder(sharepoint_service, file_data, file_name,
         }
                 
     except Exception as e:
-        print(f"❌ ERROR in upload_excel_to_sharepoint_folder: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ ERROR in upload_excel_to_sharepoint_folder: %s", e)
         return {
             "success": False,
             "error": str(e),
             "message": f"Fatal error: {str(e)}"
         }
 
+# ============================================================================
+# DASHBOARD PAGING
+# ============================================================================
+@st.cache_resource
+def start_records_warmup():
+    """Fill the local records mirror with a full sync on a background thread (once per process)"""
+    thread = threading.Thread(target=lambda: SharePointService().get_sow_records(), name="records-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def load_dashboard_page(sharepoint_service, pager_key, load_clicked, status_filter, client_filter, project_filter):
+    """Fetch the visible dashboard page, filtered and paged in the local SQLite mirror
+    
+    Once the process holds a full listing, the flow is only asked for what changed
+    (one delta fetch per cache TTL, shared by every session) and the dashboard
+    filters and pages are served from SowRecordsStore. Filters and continuation
+    tokens go to the get_records flow only on a cold start, while the mirror fills
+    in the background, or not at all when the flow is down.
+    
+    Returns None until records have been requested. Pager state (page number,
+    continuation tokens and which source the pages came from) is kept in
+    st.session_state[pager_key].
+    """
+    filters = {
+        "status": status_filter if status_filter != "All" else None,
+        "client": client_filter if client_filter != "All" else None,
+        "project_type": project_filter if project_filter != "All" else None
+    }
+    
+    pager = st.session_state.get(pager_key)
+    if load_clicked or (pager and pager["filters"] != filters):
+        # New query - start again from the first page
+        pager = {"filters": filters, "page": 0, "tokens": [None], "source": None}
+        st.session_state[pager_key] = pager
+    
+    if not pager:
+        return None
+    
+    def use_source(source):
+        # Flow pages and mirror pages are ordered differently - start over rather than skip or repeat records
+        if pager.get("source") not in (None, source):
+            pager.update(page=0, tokens=[None])
+        pager["source"] = source
+    
+    page_size = Config.DASHBOARD_PAGE_SIZE
+    records_store = get_records_store()
+    
+    if get_records_delta_sync().has_full_listing():
+        use_source("mirror")
+        # Delta fetch (shared across sessions, at most once per cache TTL) then page locally
+        with st.spinner("Loading SOW records..."):
+            result = sharepoint_service.get_sow_records()
+        if not result["success"]:
+            st.warning(f"⚠️ Could not reach SharePoint ({result.get('message', 'Unknown error')}). Showing locally cached records.")
+    else:
+        if not start_records_warmup().is_alive():
+            # The last warm-up finished without a full listing (flow error) - try again
+            start_records_warmup.clear()
+            start_records_warmup()
+        
+        # Once this query has fallen back to the mirror it stays there until it is reloaded
+        if pager["source"] != "mirror":
+            use_source("flow")
+            with st.spinner("Loading SOW records from SharePoint..."):
+                result = sharepoint_service.get_sow_records(
+                    status_filter=filters["status"],
+                    client_filter=filters["client"],
+                    project_type_filter=filters["project_type"],
+                    page_size=page_size,
+                    continuation_token=pager["tokens"][pager["page"]]
+                )
+            
+            if result["success"]:
+                next_token = result.get("next_token")
+                if next_token:
+                    del pager["tokens"][pager["page"] + 1:]
+                    pager["tokens"].append(next_token)
+                return {"success": True, "data": result["data"], "page": pager["page"], "has_next": bool(next_token)}
+            
+            # Flow is down - page through whatever was synced before instead
+            if records_store.count() == 0:
+                return {"success": False, "message": result.get("message", "Unknown error")}
+            use_source("mirror")
+            pager["error"] = result.get("message", "Unknown error")
+        
+        st.warning(f"⚠️ Could not reach SharePoint ({pager.get('error', 'Unknown error')}). Showing locally cached records.")
+    
+    page_df = records_store.query(**filters, limit=page_size + 1, offset=pager["page"] * page_size)
+    return {
+        "success": True,
+        "data": page_df.head(page_size),
+        "page": pager["page"],
+        "has_next": len(page_df) > page_size
+    }
+
+def render_records_pager(pager_key, page):
+    """Previous/Next controls for a paged dashboard listing"""
+    pager = st.session_state[pager_key]
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    
+    with col_prev:
+        if st.button("⬅️ Previous", disabled=page["page"] == 0, use_container_width=True, key=f"{pager_key}_prev"):
+            pager["page"] -= 1
+            st.rerun()
+    
+    with col_page:
+        st.markdown(f"<div style='text-align: center;'>Page {page['page'] + 1}</div>", unsafe_allow_html=True)
+    
+    with col_next:
+        if st.button("Next ➡️", disabled=not page["has_next"], use_container_width=True, key=f"{pager_key}_next"):
+            pager["page"] += 1
+            st.rerun()
+
+def render_approval_jobs():
+    """Status of queued approval jobs (document generation and upload run in the background)"""
+    jobs_df = get_approval_job_queue().recent()
+    if jobs_df.empty:
+        return
+    
+    active = jobs_df["status"].isin([ApprovalJobQueue.STATUS_QUEUED, ApprovalJobQueue.STATUS_RUNNING]).sum()
+    failed = (jobs_df["status"] == ApprovalJobQueue.STATUS_FAILED).sum()
+    
+    with st.expander(f"⚙️ Approval Jobs ({active} in progress, {failed} failed)", expanded=bool(active or failed)):
+        st.dataframe(
+            jobs_df.rename(columns={
+                "id": "Job #", "sow_number": "SOW Number", "item_id": "Item ID", "status": "Status",
+                "attempts": "Attempts", "last_error": "Last Error", "created_by": "Approved By",
+                "created_at": "Queued At", "updated_at": "Updated At"
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔄 Refresh Job Status", use_container_width=True, key="refresh_jobs_btn"):
+                st.rerun()
+        with col2:
+            if failed and st.button("🔁 Retry Failed Jobs", use_container_width=True, key="retry_jobs_btn"):
+                requeued = get_approval_job_queue().retry_failed()
+                st.success(f"Re-queued {requeued} job(s)")
+                st.rerun()
+
 # ============================================================================
 # PAGE 2: APPROVAL DASHBOARD
 # ============================================================================
@@ -3483,6 +5548,8 @@ def page_approval_dashboard():
     
     sharepoint_service = st.session_state.sharepoint_service
     
+    render_approval_jobs()
+    
     # ========== FILTERS ==========
     st.subheader("🔍 Filter Options")
     col1, col2, col3 = st.columns(3)
@@ -3516,61 +5583,29 @@ def page_approval_dashboard():
     with col_btn2:
         load_clicked = st.button("📥 View Submitted SOW Request", type="primary", use_container_width=True, key="load_records_btn")
     
-    # Data loading logic - always fetch all data when button is clicked
-    if load_clicked:
-        with st.spinner("Loading SOW records from SharePoint..."):
-            # Fetch ALL records without filters
-            result = sharepoint_service.get_sow_records()
-            
-            if not result["success"]:
-                st.error(f"❌ Failed to load records: {result.get('message', 'Unknown error')}")
-                return
-            
-            df = result["data"]
-            
-            if df.empty:
-                st.info("📭 No SOW records found.")
-                st.session_state.sow_dataframe = None
-                return
-            
-            # Store ALL data in session state
-            st.session_state.sow_dataframe = df
-            st.success(f"✅ Loaded {len(df)} total SOW records")
+    # Filters are pushed down to the flow and only the visible page is fetched
+    page = load_dashboard_page(
+        sharepoint_service, "approval_pager", load_clicked,
+        status_filter, client_filter, project_filter
+    )
     
     # Display data if loaded
-    if st.session_state.get('sow_dataframe') is not None:
-        # Get the original dataframe
-        original_df = st.session_state.sow_dataframe
-        
-        if original_df.empty:
-            st.info("📭 No SOW records found.")
+    if page is not None:
+        if not page["success"]:
+            st.error(f"❌ Failed to load records: {page.get('message', 'Unknown error')}")
             return
         
-        # ========== APPLY FILTERS CLIENT-SIDE ==========
-        filtered_df = original_df.copy()
-        
-        # Apply status filter
-        if status_filter != "All":
-            filtered_df = filtered_df[filtered_df['Status'] == status_filter]
-        
-        # Apply client filter
-        if client_filter != "All":
-            filtered_df = filtered_df[filtered_df['Client'] == client_filter]
-        
-        # Apply project type filter
-        if project_filter != "All":
-            filtered_df = filtered_df[filtered_df['ProjectType'] == project_filter]
+        filtered_df = page["data"]
         
         # Show filter summary
-        if len(filtered_df) < len(original_df):
-            st.info(f"📊 Showing {len(filtered_df)} of {len(original_df)} records (filtered: Status={status_filter if status_filter != 'All' else 'All'}, Client={client_filter if client_filter != 'All' else 'All'}, Project={project_filter if project_filter != 'All' else 'All'})")
-        else:
-            st.info(f"📊 Showing all {len(original_df)} records")
+        st.info(f"📊 Page {page['page'] + 1}: {len(filtered_df)} records (filtered: Status={status_filter}, Client={client_filter}, Project={project_filter})")
         
         if filtered_df.empty:
             st.warning("⚠️ No records match the selected filters. Try changing your filter criteria.")
             return
         
+        render_records_pager("approval_pager", page)
+        
         # ========== DISPLAY DATAFRAME WITH VIEW BUTTONS ==========
         st.subheader(f"📋 SOW Records ({len(filtered_df)} records)")
         
@@ -3645,6 +5680,15 @@ def page_approval_dashboard():
             # Find the selected row from pending_df
             selected_row = pending_df[pending_df['SOWNumber'] == selected_sow].iloc[0]
             
+            # Warm the document cache for this SOW and the next few in the queue while it is reviewed
+            if Config.POWER_AUTOMATE_URLS["get_document"]:
+                queue_position = sow_options.index(selected_sow)
+                get_document_prefetcher().prefetch(
+                    pending_df.drop_duplicates("SOWNumber")
+                    .iloc[queue_position:queue_position + 1 + Config.PREFETCH_AHEAD]
+                    .to_dict("records")
+                )
+            
             # View button
             col1, col2 = st.columns([3, 1])
             
@@ -3682,7 +5726,16 @@ def page_approval_dashboard():
                     document_id = selected_row.get('ID')
                     
                     if document_id and Config.POWER_AUTOMATE_URLS["get_document"]:
-                        document_bytes = sharepoint_service.get_document(item_id=document_id)
+                        # If it is still being prefetched, let that download finish rather than starting another
+                        get_document_prefetcher().wait(
+                            document_id,
+                            document_version(selected_row),
+                            timeout=Config.HTTP_FLOW_TIMEOUTS["get_document"]
+                        )
+                        document_bytes = sharepoint_service.get_document(
+                            item_id=document_id,
+                            version=document_version(selected_row)
+                        )
                         
                         if document_bytes:
                             filename = f"{selected_sow}_{selected_row.get('SOWName', 'SOW').replace(' ', '_')}.docx"
@@ -3711,9 +5764,9 @@ def page_approval_dashboard():
             # Export filtered data to CSV
             csv = filtered_df.to_csv(index=False)
             st.download_button(
-                "📥 Download Filtered Data as CSV",
+                "📥 Download This Page as CSV",
                 data=csv,
-                file_name=f"sow_records_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                file_name=f"sow_records_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv",
                 use_container_width=True,
                 key="export_csv_btn"
@@ -3726,9 +5779,9 @@ def page_approval_dashboard():
                 filtered_df.to_excel(writer, index=False, sheet_name='SOW Records')
             
             st.download_button(
-                "📊 Download Filtered Data as Excel",
+                "📊 Download This Page as Excel",
                 data=excel_buffer.getvalue(),
-                file_name=f"sow_records_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                file_name=f"sow_records_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 use_container_width=True,
                 key="export_excel_btn"
@@ -3736,49 +5789,54 @@ def page_approval_dashboard():
         
         # Add option to export all data
         with st.expander("📁 Export All Data (Unfiltered)", expanded=False):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Export all data to CSV
-                all_csv = original_df.to_csv(index=False)
-                st.download_button(
-                    "📥 Download ALL Data as CSV",
-                    data=all_csv,
-                    file_name=f"sow_records_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True,
-                    key="export_all_csv_btn"
-                )
-            
-            with col2:
-                # Export all data to Excel
-                all_excel_buffer = BytesIO()
-                with pd.ExcelWriter(all_excel_buffer, engine='openpyxl') as writer:
-                    original_df.to_excel(writer, index=False, sheet_name='All SOW Records')
+            # The full listing is only fetched on request so page loads stay small
+            if st.button("📦 Prepare Full Export", use_container_width=True, key="prepare_export_all_btn"):
+                all_result = sharepoint_service.get_sow_records()
+                original_df = all_result["data"] if all_result["success"] else get_records_store().query()
                 
-                st.download_button(
-                    "📊 Download ALL Data as Excel",
-                    data=all_excel_buffer.getvalue(),
-                    file_name=f"sow_records_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True,
-                    key="export_all_excel_btn"
-                )
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Export all data to CSV
+                    all_csv = original_df.to_csv(index=False)
+                    st.download_button(
+                        "📥 Download ALL Data as CSV",
+                        data=all_csv,
+                        file_name=f"sow_records_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv",
+                        use_container_width=True,
+                        key="export_all_csv_btn"
+                    )
+                
+                with col2:
+                    # Export all data to Excel
+                    all_excel_buffer = BytesIO()
+                    with pd.ExcelWriter(all_excel_buffer, engine='openpyxl') as writer:
+                        original_df.to_excel(writer, index=False, sheet_name='All SOW Records')
+                    
+                    st.download_button(
+                        "📊 Download ALL Data as Excel",
+                        data=all_excel_buffer.getvalue(),
+                        file_name=f"sow_records_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        use_container_width=True,
+                        key="export_all_excel_btn"
+                    )
     
     else:
         # Initial state - show instructions
         st.info("👆 Click 'View Submitted SOW Request' button to load SOW data from SharePoint")
         st.markdown("""
         ### How to use:
-        1. Click the **View Submitted SOW Request** button to load all SOW data from SharePoint
+        1. Click the **View Submitted SOW Request** button to load SOW data from SharePoint
         2. Use the filter dropdowns above to narrow down the results
         3. View all SOW records in the interactive table
         4. Select a pending SOW from the dropdown below the table
         5. Click **View SOW Details & Approve/Reject** to review and make a decision
         
         ### Features:
-        - **Client-side filtering** - All filters are applied locally after data is loaded
-        - **Export filtered data** - Download only the records that match your filters
+        - **Server-side filtering** - Filters are applied by SharePoint and results are shown one page at a time
+        - **Export current page** - Download the records shown on the current page
         - **Export all data** - Option to download the complete dataset
         - **View SOW details** in read-only mode with approval buttons
         - **Approve or Reject** SOW submissions with comments
@@ -3795,7 +5853,7 @@ def page_approval_dashboard():
 # PAGE 3: PUBLISHED SOWS (UPDATED - REMOVED DEBUG, FILTERED TO APPROVED ONLY)
 # ============================================================================
 def page_published_sows():
-    """Published SOWs page for all users to view approved SOWs - Fixed with client-side filtering"""
+    """Published SOWs page for all users to view approved SOWs - filtered and paged by the get_records flow"""
     
     st.title("📚 Published SOWs")
     st.markdown("View all approved SOW documents.")
@@ -3809,8 +5867,8 @@ def page_published_sows():
     sharepoint_service = st.session_state.sharepoint_service
     
     # Initialize session state for data persistence
-    if 'published_sows_df' not in st.session_state:
-        st.session_state.published_sows_df = None
+    if 'published_pager' not in st.session_state:
+        st.session_state.published_pager = None
     
     # ========== FILTERS ==========
     st.subheader("🔍 Filter Options")
@@ -3845,62 +5903,30 @@ def page_published_sows():
     with col_btn2:
         load_clicked = st.button("📥 View Submitted SOWs", type="primary", use_container_width=True, key="load_published_btn")
     
-    # Data loading logic - fetch ALL data when button is clicked
-    if load_clicked:
-        with st.spinner("Loading SOW records from SharePoint..."):
-            # Fetch ALL records without filters
-            result = sharepoint_service.get_sow_records()
-            
-            if not result["success"]:
-                st.error(f"❌ Failed to load records: {result.get('message', 'Unknown error')}")
-                st.session_state.published_sows_df = None
-                return
-            
-            df = result["data"]
-            
-            if df.empty:
-                st.info("📭 No SOW records found.")
-                st.session_state.published_sows_df = None
-                return
-            
-            # Store ALL data in session state
-            st.session_state.published_sows_df = df
-            st.success(f"✅ Loaded {len(df)} total SOW records")
+    # Filters are pushed down to the flow and only the visible page is fetched
+    page = load_dashboard_page(
+        sharepoint_service, "published_pager", load_clicked,
+        status_filter, client_filter, project_filter
+    )
     
     # Display data if loaded
-    if st.session_state.published_sows_df is not None:
-        # Get the original dataframe
-        original_df = st.session_state.published_sows_df
-        
-        if original_df.empty:
-            st.info("📭 No SOW records found.")
+    if page is not None:
+        if not page["success"]:
+            st.error(f"❌ Failed to load records: {page.get('message', 'Unknown error')}")
+            st.session_state.published_pager = None
             return
         
-        # ========== APPLY FILTERS CLIENT-SIDE ==========
-        filtered_df = original_df.copy()
-        
-        # Apply status filter
-        if status_filter != "All":
-            filtered_df = filtered_df[filtered_df['Status'] == status_filter]
-        
-        # Apply client filter
-        if client_filter != "All":
-            filtered_df = filtered_df[filtered_df['Client'] == client_filter]
-        
-        # Apply project type filter
-        if project_filter != "All":
-            filtered_df = filtered_df[filtered_df['ProjectType'] == project_filter]
+        filtered_df = page["data"]
         
         # Show filter summary
-        if len(filtered_df) < len(original_df):
-            st.info(f"📊 Showing {len(filtered_df)} of {len(original_df)} records (filtered: Status={status_filter if status_filter != 'All' else 'All'}, Client={client_filter if client_filter != 'All' else 'All'}, Project={project_filter if project_filter != 'All' else 'All'})")
-        else:
-            st.info(f"📊 Showing all {len(original_df)} records")
+        st.info(f"📊 Page {page['page'] + 1}: {len(filtered_df)} records (filtered: Status={status_filter}, Client={client_filter}, Project={project_filter})")
         
         if filtered_df.empty:
             st.warning("⚠️ No records match the selected filters. Try changing your filter criteria.")
             return
         
+        render_records_pager("published_pager", page)
+        
         # ========== DISPLAY DATAFRAME ==========
         st.subheader(f"📋 Published SOWs ({len(filtered_df)} records)")
         
@@ -4005,7 +6031,10 @@ def page_published_sows():
                     document_id = selected_row.get('ID')
                     
                     if document_id and Config.POWER_AUTOMATE_URLS["get_document"]:
-                        document_bytes = sharepoint_service.get_document(item_id=document_id)
+                        document_bytes = sharepoint_service.get_document(
+                            item_id=document_id,
+                            version=document_version(selected_row)
+                        )
                         
                         if document_bytes:
                             # Create download button immediately
@@ -4106,12 +6135,10 @@ def page_published_sows():
                                 form_data["Fees_al"] = project_specific.get("fees", 0)
                                 
                                 # Generate Excel
-                                excel_path = excel_exporter.create_fixed_fee_milestone_excel(form_data, milestone_df)
+                                excel_data = excel_exporter.create_fixed_fee_milestone_excel(form_data, milestone_df)
                                 
-                                if excel_path and os.path.exists(excel_path):
-                                    with open(excel_path, 'rb') as f:
-                                        excel_data = f.read()
-                                    
+                                if excel_data:
+                                                                        
                                     excel_filename = f"{selected_sow}_Milestone_Payments.xlsx"
                                     
                                     st.success("✅ Milestone sheet generated successfully!")
@@ -4123,12 +6150,6 @@ def page_published_sows():
                                         use_container_width=True,
                                         key=f"download_milestone_{selected_sow}"
                                     )
-                                    
-                                    # Clean up temp file
-                                    try:
-                                        os.remove(excel_path)
-                                    except:
-                                        pass
                                 else:
                                     st.error("❌ Failed to generate milestone sheet")
                             else:
@@ -4150,12 +6171,10 @@ def page_published_sows():
                                     st.warning(f"⚠️ Some resource data columns are missing: {missing_cols}")
                                 
                                 # Generate Excel
-                                excel_path = excel_exporter.create_tm_resource_excel(form_data, resources_df)
+                                excel_data = excel_exporter.create_tm_resource_excel(form_data, resources_df)
                                 
-                                if excel_path and os.path.exists(excel_path):
-                                    with open(excel_path, 'rb') as f:
-                                        excel_data = f.read()
-                                    
+                                if excel_data:
+                                                                        
                                     excel_filename = f"{selected_sow}_Resource_Details.xlsx"
                                     
                                     st.success("✅ Resource sheet generated successfully!")
@@ -4167,12 +6186,6 @@ def page_published_sows():
                                         use_container_width=True,
                                         key=f"download_resource_{selected_sow}"
                                     )
-                                    
-                                    # Clean up temp file
-                                    try:
-                                        os.remove(excel_path)
-                                    except:
-                                        pass
                                 else:
                                     st.error("❌ Failed to generate resource sheet")
                             else:
@@ -4193,9 +6206,9 @@ def page_published_sows():
             # Export filtered data to CSV
             csv = filtered_df.to_csv(index=False)
             st.download_button(
-                "📥 Download Filtered Data as CSV",
+                "📥 Download This Page as CSV",
                 data=csv,
-                file_name=f"published_sows_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                file_name=f"published_sows_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv",
                 use_container_width=True,
                 key="export_published_csv_btn"
@@ -4208,9 +6221,9 @@ def page_published_sows():
                 filtered_df.to_excel(writer, index=False, sheet_name='Published SOWs')
             
             st.download_button(
-                "📊 Download Filtered Data as Excel",
+                "📊 Download This Page as Excel",
                 data=excel_buffer.getvalue(),
-                file_name=f"published_sows_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                file_name=f"published_sows_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 use_container_width=True,
                 key="export_published_excel_btn"
@@ -4218,41 +6231,46 @@ def page_published_sows():
         
         # Add option to export all data
         with st.expander("📁 Export All Data (Unfiltered)", expanded=False):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Export all data to CSV
-                all_csv = original_df.to_csv(index=False)
-                st.download_button(
-                    "📥 Download ALL Data as CSV",
-                    data=all_csv,
-                    file_name=f"published_sows_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True,
-                    key="export_all_published_csv_btn"
-                )
-            
-            with col2:
-                # Export all data to Excel
-                all_excel_buffer = BytesIO()
-                with pd.ExcelWriter(all_excel_buffer, engine='openpyxl') as writer:
-                    original_df.to_excel(writer, index=False, sheet_name='All Published SOWs')
+            # The full listing is only fetched on request so page loads stay small
+            if st.button("📦 Prepare Full Export", use_container_width=True, key="prepare_export_all_published_btn"):
+                all_result = sharepoint_service.get_sow_records()
+                original_df = all_result["data"] if all_result["success"] else get_records_store().query()
                 
-                st.download_button(
-                    "📊 Download ALL Data as Excel",
-                    data=all_excel_buffer.getvalue(),
-                    file_name=f"published_sows_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True,
-                    key="export_all_published_excel_btn"
-                )
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Export all data to CSV
+                    all_csv = original_df.to_csv(index=False)
+                    st.download_button(
+                        "📥 Download ALL Data as CSV",
+                        data=all_csv,
+                        file_name=f"published_sows_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv",
+                        use_container_width=True,
+                        key="export_all_published_csv_btn"
+                    )
+                
+                with col2:
+                    # Export all data to Excel
+                    all_excel_buffer = BytesIO()
+                    with pd.ExcelWriter(all_excel_buffer, engine='openpyxl') as writer:
+                        original_df.to_excel(writer, index=False, sheet_name='All Published SOWs')
+                    
+                    st.download_button(
+                        "📊 Download ALL Data as Excel",
+                        data=all_excel_buffer.getvalue(),
+                        file_name=f"published_sows_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        use_container_width=True,
+                        key="export_all_published_excel_btn"
+                    )
     
-    elif not st.session_state.get('published_sows_df') and not load_clicked:
+    else:
         # Initial state - show instructions
         st.info("👆 Click 'View Submitted SOWs' button to view all SOW documents")
         st.markdown("""
         ### How to use:
-        1. Click the **View Submitted SOWs** button to load all SOW data from SharePoint
+        1. Click the **View Submitted SOWs** button to load SOW data from SharePoint
         2. Use the filter dropdowns above to narrow down the results
         3. View all SOW records in the interactive dataframe
         4. Select an approved SOW from the dropdown below the table
@@ -4260,8 +6278,8 @@ def page_published_sows():
         6. Click **Download Milestone Sheet** (for Fixed Fee) or **Download Resource Sheet** (for T&M) to download calculation sheets
         
         ### Features:
-        - **Client-side filtering** - All filters are applied locally after data is loaded
-        - **Export filtered data** - Download only the records that match your filters
+        - **Server-side filtering** - Filters are applied by SharePoint and results are shown one page at a time
+        - **Export current page** - Download the records shown on the current page
         - **Export all data** - Option to download the complete dataset
         - **Download individual SOW documents** by selecting from the dropdown
         - **Download calculation sheets** (milestone or resource details) for approved SOWs
@@ -4276,7 +6294,7 @@ def page_published_sows():
     # Add a reset button at the bottom
     st.divider()
     if st.button("🔄 Clear & Refresh", type="secondary", use_container_width=True):
-        st.session_state.published_sows_df = None
+        st.session_state.published_pager = None
         st.rerun()
 
 # ============================================================================
@@ -4285,6 +6303,10 @@ def page_published_sows():
 def main():
     """Main application entry point"""
     
+    start_metrics_endpoint()
+    # Start the approval workers with the server so queued jobs run before anyone opens the dashboard
+    get_approval_job_queue()
+    
     # Initialize session state
     init_session_state()
     
@@ -4306,7 +6328,7 @@ def main():
     else:
         # Normal navigation
         if st.session_state.user_role == 'legal':
-            pages = ["SOW Generator", "Approval Dashboard", "Published SOWs"]
+            pages = ["SOW Generator", "Approval Dashboard", "Published SOWs", "Flow Metrics"]
         else:
             pages = ["SOW Generator", "Published SOWs"]
         
@@ -4325,6 +6347,76 @@ def main():
             page_approval_dashboard()
         elif tab == "Published SOWs":
             page_published_sows()
+        elif tab == "Flow Metrics":
+            page_flow_metrics()
+
+# ============================================================================
+# PAGE 4: FLOW METRICS (LEGAL / ADMIN)
+# ============================================================================
+def page_flow_metrics():
+    """Per-flow call counts, latency and payload sizes for this server process"""
+    if st.session_state.user_role != 'legal':
+        st.error("⛔ Access denied. Flow metrics are only available to Legal team members.")
+        return
+    
+    st.title("📈 Flow Metrics")
+    st.markdown("Power Automate calls made by this server process since it started (or since the last reset).")
+    
+    metrics = get_flow_metrics()
+    snapshot = metrics.snapshot()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔄 Refresh", use_container_width=True, key="refresh_metrics_btn"):
+            st.rerun()
+    with col2:
+        if st.button("🧹 Reset Metrics", use_container_width=True, key="reset_metrics_btn"):
+            metrics.reset()
+            st.rerun()
+    
+    cache_stats = get_document_cache().stats()
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    st.subheader("📦 Document Download Cache")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hits", cache_stats["hits"])
+    col2.metric("Misses", cache_stats["misses"])
+    col3.metric("Hit Rate", f"{100 * cache_stats['hits'] / lookups:.0f}%" if lookups else "-")
+    col4.metric("Cached", f"{cache_stats['entries']} docs / {cache_stats['bytes'] / 2**20:.1f} MB")
+    
+    st.subheader("🔌 Flow Calls")
+    if not snapshot:
+        st.info("No flow calls recorded yet.")
+        return
+    
+    metrics_df = pd.DataFrame([
+        {
+            "Flow": name,
+            "Calls": flow["calls"],
+            "Errors": flow["errors"],
+            "Error %": round(100 * flow["errors"] / flow["calls"], 1) if flow["calls"] else 0.0,
+            "Retries": max(0, flow["attempts"] - flow["calls"]),
+            "Avg (s)": round(flow["latency_avg"], 3),
+            "p95 (s)": flow["latency_p95"],
+            "Max (s)": round(flow["latency_max"], 3),
+            "Total Time (s)": round(flow["latency_sum"], 1),
+            "Sent (KB)": round(flow["request_bytes"] / 1024, 1),
+            "Received (KB)": round(flow["response_bytes"] / 1024, 1),
+            "Circuit": flow["circuit"]
+        }
+        for name, flow in snapshot.items()
+    ]).sort_values("Total Time (s)", ascending=False)
+    
+    st.dataframe(metrics_df, use_container_width=True, hide_index=True)
+    
+    st.subheader("⏱️ Total Time by Flow")
+    st.bar_chart(metrics_df.set_index("Flow")["Total Time (s)"])
+    
+    with st.expander("Prometheus text format", expanded=False):
+        if Config.METRICS_PORT:
+            st.caption(f"Also served at http://127.0.0.1:{Config.METRICS_PORT}/metrics")
+        else:
+            st.caption("Set SOW_METRICS_PORT to serve this at http://127.0.0.1:<port>/metrics")
+        st.code(metrics.to_prometheus(), language="text")
 
 # ============================================================================
 # RUN APPLICATION
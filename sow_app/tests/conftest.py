@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import streamlit as st
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+# templates/ and holidays/ are looked up relative to the app folder
+os.chdir(APP_DIR)
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def isolated_data(tmp_path, monkeypatch):
+    """Point the local databases and document cache at a temporary folder, with fresh shared resources"""
+    for name in dir(main.Config):
+        if name.endswith("_DB_PATH"):
+            monkeypatch.setattr(main.Config, name, str(tmp_path / os.path.basename(getattr(main.Config, name))))
+    monkeypatch.setattr(main.Config, "DOCUMENT_CACHE_FOLDER", str(tmp_path / "document_cache"))
+    st.cache_resource.clear()
+    yield tmp_path
+    st.cache_resource.clear()
+
+
+class StubFlow:
+    """Local HTTP server standing in for every Power Automate flow
+
+    respond(payload) returns the JSON response for a request; requests are kept
+    in calls as (payload, client port).
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.respond = lambda payload: {"success": True}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes - without this, Nagle plus delayed ACKs add ~40 ms per kept-alive call
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                payload = json.loads(raw or b"{}")
+                stub.calls.append((payload, self.client_address[1]))
+                body = json.dumps(stub.respond(payload)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def operations(self):
+        return [payload.get("operation") for payload, _ in self.calls]
+
+
+@pytest.fixture
+def stub_flow(monkeypatch):
+    stub = StubFlow()
+    for flow_name in main.Config.POWER_AUTOMATE_URLS:
+        monkeypatch.setitem(main.Config.POWER_AUTOMATE_URLS, flow_name, stub.url)
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,56 @@
+import io
+import json
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(main.Config, "API_KEY", "test-key")
+    # Jobs stay queued - no background workers against the test database
+    monkeypatch.setattr(main.Config, "JOB_WORKERS", 0)
+    import api
+    return api
+
+
+def call(api, path, body):
+    raw = json.dumps(body).encode("utf-8")
+    environ = {
+        "PATH_INFO": path, "REQUEST_METHOD": "POST", "HTTP_X_API_KEY": "test-key",
+        "CONTENT_LENGTH": str(len(raw)), "wsgi.input": io.BytesIO(raw)
+    }
+    statuses = []
+    response = b"".join(api.app(environ, lambda status, headers: statuses.append(status)))
+    return statuses[0], json.loads(response)
+
+
+APPROVAL = {
+    "item_id": 42, "approver_email": "approver@example.com", "comments": "ok",
+    "sow": {"option": "Change Order", "sow_num": "SOW-7", "sow_name": "Scope Extension", "Client_Name": "BSC",
+            "start_date": "2026-03-01", "end_date": "2026-04-30"}
+}
+
+
+def test_approve_queues_the_job_instead_of_running_it(api, stub_flow):
+    status, result = call(api, "/approve", APPROVAL)
+
+    assert status == "202 Accepted"
+    assert result["queued"] is True
+    assert stub_flow.calls == []  # Nothing was rendered, uploaded or approved in the request
+
+    again_status, again = call(api, "/approve", APPROVAL)
+    assert again_status == "202 Accepted"
+    assert again["job_id"] == result["job_id"] and again["queued"] is False
+
+    status, job = call(api, "/job-status", {"job_id": result["job_id"]})
+    assert status == "200 OK"
+    assert job["data"]["status"] == main.ApprovalJobQueue.STATUS_QUEUED
+    assert job["data"]["sow_number"] == "SOW-7"
+
+
+def test_job_status_of_unknown_job(api):
+    status, result = call(api, "/job-status", {"job_id": 999})
+    assert status == "404 Not Found"
+    assert result["success"] is False
@@ -0,0 +1,157 @@
+import base64
+import os
+
+import pytest
+
+import main
+
+PAYLOAD = {
+    "operation": "upload_document",
+    "library_name": "Onboarding Details",
+    "folder_path": "SOWs",
+    "file_name": "SOW-1 - Large.docx",
+    "metadata": {"sow_number": "SOW-1"}
+}
+
+
+class ChunkedUploadFlow:
+    """Server side of the start_upload / append_chunk / upload_status / commit_upload protocol"""
+
+    def __init__(self):
+        self.uploads = {}
+        self.committed = {}
+        self.fail_appends = set()  # Offsets whose append_chunk is refused
+        self.lose_acks = set()     # Offsets whose append_chunk lands but gets no offset back
+        self.supported = True
+
+    def respond(self, payload):
+        operation = payload.get("operation")
+        if operation == "start_upload":
+            if not self.supported:
+                return {"error": "Unknown operation"}
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = bytearray()
+            return {"upload_id": upload_id, "offset": 0}
+        if operation == "upload_status":
+            data = self.uploads.get(payload["upload_id"])
+            return {"offset": len(data)} if data is not None else {"error": "Unknown upload"}
+        if operation == "append_chunk":
+            data = self.uploads[payload["upload_id"]]
+            offset = payload["offset"]
+            if offset in self.fail_appends:
+                return {"error": "Interrupted"}
+            if offset == len(data):
+                data += base64.b64decode(payload["file_content"])
+            if offset in self.lose_acks:
+                self.lose_acks.discard(offset)
+                return {"error": "Gateway timeout"}
+            return {"offset": len(data)}
+        if operation == "commit_upload":
+            self.committed[payload["upload_id"]] = bytes(self.uploads.pop(payload["upload_id"]))
+            return {"success": True, "url": f"https://sharepoint/{payload['upload_id']}"}
+        # Single-request upload
+        self.committed["single"] = base64.b64decode(payload["file_content"])
+        return {"success": True, "url": "https://sharepoint/single"}
+
+
+@pytest.fixture
+def chunked_flow(stub_flow, monkeypatch):
+    monkeypatch.setattr(main.Config, "UPLOAD_CHUNKED", True)
+    monkeypatch.setattr(main.Config, "UPLOAD_CHUNKED_THRESHOLD", 1000)
+    monkeypatch.setattr(main.Config, "UPLOAD_CHUNKED_PART_BYTES", 300)
+    monkeypatch.setattr(main.Config, "UPLOAD_CHUNK_RETRIES", 1)
+    flow = ChunkedUploadFlow()
+    stub_flow.respond = flow.respond
+    return flow, stub_flow
+
+
+def append_offsets(stub_flow):
+    return [payload["offset"] for payload, _ in stub_flow.calls if payload.get("operation") == "append_chunk"]
+
+
+def test_large_file_is_sent_in_chunks(chunked_flow):
+    flow, stub_flow = chunked_flow
+    file_bytes = os.urandom(1000)
+
+    result = main.SharePointService().upload_file(PAYLOAD, file_bytes)
+
+    assert result["success"]
+    assert flow.committed["upload-1"] == file_bytes
+    assert append_offsets(stub_flow) == [0, 300, 600, 900]
+
+
+def test_interrupted_upload_resumes_from_the_last_acknowledged_chunk(chunked_flow):
+    flow, stub_flow = chunked_flow
+    file_bytes = os.urandom(1500)
+    service = main.SharePointService()
+
+    flow.fail_appends = {900}
+    assert service.upload_file(PAYLOAD, file_bytes) is None
+    assert flow.committed == {}
+
+    flow.fail_appends = set()
+    stub_flow.calls.clear()
+    result = service.upload_file(PAYLOAD, file_bytes)
+
+    assert result["success"]
+    assert stub_flow.operations()[0] == "upload_status"
+    assert "start_upload" not in stub_flow.operations()
+    assert append_offsets(stub_flow) == [900, 1200]
+    assert flow.committed["upload-1"] == file_bytes
+
+
+def test_lost_acknowledgement_does_not_resend_the_chunk(chunked_flow):
+    flow, stub_flow = chunked_flow
+    file_bytes = os.urandom(1200)
+    flow.lose_acks = {300}
+
+    result = main.SharePointService().upload_file(PAYLOAD, file_bytes)
+
+    assert result["success"]
+    assert append_offsets(stub_flow) == [0, 300, 600, 900]
+    assert flow.committed["upload-1"] == file_bytes
+
+
+def test_falls_back_to_a_single_request_when_chunking_is_unsupported(chunked_flow):
+    flow, stub_flow = chunked_flow
+    flow.supported = False
+    file_bytes = os.urandom(1200)
+
+    result = main.SharePointService().upload_file(PAYLOAD, file_bytes)
+
+    assert result["success"]
+    assert stub_flow.operations() == ["start_upload", "upload_document"]
+    assert flow.committed["single"] == file_bytes
+
+
+def test_unsupported_chunking_is_only_tried_once(chunked_flow):
+    flow, stub_flow = chunked_flow
+    flow.supported = False
+    service = main.SharePointService()
+
+    service.upload_file(PAYLOAD, os.urandom(1200))
+    stub_flow.calls.clear()
+    result = service.upload_file(dict(PAYLOAD, file_name="SOW-2 - Large.docx"), os.urandom(1200))
+
+    assert result["success"]
+    assert stub_flow.operations() == ["upload_document"]
+
+
+def test_unreachable_flow_does_not_switch_chunking_off(chunked_flow, monkeypatch):
+    flow, stub_flow = chunked_flow
+    monkeypatch.setattr(main.Config, "HTTP_RETRY_ATTEMPTS", 1)
+    stub_flow.respond = lambda payload: 1 / 0  # Connection dropped without a response
+
+    main.SharePointService().upload_file(PAYLOAD, os.urandom(1200))
+
+    assert main.get_flow_capabilities().supports("upload_document", "start_upload")
+
+
+def test_chunking_is_off_unless_enabled(chunked_flow, monkeypatch):
+    flow, stub_flow = chunked_flow
+    monkeypatch.setattr(main.Config, "UPLOAD_CHUNKED", False)
+
+    result = main.SharePointService().upload_file(PAYLOAD, os.urandom(1200))
+
+    assert result["success"]
+    assert stub_flow.operations() == ["upload_document"]
@@ -0,0 +1,42 @@
+import pytest
+
+import main
+
+
+class BrokenBody:
+    """Request body that fails part way through sending"""
+
+    def __len__(self):
+        return 10
+
+    def __iter__(self):
+        yield b"{"
+        raise ValueError("file went away")
+
+
+def open_circuit(flow_name):
+    breaker = main.get_circuit_breakers()[flow_name]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.reset_seconds = 0  # Next call is the half-open trial
+    return breaker
+
+
+def test_trial_that_raises_still_reports_its_outcome(stub_flow):
+    breaker = open_circuit("upload_document")
+    service = main.SharePointService()
+
+    with pytest.raises(ValueError):
+        service._post_flow("upload_document", stub_flow.url, BrokenBody())
+
+    # The failed trial re-opened the circuit instead of leaving it waiting on a trial forever
+    assert breaker.allow()
+
+
+def test_successful_trial_closes_the_circuit(stub_flow):
+    breaker = open_circuit("upload_document")
+
+    response = main.SharePointService()._post_flow("upload_document", stub_flow.url, b"{}")
+
+    assert response.status_code == 200
+    assert breaker.state == "closed"
@@ -0,0 +1,84 @@
+from datetime import date
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import main
+
+SOW_DATA = {
+    "sow_num": "SOW-1001",
+    "sow_name": "Data Platform",
+    "Client_Name": "BSC",
+    "Fees_al": 30000,
+    "start_date": "2026-01-01",
+    "end_date": "2026-06-30"
+}
+
+
+def resources(count):
+    return pd.DataFrame({
+        "Role": [f"Engineer {i}" for i in range(count)],
+        "Location": ["India", "USA"] * (count // 2) + ["India"] * (count % 2),
+        "Start Date": [date(2026, 1, 1)] * count,
+        "End Date": [date(2026, 6, 30)] * count,
+        "Allocation %": [100] * count,
+        "Hrs/Day": [8] * count,
+        "Rate/hr ($)": [50 + i for i in range(count)],
+        "Estimated $": [1000.5 * (i + 1) for i in range(count)]
+    })
+
+
+def milestones(count):
+    if not count:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        "milestone_no": [f"M{i + 1}" for i in range(count)],
+        "services": [f"Deliverable {i + 1}" for i in range(count)],
+        "due_date": ["2026-03-31"] * count,
+        "allocation": [100 / count] * count,
+        "net_pay": [30000 / count] * count
+    })
+
+
+def snapshot(excel_bytes):
+    """Cell values and styling, merged ranges and column widths of the first sheet"""
+    ws = openpyxl.load_workbook(BytesIO(excel_bytes)).active
+    cells = {}
+    for row in ws.iter_rows():
+        for cell in row:
+            if cell.value is None:
+                continue
+            value = cell.value
+            if isinstance(value, str) and value.startswith("Generated on:"):
+                value = "Generated on:"  # Timestamp differs between the two runs
+            cells[cell.coordinate] = (value, cell.font.b, cell.fill.fgColor.rgb, cell.number_format,
+                                      cell.alignment.horizontal, cell.border.top.style if cell.border.top else None)
+    widths = {letter: dimension.width for letter, dimension in ws.column_dimensions.items()}
+    return cells, sorted(str(merged) for merged in ws.merged_cells.ranges), widths
+
+
+@pytest.mark.parametrize("count", [0, 3, 25])
+def test_resource_workbook_is_the_same_in_both_modes(count):
+    normal = main.ExcelExporter(streaming=False).create_tm_resource_excel(SOW_DATA, resources(count))
+    streamed = main.ExcelExporter(streaming=True).create_tm_resource_excel(SOW_DATA, resources(count))
+    assert snapshot(streamed) == snapshot(normal)
+
+
+@pytest.mark.parametrize("count", [0, 4])
+def test_milestone_workbook_is_the_same_in_both_modes(count):
+    normal = main.ExcelExporter(streaming=False).create_fixed_fee_milestone_excel(SOW_DATA, milestones(count))
+    streamed = main.ExcelExporter(streaming=True).create_fixed_fee_milestone_excel(SOW_DATA, milestones(count))
+    assert snapshot(streamed) == snapshot(normal)
+
+
+def test_large_tables_switch_to_streaming(monkeypatch):
+    monkeypatch.setattr(main.Config, "EXCEL_STREAMING_ROWS", 10)
+    exporter = main.ExcelExporter()
+    assert not exporter._use_streaming(resources(10))
+    assert exporter._use_streaming(resources(11))
+
+    cells, merges, _ = snapshot(exporter.create_tm_resource_excel(SOW_DATA, resources(11)))
+    assert cells["A18"][0] == "Engineer 10"
+    assert "A23:H23" in merges
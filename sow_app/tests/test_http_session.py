@@ -0,0 +1,19 @@
+import main
+
+
+def test_session_is_shared_across_services():
+    assert main.SharePointService().http is main.SharePointService().http
+
+
+def test_session_pool_is_sized_from_config():
+    adapter = main.get_http_session().get_adapter("https://example.com")
+    assert adapter._pool_maxsize == main.Config.HTTP_POOL_MAXSIZE
+
+
+def test_sequential_flow_calls_reuse_one_connection(stub_flow):
+    stub_flow.respond = lambda payload: {"value": []}
+    for _ in range(5):
+        main.SharePointService().check_user("someone@company.com")
+
+    assert len(stub_flow.calls) == 5
+    assert len({port for _, port in stub_flow.calls}) == 1
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import main
+
+
+def test_concurrent_callers_share_one_load():
+    cache = main.RecordsCache(ttl_seconds=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.1)
+        return {"success": True, "data": "rows"}
+
+    def other_key(number):
+        # Loads of other keys evict while the first key's callers are waiting
+        cache.get_or_load(("other", number), lambda: {"success": True})
+
+    threads = [threading.Thread(target=cache.get_or_load, args=("listing", loader)) for _ in range(10)]
+    threads += [threading.Thread(target=other_key, args=(number,)) for number in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert cache._key_locks == {}
+
+
+def test_expired_entries_are_evicted():
+    cache = main.RecordsCache(ttl_seconds=0.05)
+    for number in range(20):
+        cache.get_or_load(("filter", number), lambda: {"success": True})
+    time.sleep(0.1)
+
+    cache.get_or_load("fresh", lambda: {"success": True})
+    assert list(cache._entries) == ["fresh"]
+    assert cache._key_locks == {}
+
+
+def test_invalidated_load_is_not_cached():
+    cache = main.RecordsCache(ttl_seconds=60)
+
+    def loader():
+        cache.invalidate()
+        return {"success": True}
+
+    cache.get_or_load("listing", loader)
+    assert "listing" not in cache._entries
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+import main
+
+
+def listing(*rows):
+    return {"success": True, "data": pd.DataFrame(list(rows), columns=["ID", "Status", "Modified"])}
+
+
+def test_watermark_is_the_latest_server_stamp_across_offsets():
+    sync = main.RecordsDeltaSync(full_reconcile_seconds=900)
+    sync.sync(lambda filters: listing(
+        (1, "Draft", "2026-10-01T10:00:00+02:00"),
+        (2, "Draft", "2026-10-01T09:30:00Z")
+    ))
+    assert sync.watermark == "2026-10-01T09:30:00Z"
+
+
+def test_empty_delta_keeps_the_server_watermark():
+    sync = main.RecordsDeltaSync(full_reconcile_seconds=900)
+    requests = []
+
+    def fetch(filters):
+        requests.append(filters)
+        if not filters:
+            return listing((1, "Draft", "2026-10-01T09:30:00Z"))
+        return listing()
+
+    sync.sync(fetch)
+    sync.sync(fetch)
+    sync.sync(fetch)
+
+    # The local clock never replaces the server's stamp, however far ahead of SharePoint it runs
+    assert sync.watermark == "2026-10-01T09:30:00Z"
+    assert requests[1:] == [{"modified_since": "2026-10-01T09:29:00Z"}] * 2
+
+
+def test_delta_changes_are_merged():
+    sync = main.RecordsDeltaSync(full_reconcile_seconds=900)
+    sync.sync(lambda filters: listing((1, "Draft", "2026-10-01T09:00:00Z"), (2, "Draft", "2026-10-01T09:00:00Z")))
+    result = sync.sync(lambda filters: listing((2, "Approved", "2026-10-01T11:00:00Z")))
+
+    assert not result["full_sync"]
+    assert dict(zip(result["data"]["ID"], result["data"]["Status"])) == {1: "Draft", 2: "Approved"}
+    assert sync.watermark == "2026-10-01T11:00:00Z"
+
+
+def test_local_clock_is_only_used_without_any_server_stamp():
+    sync = main.RecordsDeltaSync(full_reconcile_seconds=900)
+    before = datetime.now(timezone.utc) - timedelta(seconds=1)
+    sync.sync(lambda filters: {"success": True, "data": pd.DataFrame(columns=["ID", "Status"])})
+    assert pd.to_datetime(sync.watermark, utc=True) >= before.replace(microsecond=0)
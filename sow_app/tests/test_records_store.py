@@ -0,0 +1,58 @@
+import threading
+
+import main
+
+
+def records(count, status="Draft"):
+    return [{"ID": number, "SOWNumber": f"SOW-{number}", "Status": status, "Client": "BSC"} for number in range(1, count + 1)]
+
+
+def store(tmp_path):
+    return main.SowRecordsStore(str(tmp_path / "records.db"))
+
+
+def page_ids(records_store, page, page_size=3, **filters):
+    return list(records_store.query(**filters, limit=page_size, offset=page * page_size)["ID"])
+
+
+def test_updated_record_keeps_its_page(tmp_path):
+    records_store = store(tmp_path)
+    records_store.upsert(records(9))
+    first_page = page_ids(records_store, 0)
+
+    records_store.update(2, {"Client": "Cognex"})
+    records_store.upsert([dict(records(9)[0], Status="Approved")])
+
+    assert page_ids(records_store, 0) == first_page == [1, 2, 3]
+    assert page_ids(records_store, 2) == [7, 8, 9]
+
+
+def test_pages_follow_sharepoint_id_order(tmp_path):
+    records_store = store(tmp_path)
+    records_store.upsert(list(reversed(records(12))))
+    records_store.upsert([{"ID": None, "SOWNumber": "SOW-LOCAL", "Status": "Draft"}])
+
+    ids = [page_ids(records_store, page, page_size=5) for page in range(3)]
+    assert ids[0] == [1, 2, 3, 4, 5]
+    assert ids[2][:2] == [11, 12]
+    assert len(ids[2]) == 3  # The unsynced local save comes last
+
+
+def test_replace_all_is_never_seen_half_done(tmp_path):
+    records_store = store(tmp_path)
+    records_store.replace_all(records(200))
+    counts = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            counts.append(len(records_store.query()))
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for _ in range(20):
+        records_store.replace_all(records(200, status="Approved"))
+    done.set()
+    thread.join()
+
+    assert counts and set(counts) == {200}
@@ -0,0 +1,48 @@
+import base64
+import json
+import os
+
+import pytest
+
+import main
+
+PAYLOAD = {
+    "operation": "upload_document",
+    "library_name": "Onboarding Details",
+    "file_name": "SOW-1 - Café \"Quoted\".docx",
+    "metadata": {"sow_number": "SOW-1", "client": "Zürich AG", "notes": "line\nbreak"}
+}
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 10, 3 * 1024, 3 * 1024 + 1, 100_000])
+@pytest.mark.parametrize("chunk_size", [3, 1024, 3 * 256 * 1024])
+def test_body_decodes_to_the_same_json(size, chunk_size):
+    file_bytes = os.urandom(size)
+    body = main.StreamingJsonBody(PAYLOAD, "file_content", file_bytes, chunk_size)
+    streamed = b"".join(body)
+
+    expected = dict(PAYLOAD, file_content=base64.b64encode(file_bytes).decode("ascii"))
+    assert json.loads(streamed) == expected
+    assert streamed == json.dumps(expected, ensure_ascii=False).encode("utf-8")
+    assert len(body) == len(streamed)
+
+
+def test_body_can_be_sent_again():
+    body = main.StreamingJsonBody(PAYLOAD, "file_content", os.urandom(5000), 1024)
+    assert b"".join(body) == b"".join(body)
+
+
+def test_chunk_size_is_rounded_to_whole_base64_groups():
+    body = main.StreamingJsonBody(PAYLOAD, "file_content", os.urandom(100), 1000)
+    assert body.chunk_size % 3 == 0
+
+
+def test_upload_request_carries_the_streamed_body(stub_flow):
+    file_bytes = os.urandom(50_000)
+    stub_flow.respond = lambda payload: {"success": True}
+
+    main.SharePointService()._call_power_automate("upload_document", PAYLOAD, file_bytes=file_bytes)
+
+    sent, _ = stub_flow.calls[0]
+    assert base64.b64decode(sent.pop("file_content")) == file_bytes
+    assert sent == PAYLOAD
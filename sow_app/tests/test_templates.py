@@ -0,0 +1,68 @@
+from io import BytesIO
+
+import pytest
+from docx import Document
+from docxtpl import DocxTemplate
+
+import main
+
+REQUESTS = {
+    "T&M": {
+        "option": "T&M", "sow_num": "SOW-2001", "sow_name": "Support Desk", "Client_Name": "Cognex",
+        "start_date": "2026-01-01", "end_date": "2026-03-31", "scope_text": "Level 2 support",
+        "resources": [{"Role": "Engineer", "Location": "India", "Start Date": "2026-01-01",
+                       "End Date": "2026-03-31", "Allocation %": 100, "Hrs/Day": 8, "Rate/hr ($)": 40}]
+    },
+    "Fixed Fee": {
+        "option": "Fixed Fee", "sow_num": "SOW-2002", "sow_name": "Migration", "Client_Name": "BSC",
+        "start_date": "2026-02-01", "end_date": "2026-05-31", "scope_text": "Data migration", "Fees_al": 20000,
+        "milestones": [{"Milestone Description": "Cutover", "Milestone Date": "2026-05-15", "Amount": "20000"}]
+    }
+}
+
+
+def document_text(docx_bytes):
+    document = Document(BytesIO(docx_bytes))
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        lines += [cell.text for row in table.rows for cell in row.cells]
+    return lines
+
+
+def render(doc, form_data):
+    doc.render(main.prepare_document_context(form_data))
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("option", list(REQUESTS))
+def test_pre_parsed_render_matches_a_fresh_parse(option):
+    template_manager = main.TemplateManager()
+    form_data = main.build_form_data(REQUESTS[option])
+
+    fresh = DocxTemplate(template_manager.get_template(option))
+    assert document_text(render(template_manager.get_docx_template(option), form_data)) == \
+        document_text(render(fresh, form_data))
+
+
+def test_renders_do_not_leak_into_the_cached_template():
+    template_manager = main.TemplateManager()
+    first = main.build_form_data(REQUESTS["T&M"])
+    second = main.build_form_data(dict(REQUESTS["T&M"], sow_num="SOW-2999", sow_name="Other Project"))
+
+    render(template_manager.get_docx_template("T&M"), first)
+    second_text = "\n".join(document_text(render(template_manager.get_docx_template("T&M"), second)))
+
+    assert "SOW-2001" not in second_text and "Support Desk" not in second_text
+    assert "SOW-2999" in second_text or "Other Project" in second_text
+
+
+def test_template_is_parsed_once():
+    template_manager = main.TemplateManager()
+    template_manager.get_docx_template("Fixed Fee")
+    entry = template_manager._load_template(main.Config.TEMPLATE_MAPPING["Fixed Fee"])
+    parsed = entry["document"]
+
+    template_manager.get_docx_template("Fixed Fee")
+    assert entry["document"] is parsed
@@ -0,0 +1,109 @@
+import base64
+import os
+
+import pytest
+
+import main
+
+PAYLOAD = {
+    "operation": "upload_document",
+    "library_name": "Onboarding Details",
+    "folder_path": "SOWs",
+    "file_name": "SOW-1 - Project.docx",
+    "metadata": {"sow_number": "SOW-1", "status": "Pending"}
+}
+
+
+class DedupeFlow:
+    """upload_document flow that stores content_hash and optionally supports file_info / update_metadata"""
+
+    def __init__(self):
+        self.files = {}
+        self.file_info = True
+        self.update_metadata = True
+
+    def respond(self, payload):
+        operation = payload.get("operation")
+        if operation == "file_info":
+            if not self.file_info:
+                return {"error": "Unknown operation"}
+            return {"content_hash": self.files.get(payload["file_name"], {}).get("content_hash", "")}
+        if operation == "update_metadata":
+            if not self.update_metadata:
+                return {"error": "Unknown operation"}
+            self.files[payload["file_name"]].update(payload["metadata"])
+            return {"success": True, "url": "https://sharepoint/updated"}
+        base64.b64decode(payload["file_content"])
+        self.files[payload["file_name"]] = dict(payload["metadata"])
+        return {"success": True, "url": "https://sharepoint/uploaded"}
+
+
+@pytest.fixture
+def dedupe_flow(stub_flow, monkeypatch):
+    monkeypatch.setattr(main.Config, "UPLOAD_DEDUPE", True)
+    flow = DedupeFlow()
+    stub_flow.respond = flow.respond
+    return flow, stub_flow
+
+
+def upload_twice(stub_flow, file_bytes, second_payload=PAYLOAD):
+    service = main.SharePointService()
+    service.upload_file(PAYLOAD, file_bytes)
+    first = stub_flow.operations()
+    stub_flow.calls.clear()
+    result = service.upload_file(second_payload, file_bytes)
+    return first, result
+
+
+def test_first_upload_costs_no_extra_call(dedupe_flow):
+    flow, stub_flow = dedupe_flow
+    first, _ = upload_twice(stub_flow, os.urandom(500))
+    assert first == ["upload_document"]
+
+
+def test_unchanged_file_is_not_sent_again(dedupe_flow):
+    flow, stub_flow = dedupe_flow
+    _, result = upload_twice(stub_flow, os.urandom(500))
+
+    assert result["success"]
+    assert stub_flow.operations() == ["file_info"]
+
+
+def test_changed_metadata_is_updated_without_the_file(dedupe_flow):
+    flow, stub_flow = dedupe_flow
+    approved = dict(PAYLOAD, metadata=dict(PAYLOAD["metadata"], status="Approved"))
+    _, result = upload_twice(stub_flow, os.urandom(500), approved)
+
+    assert result["url"] == "https://sharepoint/updated"
+    assert stub_flow.operations() == ["file_info", "update_metadata"]
+    assert flow.files[PAYLOAD["file_name"]]["status"] == "Approved"
+
+
+def test_flow_without_file_info_is_asked_once(dedupe_flow):
+    flow, stub_flow = dedupe_flow
+    flow.file_info = False
+    file_bytes = os.urandom(500)
+
+    _, result = upload_twice(stub_flow, file_bytes)
+    assert result["success"]
+    assert stub_flow.operations() == ["file_info", "upload_document"]
+
+    stub_flow.calls.clear()
+    main.SharePointService().upload_file(PAYLOAD, file_bytes)
+    assert stub_flow.operations() == ["upload_document"]
+
+
+def test_flow_without_update_metadata_falls_back_to_a_full_upload(dedupe_flow):
+    flow, stub_flow = dedupe_flow
+    flow.update_metadata = False
+    approved = dict(PAYLOAD, metadata=dict(PAYLOAD["metadata"], status="Approved"))
+    file_bytes = os.urandom(500)
+
+    _, result = upload_twice(stub_flow, file_bytes, approved)
+    assert result["url"] == "https://sharepoint/uploaded"
+    assert stub_flow.operations() == ["file_info", "update_metadata", "upload_document"]
+
+    # Metadata changes go straight to a full upload from now on
+    stub_flow.calls.clear()
+    main.SharePointService().upload_file(PAYLOAD, file_bytes)
+    assert stub_flow.operations() == ["upload_document"]